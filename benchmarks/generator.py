@@ -0,0 +1,164 @@
+# benchmarks/generator.py
+
+from html import escape
+from typing import Dict, List, Optional, Tuple
+import json
+import random
+
+from selenium_scraper import selector_registry as sel
+
+"""
+Générateur déterministe de pages de recherche Facebook synthétiques, dans le balisage attendu
+par FacebookParser (sélecteurs de selector_registry), et de réponses GraphQL équivalentes
+(voir selenium_scraper/graphql.py). Sert aux benchmarks, hors ligne.
+"""
+
+_WORDS = (
+    "président", "république", "france", "élection", "discours", "histoire", "paris", "corrèze",
+    "souvenir", "hommage", "politique", "europe", "monde", "image", "archive", "vidéo", "moment",
+    "le", "la", "les", "un", "une", "de", "du", "et", "à", "pour", "avec", "dans", "sur", "😀", "🇫🇷",
+)
+_PAGES = ("Le Monde", "France Info", "Archives INA", "Paris Match", "Le Figaro", "Libération", "BFMTV", "Ouest-France")
+
+# Formats d'engagement : (gabarit, valeur attendue) à partir d'un nombre tiré au hasard
+_FORMATS = (
+    lambda n: (f"{n} {{kw}}s", n),
+    lambda n: (f"{n // 1000},{(n // 100) % 10} K {{kw}}s", (n // 1000) * 1000 + ((n // 100) % 10) * 100),
+    lambda n: (f"{n // 1000}\xa0K {{kw}}s", (n // 1000) * 1000),
+    lambda n: (f"{n // 1_000_000 or 1},{(n // 100_000) % 10} M {{kw}}s",
+               (n // 1_000_000 or 1) * 1_000_000 + ((n // 100_000) % 10) * 100_000),
+)
+
+
+class SyntheticPageGenerator:
+    """
+    Args:
+        seed (int): Graine du générateur (même graine = même page).
+        text_words (int): Nombre moyen de mots par post.
+        images (int): Nombre d'images fbcdn par post (plus un emoji filtré).
+        invalid_ratio (float): Part de blocs sans texte (ignorés par le parser).
+    """
+
+    def __init__(self, seed: int = 42, text_words: int = 80, images: int = 2, invalid_ratio: float = 0.1):
+        self.seed = seed
+        self.text_words = text_words
+        self.images = images
+        self.invalid_ratio = invalid_ratio
+
+    def _engagement(self, rng: random.Random, keyword: str) -> Tuple[str, int]:
+        template, value = rng.choice(_FORMATS)(rng.randint(2, 9_999_999))
+        return template.format(kw=keyword), value
+
+    def _post(self, rng: random.Random, index: int) -> Tuple[str, Optional[Dict]]:
+        page_name = rng.choice(_PAGES)
+        valid = rng.random() >= self.invalid_ratio
+        words = max(1, int(rng.gauss(self.text_words, self.text_words / 4)))
+        text = " ".join(rng.choice(_WORDS) for _ in range(words)) + f" #{index}"
+        comments_text, comments = self._engagement(rng, sel.COUNT_KEYWORDS["comments"])
+        shares_text, shares = self._engagement(rng, sel.COUNT_KEYWORDS["shares"])
+        images = [
+            f"https://scontent-cdg4-{rng.randint(1, 3)}.xx.fbcdn.net/v/t39.30808-6/{rng.getrandbits(48)}_n.jpg"
+            f"?_nc_cat={rng.randint(1, 111)}&oh=00_{rng.getrandbits(64):x}&oe={rng.getrandbits(32):X}"
+            for _ in range(self.images)
+        ]
+        message = (
+            f'<div {sel.MESSAGE_ATTR[0]}="{sel.MESSAGE_ATTR[1]}"><div dir="auto"><span>{escape(text)}</span></div></div>'
+            if valid else ""
+        )
+        html = (
+            f'<div class="{sel.POST_CONTAINER_CLASS}"><div class="x1yztbdb">'
+            f'<div {sel.PAGE_NAME_ATTR[0]}="{sel.PAGE_NAME_ATTR[1]}"><h4><span><a href="#"><span>{escape(page_name)}</span></a></span></h4></div>'
+            f'{message}'
+            + "".join(f'<a href="#"><img src="{escape(src)}" alt=""></a>' for src in images)
+            + '<img src="https://static.xx.fbcdn.net/images/emoji.php/v9/t4f/1/16/1f600.png" alt="😀">'
+            f'<div class="x168nmei"><span><span>{comments_text}</span></span><span>{shares_text}</span></div>'
+            f'<div role="button"><span>Commenter</span></div><div role="button"><span>Partager</span></div>'
+            f'</div></div>'
+        )
+        expected = {
+            "page_name": page_name, "text": text, "images": images, "comments": comments, "shares": shares
+        } if valid else None
+        return html, expected
+
+    def generate(self, posts: int = 50) -> Tuple[str, List[Dict]]:
+        """Retourne (html de la page, liste des posts valides attendus)."""
+        rng = random.Random(self.seed)
+        blocks, expected = [], []
+        for i in range(posts):
+            html, post = self._post(rng, i)
+            blocks.append(html)
+            if post is not None:
+                expected.append(post)
+        page = (
+            '<!DOCTYPE html><html lang="fr"><head><meta charset="utf-8"><title>Facebook</title></head>'
+            '<body><div role="feed">' + "".join(blocks) + '</div></body></html>'
+        )
+        return page, expected
+
+    def _story(self, rng: random.Random, index: int) -> Tuple[Dict, Dict, Optional[Dict]]:
+        """Nœud 'Story' (sans compteurs), fragment différé des compteurs, post attendu (None si sans texte)."""
+        page_name = rng.choice(_PAGES)
+        valid = rng.random() >= self.invalid_ratio
+        words = max(1, int(rng.gauss(self.text_words, self.text_words / 4)))
+        text = " ".join(rng.choice(_WORDS) for _ in range(words)) + f" #{index}"
+        comments, shares = rng.randint(0, 9_999_999), rng.randint(0, 999_999)
+        images = [
+            f"https://scontent-cdg4-{rng.randint(1, 3)}.xx.fbcdn.net/v/t39.30808-6/{rng.getrandbits(48)}_n.jpg"
+            f"?_nc_cat={rng.randint(1, 111)}&oh=00_{rng.getrandbits(64):x}&oe={rng.getrandbits(32):X}"
+            for _ in range(self.images)
+        ]
+        story_id = f"UzpfS{rng.getrandbits(64):x}"
+        actors = [{"__typename": "Page", "id": str(rng.getrandbits(40)), "name": page_name,
+                   "profile_picture": {"uri": f"https://scontent.xx.fbcdn.net/v/t39.30808-1/{rng.getrandbits(40)}_n.jpg"}}]
+        content = {"__typename": "Story", "id": story_id, "actors": actors, "attachments": [
+            {"styles": {"attachment": {"all_subattachments": {"nodes": [
+                {"media": {"__typename": "Photo", "image": {"uri": uri, "width": 720}}} for uri in images
+            ]}}}}
+        ]}
+        if valid:
+            content["message"] = {"text": text, "ranges": []}
+        story = {
+            "__typename": "Story", "id": story_id, "post_id": str(rng.getrandbits(50)),
+            "comet_sections": {"content": {"story": content},
+                               "context_layout": {"story": {"__typename": "Story", "id": story_id, "actors": actors}}},
+        }
+        feedback = {"__typename": "Story", "id": story_id, "comet_sections": {"feedback": {"story": {
+            "feedback_context": {"feedback_target_with_context": {"comet_ufi_summary_and_actions_renderer": {"feedback": {
+                "comment_rendering_instance": {"comments": {"total_count": comments}},
+                "share_count": {"count": shares},
+                "reaction_count": {"count": rng.randint(0, 99_999)},
+            }}}}
+        }}}}
+        expected = {
+            "page_name": page_name, "text": text, "images": images, "comments": comments, "shares": shares
+        } if valid else None
+        return story, feedback, expected
+
+    def generate_graphql(self, posts: int = 50, page_size: int = 10) -> Tuple[List[str], List[Dict]]:
+        """
+        Retourne (corps des réponses GraphQL, posts valides attendus), au format des réponses de recherche :
+        préfixe 'for (;;);', une page de résultats puis un objet différé (@defer) par post pour les compteurs.
+        """
+        rng = random.Random(self.seed)
+        bodies, expected = [], []
+        for start in range(0, posts, page_size):
+            stories = [self._story(rng, i) for i in range(start, min(posts, start + page_size))]
+            page = {"data": {"serpResponse": {"results": {
+                "edges": [{"node": {"role": "TOP_PUBLIC_POSTS"}, "relay_rendering_strategy": {"view_model": {
+                    "click_model": {"story": story}}}} for story, _, _ in stories],
+                "page_info": {"has_next_page": True, "end_cursor": f"cursor{start}"},
+            }}}}
+            deferred = [
+                {"label": "CometFeedStoryFeedbackSection_story$defer", "path": ["serpResponse", "results", "edges", i],
+                 "data": feedback}
+                for i, (_, feedback, _) in enumerate(stories)
+            ]
+            bodies.append("for (;;);" + "\r\n".join(json.dumps(obj, ensure_ascii=False) for obj in [page] + deferred))
+            expected.extend(post for _, _, post in stories if post is not None)
+        return bodies, expected
+
+    def engagement_strings(self, count: int = 1000) -> List[Tuple[str, int]]:
+        """Chaînes d'engagement variées ('3,2 K commentaires', …) avec leur valeur attendue."""
+        rng = random.Random(self.seed)
+        keywords = list(sel.COUNT_KEYWORDS.values())
+        return [self._engagement(rng, rng.choice(keywords)) for _ in range(count)]
@@ -0,0 +1,260 @@
+# benchmarks/run_benchmarks.py
+
+from benchmarks.generator import SyntheticPageGenerator
+from selenium_scraper.graphql import GraphQLPostExtractor
+from selenium_scraper.minhash import MinHasher
+from selenium_scraper.model import PostModel
+from selenium_scraper.parser import FacebookParser
+from selenium_scraper.parser_backends import BACKENDS
+from pipeline.runner import PipelineRunner
+from storage.jsonl_backend import JsonLinesStorage
+from storage.lsh_index import LSHIndex
+from storage.sqlite_backend import SQLiteStorage
+from utils.logger import setup_logger
+
+from typing import Callable, Dict, List, Optional
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+"""
+Benchmarks des chemins critiques, entièrement hors ligne :
+parse_all (par backend), extraction GraphQL (réponses JSON équivalentes), extraction champ par champ,
+_parse_number, construction des PostModel, signatures MinHash et regroupement LSH des quasi-doublons,
+insert_many_posts par moteur de stockage (mongomock, SQLite, JSONL) et pipeline complet
+(parsing + stockage SQLite), sans aucun serveur de base de données.
+
+Usage :
+    python -m benchmarks.run_benchmarks                      # mesure et compare à la baseline
+    python -m benchmarks.run_benchmarks --save-baseline      # enregistre la baseline
+    python -m benchmarks.run_benchmarks --posts 200 --threshold 0.15 --json report.json
+"""
+
+logger = setup_logger(__name__)
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(name: str, func: Callable[[], int], repeat: int, warmup: int = 1) -> Dict:
+    """
+    Exécute func 'repeat' fois (func retourne le nombre d'éléments traités) et mesure :
+    débit (éléments/s), latences p50/p95/p99 par itération (ms) et pic mémoire (Ko, passe séparée).
+    """
+    for _ in range(warmup):
+        func()
+    durations, items = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items += func()
+        durations.append(time.perf_counter() - start)
+
+    # Mesure mémoire à part : tracemalloc ralentit fortement le code mesuré
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    durations.sort()
+    total = sum(durations)
+    return {
+        "name": name,
+        "throughput": round(items / total, 2) if total else 0.0,
+        "p50_ms": round(_percentile(durations, 0.50) * 1000, 3),
+        "p95_ms": round(_percentile(durations, 0.95) * 1000, 3),
+        "p99_ms": round(_percentile(durations, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(durations) * 1000, 3),
+        "peak_kb": round(peak / 1024, 1),
+        "repeat": repeat,
+    }
+
+
+def _available_backends() -> List[str]:
+    names = []
+    for name, backend_cls in BACKENDS.items():
+        try:
+            backend_cls()
+            names.append(name)
+        except ImportError:
+            logger.warning("⚠️ Backend '%s' indisponible (dépendance manquante) : ignoré.", name)
+    return names
+
+
+def check_backends(html: str, expected: List[Dict], backends: List[str]):
+    """Vérifie que chaque backend reproduit exactement les posts attendus du générateur."""
+    for name in backends:
+        posts = [post.to_dict() for post in FacebookParser(html, backend=name).parse_all()]
+        got = [{k: p[k] for k in ("page_name", "text", "images", "comments", "shares")} for p in posts]
+        if got != expected:
+            mismatch = next((i for i, (a, b) in enumerate(zip(got, expected)) if a != b), min(len(got), len(expected)))
+            raise AssertionError(f"Backend '{name}' : sortie différente de l'attendu (premier écart au post {mismatch}).")
+
+
+def check_graphql(bodies: List[str], expected: List[Dict]):
+    """Vérifie que l'extraction GraphQL reproduit exactement les posts attendus du générateur."""
+    posts = [post.to_dict() for post in GraphQLPostExtractor().extract(bodies) if post.is_valid()]
+    got = [{k: p[k] for k in ("page_name", "text", "images", "comments", "shares")} for p in posts]
+    if got != expected:
+        raise AssertionError("Extraction GraphQL : sortie différente de l'attendu.")
+
+
+def _mongomock_client(batch_size: int):
+    try:
+        import mongomock
+    except ImportError:
+        return None
+    from storage.mongo_client import MongoDBClient
+
+    class MockMongoDBClient(MongoDBClient):
+        def _connect(self):
+            return mongomock.MongoClient()
+
+    return lambda: MockMongoDBClient(db_name="bench", collection_name="posts", batch_size=batch_size)
+
+
+def run_all(posts: int, repeat: int, seed: int, text_words: int, images: int) -> List[Dict]:
+    generator = SyntheticPageGenerator(seed=seed, text_words=text_words, images=images)
+    html, expected = generator.generate(posts)
+    backends = _available_backends()
+    check_backends(html, expected, backends)
+    results = []
+
+    for name in backends:
+        results.append(measure(f"parse_all[{name}]", lambda: len(FacebookParser(html, backend=name).parse_all()), repeat))
+
+        parser = FacebookParser(html, backend=name)
+        post_divs = parser.backend.find_posts(html)
+        for field in ("page_name", "text", "images", "comment_count", "share_count"):
+            extract = getattr(parser, f"_extract_{field}")
+            results.append(measure(
+                f"_extract_{field}[{name}]",
+                lambda extract=extract: len([extract(div) for div in post_divs]),
+                repeat
+            ))
+
+    bodies, graphql_expected = generator.generate_graphql(posts)
+    check_graphql(bodies, graphql_expected)
+    results.append(measure("graphql_extract", lambda: len(GraphQLPostExtractor().extract(bodies)), repeat))
+
+    samples = generator.engagement_strings(5_000)
+    number_parser = FacebookParser(None, backend=backends[0]) if backends else None
+    if number_parser is not None:
+        results.append(measure("_parse_number", lambda: sum(1 for text, _ in samples if number_parser._parse_number(text) is not None), repeat))
+
+    results.append(measure("PostModel", lambda: len([PostModel(**post) for post in expected]), repeat))
+
+    hasher = MinHasher()
+    signatures = [(str(i), post["text"], hasher.signature(post["text"])) for i, post in enumerate(expected)]
+    results.append(measure("minhash_signature", lambda: len([hasher.signature(post["text"]) for post in expected]), repeat))
+
+    def lsh_assign():
+        index = LSHIndex(path=None)
+        return len([index.assign(fingerprint, text, signature) for fingerprint, text, signature in signatures])
+    results.append(measure("lsh_assign", lsh_assign, repeat))
+
+    client_factory = _mongomock_client(batch_size=500)
+    if client_factory is None:
+        logger.warning("⚠️ mongomock indisponible : benchmark de stockage ignoré.")
+    else:
+        def insert():
+            client = client_factory()
+            client.collection.delete_many({})
+            return client.insert_many_posts([PostModel(**post) for post in expected]).inserted
+        results.append(measure("insert_many_posts[mongomock]", insert, max(1, repeat // 5)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def insert_sqlite():
+            with SQLiteStorage(":memory:", batch_size=500) as storage:
+                return storage.insert_many_posts([PostModel(**post) for post in expected]).inserted
+        results.append(measure("insert_many_posts[sqlite]", insert_sqlite, max(1, repeat // 5)))
+
+        def insert_jsonl():
+            path = os.path.join(tmp, "posts.jsonl")
+            if os.path.exists(path):
+                os.remove(path)
+            with JsonLinesStorage(path, batch_size=500) as storage:
+                return storage.insert_many_posts([PostModel(**post) for post in expected]).inserted
+        results.append(measure("insert_many_posts[jsonl]", insert_jsonl, max(1, repeat // 5)))
+
+    def pipeline():
+        with SQLiteStorage(":memory:", batch_size=200) as storage:
+            return PipelineRunner(storage, parse_workers=2).run([html])["posts"]
+    results.append(measure("pipeline[sqlite]", pipeline, max(1, repeat // 5)))
+    return results
+
+
+def compare(results: List[Dict], baseline: Dict, threshold: float) -> List[str]:
+    """Retourne la liste des régressions (débit inférieur à la baseline de plus de 'threshold')."""
+    regressions = []
+    for result in results:
+        reference = baseline.get(result["name"])
+        if not reference or not reference.get("throughput"):
+            continue
+        ratio = result["throughput"] / reference["throughput"]
+        if ratio < 1 - threshold:
+            regressions.append(f"{result['name']} : {result['throughput']} /s contre {reference['throughput']} /s ({(ratio - 1) * 100:+.1f} %)")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmarks hors ligne du parser et du stockage")
+    parser.add_argument("--posts", type=int, default=100, help="Nombre de posts de la page synthétique")
+    parser.add_argument("--text-words", type=int, default=80, help="Nombre moyen de mots par post")
+    parser.add_argument("--images", type=int, default=2, help="Nombre d'images par post")
+    parser.add_argument("--repeat", type=int, default=20, help="Nombre d'itérations mesurées par benchmark")
+    parser.add_argument("--seed", type=int, default=42, help="Graine du générateur")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="Fichier de baseline JSON")
+    parser.add_argument("--save-baseline", action="store_true", help="Enregistre les résultats comme baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Baisse de débit tolérée avant échec (0.2 = 20 %%)")
+    parser.add_argument("--json", dest="json_path", help="Écrit aussi le rapport complet en JSON")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    results = run_all(args.posts, args.repeat, args.seed, args.text_words, args.images)
+
+    print(f"{'benchmark':<36}{'débit/s':>14}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'pic Ko':>10}")
+    for r in results:
+        print(f"{r['name']:<36}{r['throughput']:>14}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['peak_kb']:>10}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "results": results}, f, indent=2, ensure_ascii=False)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({r["name"]: r for r in results}, f, indent=2, ensure_ascii=False)
+        logger.info("💾 Baseline enregistrée : %s", args.baseline)
+        return 0
+
+    baseline: Optional[Dict] = None
+    try:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        logger.warning("⚠️ Aucune baseline : lancer avec --save-baseline pour en créer une.")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        for line in regressions:
+            logger.error("📉 Régression : %s", line)
+        return 1
+    logger.info("✅ Aucune régression au-delà du seuil.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+# cluster.py
+from selenium_scraper.minhash import MinHasher, signature_from_hex, signature_to_hex
+from storage.factory import STORAGE_KINDS, create_storage
+from storage.lsh_index import DEFAULT_INDEX_PATH, DEFAULT_THRESHOLD, LSHIndex
+from utils.logger import setup_logger, short_id
+
+from collections import Counter
+import argparse
+import os
+import time
+
+"""
+Regroupement hors ligne des quasi-doublons déjà stockés (voir pipeline/dedup.py).
+
+Chaque post reçoit un 'cluster_id' (empreinte du premier post de son groupe) et sa signature
+MinHash ; seuls les posts dont le groupe change sont réécrits.
+
+Usage :
+    python cluster.py --storage sqlite --dry-run
+    python cluster.py --threshold 0.7 --rebuild-index
+"""
+
+logger = setup_logger(__name__)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Regroupe les quasi-doublons déjà stockés (MinHash + LSH)")
+    parser.add_argument("--storage", choices=STORAGE_KINDS, help="Moteur de stockage (défaut : FB_SCRAPER_STORAGE ou mongo)")
+    parser.add_argument("--storage-path", help="Fichier du moteur sqlite/jsonl (défaut : FB_SCRAPER_STORAGE_PATH ou data/)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Similarité minimale entre deux posts d'un même groupe")
+    parser.add_argument("--batch-size", type=int, default=500, help="Taille des lots d'écriture")
+    parser.add_argument("--rebuild-index", action="store_true",
+                        help="Réécrit l'index LSH persistant utilisé par --near-duplicates (sinon index en mémoire)")
+    parser.add_argument("--index-path", default=DEFAULT_INDEX_PATH, help="Fichier de l'index LSH persistant")
+    parser.add_argument("--dry-run", action="store_true", help="Calcule les groupes sans écrire en base")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    storage = create_storage(args.storage, args.storage_path, batch_size=args.batch_size)
+
+    if args.rebuild_index and not args.dry_run and os.path.exists(args.index_path):
+        os.remove(args.index_path)
+    index = LSHIndex(args.index_path if args.rebuild_index and not args.dry_run else None, threshold=args.threshold)
+    hasher = MinHasher(index.num_perm)
+    logger.info("🧬 Regroupement des quasi-doublons : seuil %.2f, %d bandes x %d lignes.",
+                args.threshold, index.bands, index.rows)
+
+    posts, skipped, missing_fingerprint, changed = 0, 0, 0, 0
+    sizes = Counter()
+    batch = []
+    start = time.perf_counter()
+    for doc in storage.iter_posts():
+        posts += 1
+        fingerprint = doc.get("fingerprint")
+        if not fingerprint:
+            missing_fingerprint += 1
+            continue
+        encoded = doc.get("minhash")
+        signature = signature_from_hex(encoded) if encoded else hasher.signature(doc.get("text"))
+        if signature is None or len(signature) != index.num_perm:
+            skipped += 1
+            continue
+        cluster_id, _ = index.assign(fingerprint, doc.get("text"), signature)
+        sizes[cluster_id] += 1
+        if doc.get("cluster_id") == cluster_id and encoded:
+            continue
+        changed += 1
+        if args.dry_run:
+            continue
+        doc = {k: v for k, v in doc.items() if k != "_id"}
+        doc["minhash"] = encoded or signature_to_hex(signature)
+        doc["cluster_id"] = cluster_id
+        batch.append(doc)
+        if len(batch) >= args.batch_size:
+            storage.insert_many_posts(batch, upsert=True)
+            batch = []
+
+    if batch:
+        storage.insert_many_posts(batch, upsert=True)
+    index.close()
+    storage.close()
+
+    if missing_fingerprint:
+        logger.warning("⚠️ %d posts sans empreinte ignorés : lancer d'abord MongoDBClient.migrate_fingerprints().",
+                       missing_fingerprint)
+    groups = [size for size in sizes.values() if size > 1]
+    logger.info(
+        "✅ %d posts en %.1fs : %d groupes de quasi-doublons (%d posts), %d posts %s, %d sans texte.",
+        posts, time.perf_counter() - start, len(groups), sum(groups), changed,
+        "à mettre à jour (--dry-run)" if args.dry_run else "mis à jour", skipped
+    )
+    for cluster_id, size in sizes.most_common(5):
+        if size > 1:
+            logger.info("   🧬 %s : %d posts", short_id(cluster_id), size)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,37 @@
 import json
 import os
+import threading
 
-# Chemin vers le fichier credentials.json
+# Chemin vers le fichier credentials.json (surchargeable par la variable d'environnement FB_SCRAPER_CREDENTIALS)
 CREDENTIALS_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'credentials.json')
 
+_config = None
+_lock = threading.Lock()
+
 # Chargement du JSON
 def load_config():
-    with open(CREDENTIALS_PATH, 'r') as f:
-        return json.load(f)
+    path = os.environ.get("FB_SCRAPER_CREDENTIALS", CREDENTIALS_PATH)
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        # Sans fichier, seules les variables d'environnement sont utilisées
+        return {}
 
-# Objet config global
-config = load_config()
+# Objet config global, chargé au premier accès (aucune I/O à l'import)
+def get_config():
+    global _config
+    if _config is None:
+        with _lock:
+            if _config is None:
+                _config = load_config()
+    return _config
 
-# Fonction utilitaire pour accéder aux secrets
+# Fonction utilitaire pour accéder aux secrets (la variable d'environnement du même nom est prioritaire)
 def get_secret(key, default=None):
-    value = config.get(key, default)
+    value = os.environ.get(key)
+    if value is None:
+        value = get_config().get(key, default)
     if value is None:
-        raise ValueError(f"⚠️ Secret '{key}' manquant dans credentials.json")
-    return value
\ No newline at end of file
+        raise ValueError(f"⚠️ Secret '{key}' manquant (variable d'environnement ou credentials.json)")
+    return value
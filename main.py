@@ -1,52 +1,202 @@
 # main.py
 from selenium_scraper.scraper import FacebookScraper
 from selenium_scraper.parser import FacebookParser
-from selenium_scraper.model import PostModel
-from storage.mongo_client import MongoDBClient
+from selenium_scraper.minhash import MinHasher
+from selenium_scraper.pool import ScraperPool, load_queries
+from storage.factory import STORAGE_KINDS, create_storage
+from config.config import get_secret
+from pipeline.runner import PipelineRunner
+from pipeline.incremental import IncrementalCrawler
+from pipeline.media import MediaDownloader
+from pipeline.dedup import NearDuplicateDetector
+from storage.lsh_index import DEFAULT_THRESHOLD, LSHIndex
+from storage.snapshot_archive import SnapshotArchive
 from utils.logger import setup_logger
+from utils.metrics import metrics
 
-from pprint import pprint
-import time
+import argparse
+import os
 
 logger = setup_logger(__name__)
 
-def main():
-    # 1. Initialisation du scraper avec les identifiants (à sécuriser dans credentials.json ou .env dans la vraie vie)
-    scraper = FacebookScraper(email="horokaeri@gmail.com", password="p4#ZrdSiC8\\Z=2Q", headless=False)
 
-    # 2. Connexion à Facebook
-    scraper.login()
+def load_credentials():
+    """Identifiants Facebook : variables d'environnement FB_EMAIL / FB_PASSWORD, sinon credentials.json."""
+    return get_secret("FB_EMAIL"), get_secret("FB_PASSWORD")
 
-    # 3. Rechercher un sujet
-    """Pour laisser l'utilisateur choisir le sujet de recherche"""
-    #query = input("🔍 Entrez le sujet à rechercher sur Facebook : ")
-    
-    scraper.go_to_search('Jacques Chirac')
-    
-    #On laisse le temps à la page de charger complètement
-    time.sleep(10)
 
-    # 4. Préparation HTML (clics + scrolls pour charger plus de contenu)
-    scraper.prepare_html_with_scrolls(scrolls=5)
-    
-    # 5. Récupération du HTML complet de la page
-    html = scraper.driver.page_source
-    
-    # 6. Parser le HTML et extraire les posts
-    parser = FacebookParser(html)
-    parsed_posts = parser.parse_all()
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scraper de posts Facebook publics vers MongoDB (ou SQLite / JSONL)")
+    parser.add_argument("-q", "--query", action="append", default=[], help="Sujet à rechercher (option répétable)")
+    parser.add_argument("-f", "--queries-file", help="Fichier de sujets, un par ligne")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Nombre de navigateurs en parallèle")
+    parser.add_argument("--headless", action="store_true", help="Lance Chrome sans interface")
+    parser.add_argument("--lean", action="store_true", help="Bloque images, vidéos, polices et traceurs dans Chrome")
+    parser.add_argument("--scrolls", type=int, default=50, help="Nombre maximal de cycles de scroll par sujet")
+    parser.add_argument("--max-idle-cycles", type=int, default=3, help="Arrêt après N cycles sans nouveau post")
+    parser.add_argument("--rate-limit", type=float, default=30.0, help="Secondes minimum entre deux sujets d'un même worker")
+    parser.add_argument("--graphql", action="store_true", help="Lit les posts dans les réponses GraphQL (capture réseau) plutôt que dans le HTML")
+    parser.add_argument("--pipeline", action="store_true", help="Scraping, parsing et stockage en parallèle (mode streaming)")
+    parser.add_argument("--parse-workers", type=int, default=2, help="Nombre de workers de parsing en mode pipeline")
+    parser.add_argument("--archive", action="store_true", help="Archive le HTML capturé (compressé) pour re-parse hors ligne")
+    parser.add_argument("--metrics-dir", help="Active les métriques et écrit fb_scraper.prom + run_report.json dans ce dossier")
+    parser.add_argument("--incremental", action="store_true", help="Re-crawl : arrêt sur les posts déjà connus, mise à jour des compteurs")
+    parser.add_argument("--stop-after-known", type=int, default=10, help="Posts connus consécutifs avant l'arrêt (mode incrémental)")
+    parser.add_argument("--retries", type=int, default=3, help="Nombre maximal de tentatives par sujet")
+    parser.add_argument("--storage", choices=STORAGE_KINDS, help="Moteur de stockage (défaut : FB_SCRAPER_STORAGE ou mongo)")
+    parser.add_argument("--storage-path", help="Fichier du moteur sqlite/jsonl (défaut : FB_SCRAPER_STORAGE_PATH ou data/)")
+    parser.add_argument("--download-images", action="store_true", help="Télécharge les images des posts (stockage adressé par contenu, data/media)")
+    parser.add_argument("--media-workers", type=int, default=8, help="Téléchargements d'images simultanés")
+    parser.add_argument("--near-duplicates", action="store_true", help="Rattache les quasi-doublons à un groupe (cluster_id, index LSH data/lsh_index.jsonl)")
+    parser.add_argument("--similarity-threshold", type=float, default=DEFAULT_THRESHOLD, help="Similarité minimale (0-1) entre quasi-doublons")
+    return parser.parse_args()
+
+
+def create_media(args):
+    """Étape média optionnelle (--download-images), partagée par tous les lots de l'exécution."""
+    return MediaDownloader(workers=args.media_workers) if args.download_images else None
+
+
+def create_dedup(args):
+    """Étape optionnelle de détection des quasi-doublons (--near-duplicates)."""
+    return NearDuplicateDetector(LSHIndex(threshold=args.similarity_threshold)) if args.near_duplicates else None
+
+
+def prepare_posts(posts, dedup=None, media=None):
+    """Étapes optionnelles avant l'écriture : groupe de quasi-doublons, puis images."""
+    if dedup is not None:
+        dedup.process(posts)
+    if media is not None:
+        media.process(posts)
+    return posts
+
+
+def run_single(query: str, args):
+    email, password = load_credentials()
+    storage = create_storage(args.storage, args.storage_path)
+    dedup, media = create_dedup(args), create_media(args)
+    scraper = None
+    try:
+        # 1. Initialisation du scraper avec les identifiants
+        scraper = FacebookScraper(email=email, password=password, headless=args.headless, lean=args.lean,
+                                  capture_graphql=args.graphql)
+
+        # 2. Connexion à Facebook
+        scraper.login()
+
+        # 3. Rechercher un sujet
+        scraper.go_to_search(query)
 
-    # 7. Affichage formaté des résultats
-    for post in parsed_posts:
-        logger.debug(post)  # Grâce à __repr__
+        if args.incremental:
+            crawler = IncrementalCrawler(stop_after_known=args.stop_after_known,
+                                         minhasher=MinHasher() if args.near_duplicates else None)
+            crawler.run(scraper, query, storage, scrolls=args.scrolls, max_idle_cycles=args.max_idle_cycles,
+                        media=media, dedup=dedup)
+            return
+
+        if args.graphql:
+            # Capture réseau : posts lus dans les réponses JSON, sans parsing HTML (repli HTML si rien n'est capturé)
+            post_models = [post for post in scraper.stream_graphql_posts(scrolls=args.scrolls, max_idle_cycles=args.max_idle_cycles)
+                           if post.is_valid()]
+            storage.insert_many_posts(prepare_posts(post_models, dedup, media))
+            return
+
+        if args.pipeline:
+            # Scraping, parsing et stockage en parallèle, fragment par fragment
+            runner = PipelineRunner(storage, parse_workers=args.parse_workers, media=media, dedup=dedup,
+                                    minhasher=MinHasher() if args.near_duplicates else None)
+            fragments = scraper.stream_post_fragments(scrolls=args.scrolls, max_idle_cycles=args.max_idle_cycles)
+            if args.archive:
+                fragments = SnapshotArchive().tee(fragments, query)
+            runner.run(fragments)
+            return
+
+        # 4. Préparation HTML (clics + scrolls jusqu'à ce que plus aucun post ne se charge)
+        # 5. Récupération du HTML complet de la page (page_source, sérialisé une seule fois et mesuré)
+        html = scraper.prepare_html_with_scrolls(scrolls=args.scrolls, max_idle_cycles=args.max_idle_cycles)
+        if args.archive:
+            SnapshotArchive().save(html, query)
+
+        # 6. Parser le HTML et extraire les posts
+        parser = FacebookParser(html, minhasher=MinHasher() if args.near_duplicates else None)
+        parsed_posts = parser.parse_all()
+
+        # 7. Affichage formaté des résultats
+        for post in parsed_posts:
+            logger.debug(post)  # Grâce à __repr__
+
+        # 8. Conversion en objets PostModel
+        post_models = [post for post in parsed_posts if post.is_valid()]
+
+        # 9. Quasi-doublons et images (optionnels) puis sauvegarde (MongoDB, SQLite ou JSONL selon --storage)
+        storage.insert_many_posts(prepare_posts(post_models, dedup, media))
+    finally:
+        # Navigateur fermé et stockage libéré quelle que soit l'issue (retour anticipé ou erreur)
+        if scraper is not None:
+            try:
+                scraper.driver.quit()
+            except Exception:
+                logger.warning("⚠️ Fermeture du navigateur impossible.")
+        for step in (dedup, media):
+            if step is not None:
+                step.close()
+        storage.close()
+
+
+def run_pool(queries, args):
+    """Plusieurs sujets : un pool de navigateurs, un seul écrivain vers le stockage (ce processus)."""
+    email, password = load_credentials()
+    storage = create_storage(args.storage, args.storage_path)
+    storage.preload_seen()
+    dedup, media = create_dedup(args), create_media(args)
+
+    def store_posts(query, posts):
+        return storage.insert_many_posts(prepare_posts(posts, dedup, media))
+
+    pool = ScraperPool(
+        email=email,
+        password=password,
+        workers=args.workers,
+        headless=args.headless,
+        rate_limit=args.rate_limit,
+        max_retries=args.retries,
+        scrolls=args.scrolls,
+        max_idle_cycles=args.max_idle_cycles,
+        lean=args.lean,
+        archive=args.archive,
+        metrics_dir=args.metrics_dir,
+        incremental=args.incremental,
+        stop_after_known=args.stop_after_known,
+        graphql=args.graphql,
+        signatures=args.near_duplicates
+    )
+    pool.run(
+        queries,
+        on_posts=store_posts,
+        on_updates=lambda query, updates: storage.update_engagement(updates)
+    )
+
+
+def main():
+    args = parse_args()
+
+    """Pour laisser l'utilisateur choisir le sujet de recherche"""
+    #query = input("🔍 Entrez le sujet à rechercher sur Facebook : ")
+    queries = load_queries(args.queries_file, args.query) or ['Jacques Chirac']
 
-        
-    # 8. Conversion en objets PostModel
-    post_models = [post for post in parsed_posts if post.is_valid()]
+    if args.metrics_dir:
+        metrics.enable()
 
-    # 9. Sauvegarde dans MongoDB
-    mongo = MongoDBClient()
-    mongo.insert_many_posts(post_models)
+    try:
+        if len(queries) == 1 and args.workers <= 1:
+            run_single(queries[0], args)
+        else:
+            run_pool(queries, args)
+    finally:
+        if args.metrics_dir:
+            metrics.write_prometheus(os.path.join(args.metrics_dir, "fb_scraper.prom"))
+            metrics.write_json_report(os.path.join(args.metrics_dir, "run_report.json"))
+            logger.info("📊 Métriques écrites dans %s", args.metrics_dir)
     
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,75 @@
+# pipeline/dedup.py
+
+from selenium_scraper.minhash import MinHasher, signature_from_hex, signature_to_hex
+from selenium_scraper.model import compute_fingerprint
+from storage.lsh_index import LSHIndex
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+from typing import Dict, Iterable
+import time
+
+"""
+Étape de détection des quasi-doublons (reposts, copier-coller aux espaces ou emoji près,
+variantes tronquées « En voir plus ») : chaque post reçoit le 'cluster_id' de son groupe
+dans l'index LSH persistant. Les traitements en aval comparent les groupes, pas les posts deux à deux.
+"""
+
+
+def _field(post, name: str):
+    return post.get(name) if isinstance(post, dict) else getattr(post, name, None)
+
+
+def _set_field(post, name: str, value):
+    if isinstance(post, dict):
+        post[name] = value
+    else:
+        setattr(post, name, value)
+
+
+class NearDuplicateDetector:
+    """
+    Args:
+        index (LSHIndex): Index persistant des signatures (défaut : data/lsh_index.jsonl).
+        hasher (MinHasher): Calcule la signature des posts qui n'en ont pas (non signés au parsing).
+    """
+
+    def __init__(self, index: LSHIndex = None, hasher: MinHasher = None):
+        self.logger = setup_logger(__name__)
+        self.index = index if index is not None else LSHIndex()
+        self.hasher = hasher if hasher is not None else MinHasher(self.index.num_perm)
+
+    def process(self, posts: Iterable) -> Dict:
+        """
+        Renseigne 'minhash' et 'cluster_id' des posts (modifiés en place) et les ajoute à l'index.
+        Un post sans quasi-doublon connu ouvre un groupe : son cluster_id est sa propre empreinte.
+
+        Returns:
+            dict: {'posts', 'clustered' (rattachés à un groupe existant), 'new_clusters', 'skipped', 'elapsed'}.
+        """
+        start = time.perf_counter()
+        stats = {"posts": 0, "clustered": 0, "new_clusters": 0, "skipped": 0}
+        for post in posts:
+            stats["posts"] += 1
+            text = _field(post, "text")
+            fingerprint = _field(post, "fingerprint") or compute_fingerprint(_field(post, "page_name"), text)
+            encoded = _field(post, "minhash")
+            signature = signature_from_hex(encoded) if encoded else self.hasher.signature(text)
+            if signature is None:
+                stats["skipped"] += 1
+                continue
+            cluster_id, _ = self.index.assign(fingerprint, text, signature)
+            _set_field(post, "minhash", encoded or signature_to_hex(signature))
+            _set_field(post, "cluster_id", cluster_id)
+            stats["new_clusters" if cluster_id == fingerprint else "clustered"] += 1
+        self.index.flush()
+        stats["elapsed"] = round(time.perf_counter() - start, 3)
+        metrics.inc("dedup_clustered_total", stats["clustered"])
+        metrics.inc("dedup_new_clusters_total", stats["new_clusters"])
+        if stats["clustered"]:
+            self.logger.info("🧬 %d quasi-doublons rattachés à un groupe existant (%d nouveaux groupes).",
+                             stats["clustered"], stats["new_clusters"])
+        return stats
+
+    def close(self):
+        self.index.close()
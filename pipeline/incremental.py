@@ -0,0 +1,115 @@
+# pipeline/incremental.py
+
+from selenium_scraper.minhash import MinHasher
+from selenium_scraper.parser import FacebookParser
+from storage.crawl_state import CrawlStateStore
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+"""
+Re-crawl incrémental d'un sujet déjà crawlé :
+- arrêt du scroll dès qu'une série de 'stop_after_known' posts consécutifs déjà connus est atteinte ;
+- posts nouveaux → insertion ; posts connus dont les commentaires/partages ont changé → mise à jour groupée.
+
+L'état du sujet n'est enregistré (commit) qu'après l'écriture : un post dont l'insertion ou la mise à jour
+a échoué n'est pas retenu comme connu, et le prochain crawl le renvoie.
+"""
+
+
+class IncrementalCrawler:
+    """
+    Args:
+        state_store (CrawlStateStore): Stockage de l'état par sujet.
+        stop_after_known (int): Nombre de posts connus consécutifs qui arrête le scroll.
+        backend (str): Backend du FacebookParser.
+        minhasher (MinHasher): Si fourni, signature MinHash des nouveaux posts calculée au parsing.
+    """
+
+    def __init__(self, state_store: CrawlStateStore = None, stop_after_known: int = 10, backend: str = "auto",
+                 minhasher: Optional[MinHasher] = None):
+        self.logger = setup_logger(__name__)
+        self.state_store = state_store or CrawlStateStore()
+        self.stop_after_known = stop_after_known
+        self.backend = backend
+        self.minhasher = minhasher
+
+    def collect(self, scraper, query: str, scrolls: int = 50,
+                max_idle_cycles: int = 3) -> Tuple[List[Dict], List[Dict], List[List]]:
+        """
+        Scrape le sujet (la page de recherche doit déjà être ouverte) en mode streaming.
+
+        Returns:
+            (nouveaux posts, mises à jour d'engagement, delta d'état) — le delta ([empreinte, commentaires,
+            partages] de chaque post vu) est à passer à commit() une fois l'écriture faite. Rien n'est sauvegardé ici.
+        """
+        state = self.state_store.load(query)
+        parser = FacebookParser(None, backend=self.backend, minhasher=self.minhasher)
+        fragments = scraper.stream_post_fragments(scrolls=scrolls, max_idle_cycles=max_idle_cycles)
+        new_posts, updates, delta = [], [], []
+        consecutive_known, seen = 0, set()
+
+        try:
+            for post in parser.parse_stream(fragments):
+                if post.fingerprint in seen:
+                    continue
+                seen.add(post.fingerprint)
+                previous = state.engagement_of(post.fingerprint)
+                delta.append([post.fingerprint, post.comments, post.shares])
+                if previous is None:
+                    consecutive_known = 0
+                    new_posts.append(post.to_dict())
+                    continue
+
+                consecutive_known += 1
+                if previous != (post.comments, post.shares):
+                    updates.append({"fingerprint": post.fingerprint, "comments": post.comments, "shares": post.shares})
+                if consecutive_known >= self.stop_after_known:
+                    self.logger.info("⏹️ %d posts connus d'affilée : arrêt du scroll pour '%s'.", consecutive_known, query)
+                    metrics.inc("fb_incremental_early_stops_total")
+                    break
+        finally:
+            # Arrête immédiatement le scroll (le générateur du scraper est fermé)
+            fragments.close()
+
+        metrics.inc("fb_incremental_new_posts_total", len(new_posts))
+        metrics.inc("fb_incremental_engagement_updates_total", len(updates))
+        self.logger.info("🔁 '%s' : %d nouveaux posts, %d compteurs modifiés.", query, len(new_posts), len(updates))
+        return new_posts, updates, delta
+
+    def commit(self, query: str, delta: Iterable[List], inserted=None, updated=None):
+        """
+        Enregistre le delta de collect() dans l'état du sujet, après l'écriture.
+
+        Args:
+            inserted (BulkInsertResult): Résultat de l'insertion des nouveaux posts ; ses 'failed_ids' ne sont pas retenus.
+            updated (BulkInsertResult): Résultat de update_engagement ; les posts de ses 'failed_ids' gardent
+                leurs anciens compteurs de référence (la mise à jour sera refaite au prochain crawl).
+        """
+        failed = set(getattr(inserted, "failed_ids", None) or ())
+        failed.update(getattr(updated, "failed_ids", None) or ())
+        state = self.state_store.load(query)
+        for fingerprint, comments, shares in delta:
+            if fingerprint not in failed:
+                state.remember(fingerprint, comments, shares)
+        self.state_store.save(state)
+        if failed:
+            self.logger.warning("⚠️ '%s' : %d posts non écrits, ils ne sont pas retenus comme connus.", query, len(failed))
+
+    def run(self, scraper, query: str, storage, scrolls: int = 50, max_idle_cycles: int = 3,
+            media=None, dedup=None) -> Dict:
+        """
+        collect() puis écriture : insertion des nouveaux posts et mise à jour groupée des compteurs.
+        Si 'dedup' (ex : NearDuplicateDetector) ou 'media' (ex : MediaDownloader) sont fournis,
+        les nouveaux posts sont rattachés à leur groupe de quasi-doublons puis leurs images téléchargées avant l'insertion.
+        """
+        new_posts, updates, delta = self.collect(scraper, query, scrolls=scrolls, max_idle_cycles=max_idle_cycles)
+        if dedup is not None:
+            dedup.process(new_posts)
+        if media is not None:
+            media.process(new_posts)
+        inserted = storage.insert_many_posts(new_posts)
+        updated = storage.update_engagement(updates)
+        self.commit(query, delta, inserted, updated)
+        return {"inserted": inserted, "updated": updated}
@@ -0,0 +1,214 @@
+# pipeline/media.py
+
+from selenium_scraper.selector_registry import IMAGE_REQUIRED_HOST
+from storage.media_store import MediaStore
+from utils.logger import setup_logger, short_id
+from utils.metrics import metrics
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import mimetypes
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+"""
+Étape média optionnelle : téléchargement des images des posts avant leur expiration.
+
+Les URL fbcdn sont signées (paramètres oh/oe/_nc_*) et servies par des hôtes de CDN
+interchangeables : la même image réapparaît sous des URL différentes. Chaque URL est réduite
+à une clé stable (chemin + variante 'stp'), téléchargée une seule fois par stockage, en parallèle
+(pool de threads borné, une Session requests partagée : connexions réutilisées, reprises
+automatiques), et le hash du contenu est enregistré sur le post ('image_hashes').
+"""
+
+# Paramètres qui changent le contenu servi (taille / recadrage) : conservés dans la clé
+_VARIANT_PARAMS = ("stp",)
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+_DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept": "image/avif,image/webp,image/*,*/*;q=0.8",
+}
+
+
+def normalize_image_url(url: str) -> Optional[str]:
+    """
+    Clé stable d'une URL d'image (None si l'URL n'est pas téléchargeable).
+
+    fbcdn : hôte, signature et paramètres de suivi ignorés ; seuls le chemin et la variante comptent.
+    Autres hôtes : URL sans fragment, paramètres triés.
+    """
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    if parts.scheme not in ("http", "https") or not parts.netloc:
+        return None
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    host = parts.hostname or ""
+    # Domaine fbcdn ou l'un de ses sous-domaines ('evilfbcdn.net' ou 'fbcdn.net.example.org' ne comptent pas)
+    if host == IMAGE_REQUIRED_HOST or host.endswith("." + IMAGE_REQUIRED_HOST):
+        variant = [(k, v) for k, v in query if k in _VARIANT_PARAMS]
+        return f"{IMAGE_REQUIRED_HOST}{parts.path}" + (f"?{urlencode(variant)}" if variant else "")
+    return f"{parts.netloc.lower()}{parts.path}" + (f"?{urlencode(sorted(query))}" if query else "")
+
+
+def _images_of(post) -> List[str]:
+    return (post.get("images") if isinstance(post, dict) else post.images) or []
+
+
+def _set_hashes(post, hashes: List[Optional[str]]):
+    if isinstance(post, dict):
+        post["image_hashes"] = hashes
+    else:
+        post.image_hashes = hashes
+
+
+class MediaDownloader:
+    """
+    Args:
+        store (MediaStore): Stockage adressé par contenu (défaut : data/media).
+        workers (int): Téléchargements simultanés (taille du pool de threads et du pool de connexions).
+        timeout (float): Délai (s) de connexion et de lecture par requête.
+        max_retries (int): Reprises sur erreur réseau ou statut 429/5xx, avec attente exponentielle.
+        backoff (float): Facteur d'attente entre reprises (0.5 → 0.5s, 1s, 2s...).
+        max_bytes (int): Taille maximale d'une image ; au-delà, le téléchargement est abandonné.
+    """
+
+    def __init__(self, store: MediaStore = None, workers: int = 8, timeout: float = 15.0,
+                 max_retries: int = 3, backoff: float = 0.5, max_bytes: int = 20_000_000):
+        self.logger = setup_logger(__name__)
+        self.store = store if store is not None else MediaStore()
+        self.workers = workers
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.session = self._build_session(workers, max_retries, backoff)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="media")
+        # Téléchargements en cours (clé -> future) : deux lots concurrents ne téléchargent pas la même image
+        self._in_flight = {}
+        # Réentrant : un téléchargement déjà terminé déclenche _forget dans _submit
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _build_session(workers: int, max_retries: int, backoff: float) -> requests.Session:
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff,
+            status_forcelist=_RETRY_STATUSES,
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=workers, max_retries=retry)
+        session = requests.Session()
+        session.headers.update(_DEFAULT_HEADERS)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def process(self, posts: Iterable) -> Dict:
+        """
+        Télécharge les images manquantes de ces posts et renseigne 'image_hashes'
+        (même ordre que 'images', None pour une image en échec). Modifie les posts en place.
+
+        Returns:
+            dict: {'images', 'unique', 'cached', 'downloaded', 'failed', 'elapsed'}.
+        """
+        start = time.perf_counter()
+        posts = list(posts)
+        stats = {"images": 0, "unique": 0, "cached": 0, "downloaded": 0, "failed": 0}
+
+        post_keys: List[List[Tuple[Optional[str], str]]] = []
+        pending, cached = {}, set()
+        for post in posts:
+            keys = [(normalize_image_url(url), url) for url in _images_of(post)]
+            post_keys.append(keys)
+            for key, url in keys:
+                stats["images"] += 1
+                if key is None or key in pending or key in cached:
+                    continue
+                if key in self.store:
+                    cached.add(key)
+                    continue
+                pending[key] = self._submit(key, url)
+        stats["cached"] = len(cached)
+        stats["unique"] = len(cached) + len(pending)
+
+        results = {}
+        for key, future in pending.items():
+            results[key] = future.result()
+            stats["downloaded" if results[key] else "failed"] += 1
+
+        for post, keys in zip(posts, post_keys):
+            if keys:
+                _set_hashes(post, [self.store.lookup(key) if key else None for key, _ in keys])
+
+        stats["elapsed"] = round(time.perf_counter() - start, 3)
+        metrics.inc("media_cached_total", stats["cached"])
+        if pending:
+            self.logger.info(
+                "🖼️ Images : %d téléchargées, %d déjà connues, %d échecs (%d URL, %.2fs)",
+                stats["downloaded"], stats["cached"], stats["failed"], stats["images"], stats["elapsed"]
+            )
+        return stats
+
+    def _submit(self, key: str, url: str):
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self._executor.submit(self._download, key, url)
+                self._in_flight[key] = future
+                future.add_done_callback(lambda _, key=key: self._forget(key))
+            return future
+
+    def _forget(self, key: str):
+        with self._lock:
+            self._in_flight.pop(key, None)
+
+    def _download(self, key: str, url: str) -> Optional[str]:
+        """Télécharge une image et l'ajoute au stockage. Retourne son hash, ou None en cas d'échec."""
+        if key in self.store:
+            return self.store.lookup(key)
+        started = time.perf_counter()
+        try:
+            with self.session.get(url, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+                if content_type and not content_type.startswith("image/"):
+                    raise ValueError(f"type de contenu inattendu : {content_type}")
+                chunks, size = [], 0
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise ValueError(f"image de plus de {self.max_bytes} octets")
+                    chunks.append(chunk)
+        except (requests.RequestException, ValueError) as e:
+            metrics.inc("media_failed_total")
+            self.logger.warning("⚠️ Échec du téléchargement de %s : %s", short_id(key, 60), e)
+            return None
+        content = b"".join(chunks)
+        digest = self.store.put(key, content, self._extension(url, content_type))
+        metrics.observe("media_download_seconds", time.perf_counter() - started)
+        metrics.inc("media_downloaded_total")
+        metrics.inc("media_bytes_total", len(content))
+        return digest
+
+    @staticmethod
+    def _extension(url: str, content_type: str) -> str:
+        extension = mimetypes.guess_extension(content_type) if content_type else None
+        if not extension:
+            extension = os.path.splitext(urlsplit(url).path)[1][:5]
+        return ".jpg" if extension in (".jpe", ".jpeg") else extension or ""
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
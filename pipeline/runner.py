@@ -0,0 +1,218 @@
+# pipeline/runner.py
+
+from selenium_scraper.minhash import MinHasher
+from selenium_scraper.parser import FacebookParser
+from utils.logger import setup_logger
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional
+import multiprocessing as mp
+import queue
+import threading
+import time
+
+"""
+Exécution en pipeline : scraping → parsing → stockage en parallèle.
+
+- le scraping (Selenium) reste dans le thread appelant, seul à piloter le navigateur ;
+- le parsing tourne dans des threads, éventuellement délégué à un pool de processus (CPU) ;
+- le stockage tourne dans un thread dédié qui écrit par lots.
+Les étapes sont reliées par des files bornées : une étape lente freine les précédentes
+au lieu de faire grossir la mémoire. La première erreur arrête tout le pipeline et est relancée.
+"""
+
+# Marqueur de fin de flux entre deux étapes
+_END = object()
+
+# Backend de parsing propre à chaque processus du pool (créé au premier fragment)
+_process_parser = None
+
+
+def _parse_in_process(fragment: str, backend: str, minhasher: Optional[MinHasher] = None) -> List[Dict]:
+    global _process_parser
+    if _process_parser is None:
+        _process_parser = FacebookParser(None, backend=backend, minhasher=minhasher)
+    return [post.to_dict() for post in _process_parser.parse_stream([fragment])]
+
+
+class PipelineError(RuntimeError):
+    """Erreur survenue dans une étape du pipeline (la cause est dans __cause__)."""
+
+
+class PipelineRunner:
+    """
+    Args:
+        storage: Objet exposant insert_many_posts(posts) (ex : MongoDBClient).
+        parse_workers (int): Nombre de threads de parsing.
+        use_processes (bool): Parse dans un pool de processus (parse_workers processus) plutôt qu'en thread.
+        backend (str): Backend du FacebookParser.
+        queue_size (int): Capacité de chaque file entre étapes.
+        batch_size (int): Nombre de posts par écriture.
+        flush_interval (float): Délai maximal (secondes) avant d'écrire un lot incomplet.
+        media: Objet exposant process(posts) (ex : MediaDownloader), appelé sur chaque lot avant l'écriture.
+        dedup: Objet exposant process(posts) (ex : NearDuplicateDetector), appelé sur chaque lot avant 'media'.
+        minhasher (MinHasher): Si fourni, signature MinHash calculée à l'étape de parsing (threads ou processus)
+            plutôt qu'à l'étape de stockage par 'dedup'.
+    """
+
+    def __init__(self, storage, parse_workers: int = 2, use_processes: bool = False, backend: str = "auto",
+                 queue_size: int = 64, batch_size: int = 200, flush_interval: float = 2.0, media=None, dedup=None,
+                 minhasher: Optional[MinHasher] = None):
+        self.logger = setup_logger(__name__)
+        self.storage = storage
+        self.parse_workers = max(1, parse_workers)
+        self.use_processes = use_processes
+        self.backend = backend
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.media = media
+        self.dedup = dedup
+        self.minhasher = minhasher
+
+    def run(self, fragments: Iterable[str]) -> Dict:
+        """Consomme les fragments HTML (ex : FacebookScraper.stream_post_fragments) jusqu'au bout et retourne les statistiques."""
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._lock = threading.Lock()
+        self._parsers_alive = self.parse_workers
+        self._stats = {"fragments": 0, "posts": 0, "batches": 0, "storage": None,
+                       "parse_time": 0.0, "store_time": 0.0}
+        fragment_queue = queue.Queue(maxsize=self.queue_size)
+        post_queue = queue.Queue(maxsize=self.queue_size * 4)
+        # 'spawn' : le processus courant a déjà des threads (étapes, écouteur de logs) ; un fork pourrait hériter d'un verrou pris
+        executor = (ProcessPoolExecutor(max_workers=self.parse_workers, mp_context=mp.get_context("spawn"))
+                    if self.use_processes else None)
+
+        threads = [
+            threading.Thread(target=self._guard, args=(self._parse_stage, fragment_queue, post_queue, executor),
+                             name=f"pipeline-parse-{i}", daemon=True)
+            for i in range(self.parse_workers)
+        ]
+        threads.append(threading.Thread(target=self._guard, args=(self._store_stage, post_queue),
+                                        name="pipeline-store", daemon=True))
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        try:
+            # Étape 1 : scraping dans le thread appelant
+            for fragment in fragments:
+                if not self._put(fragment_queue, fragment):
+                    break
+                self._stats["fragments"] += 1
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            for _ in range(self.parse_workers):
+                self._put(fragment_queue, _END, force=True)
+            for thread in threads:
+                thread.join()
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        self._stats["elapsed"] = round(time.perf_counter() - start, 3)
+        if self._error is not None:
+            raise PipelineError(f"Échec du pipeline : {self._error}") from self._error
+        self.logger.info(
+            "✅ Pipeline terminé : %d fragments, %d posts, %d lots en %ss",
+            self._stats["fragments"], self._stats["posts"], self._stats["batches"], self._stats["elapsed"]
+        )
+        return self._stats
+
+    def _guard(self, stage, *args):
+        try:
+            stage(*args)
+        except BaseException as e:
+            self._fail(e)
+
+    def _fail(self, error: BaseException):
+        with self._lock:
+            if self._error is None:
+                self._error = error
+                self.logger.error("❌ Erreur dans le pipeline : %r", error)
+        self._stop.set()
+
+    def _put(self, q: queue.Queue, item, force: bool = False) -> bool:
+        """Put bloquant (contre-pression) qui abandonne si le pipeline s'arrête, sauf pour les marqueurs de fin."""
+        while True:
+            if self._stop.is_set() and not force:
+                return False
+            try:
+                q.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                if self._stop.is_set() and force:
+                    # Les consommateurs sont arrêtés : on vide la file pour passer le marqueur
+                    try:
+                        q.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def _parse_stage(self, fragment_queue: queue.Queue, post_queue: queue.Queue, executor):
+        try:
+            # Dans le try : un backend introuvable doit quand même transmettre _END à l'étape de stockage
+            parser = None if executor is not None else FacebookParser(None, backend=self.backend, minhasher=self.minhasher)
+            while True:
+                fragment = fragment_queue.get()
+                if fragment is _END:
+                    return
+                if self._stop.is_set():
+                    continue
+                started = time.perf_counter()
+                if executor is not None:
+                    posts = executor.submit(_parse_in_process, fragment, self.backend, self.minhasher).result()
+                else:
+                    posts = list(parser.parse_stream([fragment]))
+                with self._lock:
+                    self._stats["parse_time"] += time.perf_counter() - started
+                for post in posts:
+                    if not self._put(post_queue, post):
+                        break
+        finally:
+            with self._lock:
+                self._parsers_alive -= 1
+                last = self._parsers_alive == 0
+            if last:
+                self._put(post_queue, _END, force=True)
+
+    def _store_stage(self, post_queue: queue.Queue):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = post_queue.get(timeout=max(0.05, deadline - time.monotonic()))
+            except queue.Empty:
+                if self._stop.is_set():
+                    # Pipeline arrêté et file vide : plus rien à écrire (le marqueur de fin peut ne jamais venir)
+                    break
+                item = None
+            if item is _END:
+                break
+            if item is not None:
+                batch.append(item)
+            if len(batch) >= self.batch_size or (batch and time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+        if batch and not self._stop.is_set():
+            self._flush(batch)
+
+    def _flush(self, batch: List):
+        if self._stop.is_set():
+            return
+        started = time.perf_counter()
+        if self.dedup is not None:
+            self.dedup.process(batch)
+        if self.media is not None:
+            self.media.process(batch)
+        result = self.storage.insert_many_posts(batch)
+        self._stats["store_time"] += time.perf_counter() - started
+        self._stats["posts"] += len(batch)
+        self._stats["batches"] += 1
+        if result is not None and hasattr(result, "merge"):
+            if self._stats["storage"] is None:
+                self._stats["storage"] = result
+            else:
+                self._stats["storage"].merge(result)
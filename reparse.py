@@ -0,0 +1,134 @@
+# reparse.py
+from selenium_scraper.batch import ParquetStreamWriter, PostBatch
+from selenium_scraper.parser import FacebookParser
+from storage.factory import STORAGE_KINDS, create_storage
+from storage.snapshot_archive import DEFAULT_ARCHIVE_DIR, SNAPSHOT_ERRORS, SnapshotArchive, load_snapshot
+from utils.logger import setup_logger
+
+from typing import Dict, List, Optional, Tuple
+import argparse
+import multiprocessing as mp
+import os
+import time
+
+"""
+Re-parse hors ligne des captures HTML archivées (voir storage/snapshot_archive.py).
+
+Usage :
+    python reparse.py --workers 8 --backend lxml
+    python reparse.py --query "Jacques Chirac" --since 2024-06-01 --dry-run
+    python reparse.py --dry-run --export-parquet posts.parquet --export-ndjson posts.ndjson
+"""
+
+logger = setup_logger(__name__)
+
+# Parser propre à chaque processus du pool (initialisé par _init_worker)
+_parser = None
+
+
+def _init_worker(backend: str):
+    global _parser
+    _parser = FacebookParser(None, backend=backend)
+
+
+def _reparse_snapshot(path: str) -> Tuple[str, int, List[Dict], Optional[str]]:
+    """
+    Décompresse et parse une capture. Retourne (chemin, taille HTML, posts, erreur).
+    Une capture absente ou corrompue renvoie l'erreur au lieu de lever : le re-parse continue.
+    """
+    try:
+        html = load_snapshot(path)
+    except SNAPSHOT_ERRORS as e:
+        return path, 0, [], f"{type(e).__name__}: {e}"
+    _parser.html = html
+    return path, len(html), [post.to_dict() for post in _parser.parse_all()], None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Re-parse des captures HTML archivées vers le stockage (MongoDB, SQLite ou JSONL)")
+    parser.add_argument("--archive-dir", default=DEFAULT_ARCHIVE_DIR, help="Racine de l'archive")
+    parser.add_argument("--query", help="Ne re-parse que les captures de ce sujet")
+    parser.add_argument("--since", help="Date ISO minimale des captures (ex : 2024-06-01)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Nombre de processus de parsing")
+    parser.add_argument("--backend", default="auto", help="Backend du parser (auto, lxml, bs4)")
+    parser.add_argument("--batch-size", type=int, default=500, help="Taille des lots d'écriture")
+    parser.add_argument("--storage", choices=STORAGE_KINDS, help="Moteur de stockage (défaut : FB_SCRAPER_STORAGE ou mongo)")
+    parser.add_argument("--storage-path", help="Fichier du moteur sqlite/jsonl (défaut : FB_SCRAPER_STORAGE_PATH ou data/)")
+    parser.add_argument("--upsert", action="store_true", help="Met à jour les posts existants au lieu de les ignorer")
+    parser.add_argument("--dry-run", action="store_true", help="Parse sans écrire en base")
+    parser.add_argument("--export-ndjson", help="Exporte aussi les posts en NDJSON (ajout en fin de fichier)")
+    parser.add_argument("--export-parquet", help="Exporte aussi les posts en Parquet (nécessite pyarrow)")
+    parser.add_argument("--export-batch-size", type=int, default=50_000, help="Nombre de posts par lot d'export")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    archive = SnapshotArchive(args.archive_dir)
+    paths = [archive.path_of(m) for m in archive.iter_snapshots(query=args.query, since=args.since)]
+    if not paths:
+        logger.warning("⚠️ Aucune capture à re-parser.")
+        return
+    logger.info("🗄️ %s captures à re-parser avec %s processus (backend : %s).", len(paths), args.workers, args.backend)
+
+    storage = None if args.dry_run else create_storage(args.storage, args.storage_path, batch_size=args.batch_size)
+    parquet = ParquetStreamWriter(args.export_parquet) if args.export_parquet else None
+    exporting = bool(args.export_ndjson or parquet)
+    export_batch = PostBatch()
+    snapshots, html_bytes, total_posts, unreadable = 0, 0, 0, 0
+    batch = []
+    start = time.perf_counter()
+
+    def flush_export():
+        # Colonnes → fichiers, puis nouveau lot : la mémoire reste bornée par --export-batch-size
+        nonlocal export_batch
+        if args.export_ndjson:
+            export_batch.write_ndjson(args.export_ndjson)
+        if parquet is not None:
+            parquet.write(export_batch)
+        export_batch = PostBatch()
+
+    # 'spawn' : pas de fork d'un processus qui fait déjà tourner des threads (écouteur de logs)
+    with mp.get_context("spawn").Pool(processes=args.workers, initializer=_init_worker, initargs=(args.backend,)) as pool:
+        for path, size, posts, error in pool.imap_unordered(_reparse_snapshot, paths, chunksize=4):
+            snapshots += 1
+            if error is not None:
+                unreadable += 1
+                logger.warning("⚠️ Capture illisible ignorée (%s) : %s", path, error)
+                continue
+            html_bytes += size
+            total_posts += len(posts)
+            if storage is not None:
+                batch.extend(posts)
+            if exporting:
+                export_batch.extend(posts)
+                if len(export_batch) >= args.export_batch_size:
+                    flush_export()
+            # Les résultats sont écrits au fil de l'eau, par lots
+            if storage is not None and len(batch) >= args.batch_size:
+                storage.insert_many_posts(batch, upsert=args.upsert)
+                batch = []
+            if snapshots % 100 == 0:
+                elapsed = time.perf_counter() - start
+                logger.info("⏱️ %s/%s captures (%.1f/s)", snapshots, len(paths), snapshots / elapsed)
+
+    if storage is not None and batch:
+        storage.insert_many_posts(batch, upsert=args.upsert)
+    if exporting:
+        flush_export()
+    if parquet is not None:
+        parquet.close()
+    if storage is not None:
+        storage.close()
+
+    elapsed = time.perf_counter() - start
+    logger.info(
+        "✅ %d captures, %d posts en %.1fs : %.1f captures/s, %.1f posts/s, %.1f Mo HTML/s",
+        snapshots, total_posts, elapsed, snapshots / elapsed, total_posts / elapsed, html_bytes / 1_000_000 / elapsed
+    )
+    if unreadable:
+        logger.warning("⚠️ %d captures illisibles (absentes, tronquées ou corrompues) ignorées.", unreadable)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+from selenium_scraper.model import PostModel
+
+from array import array
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Union
+import json
+
+"""
+Stockage en colonnes d'un grand nombre de posts, pour les exports analytiques (Parquet/Arrow, NDJSON).
+
+Au lieu d'un objet (et d'un dict) par post, PostBatch garde une colonne par champ :
+noms de page encodés par dictionnaire (chaque nom n'est stocké qu'une fois), compteurs en
+tableaux d'entiers typés avec masque de validité, images (et leurs hash) à plat avec offsets
+(disposition Arrow), empreintes en 16 octets binaires. 'minhash' et 'cluster_id' (quasi-doublons)
+sont des colonnes de chaînes, vides (None) quand l'étape n'a pas tourné.
+"""
+
+# Valeur stockée pour un compteur absent (le masque de validité fait foi)
+_NULL_INT = 0
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # export Parquet/Arrow optionnel
+    pyarrow = None
+
+
+def _require_pyarrow():
+    if pyarrow is None:
+        raise ImportError("L'export Arrow/Parquet nécessite le paquet 'pyarrow'.")
+
+
+class PostBatch:
+    """Lot de posts stocké en colonnes."""
+
+    def __init__(self):
+        self._page_names: List[str] = []
+        self._page_ids: Dict[str, int] = {}
+        self.page_index = array("I")
+        self.texts: List[str] = []
+        self.image_values: List[str] = []
+        self.image_offsets = array("Q", [0])
+        self.comments = array("q")
+        self.shares = array("q")
+        self.comments_valid = bytearray()
+        self.shares_valid = bytearray()
+        self.fingerprints = bytearray()
+        self.image_hash_values: List[Optional[str]] = []
+        self.image_hash_offsets = array("Q", [0])
+        self.minhashes: List[Optional[str]] = []
+        self.cluster_ids: List[Optional[str]] = []
+
+    @classmethod
+    def from_posts(cls, posts: Iterable[Union[PostModel, Dict]]) -> "PostBatch":
+        batch = cls()
+        batch.extend(posts)
+        return batch
+
+    @classmethod
+    def chunks(cls, posts: Iterable[Union[PostModel, Dict]], size: int = 50_000) -> Iterator["PostBatch"]:
+        """Découpe un flux de posts en lots de 'size' lignes (mémoire bornée pour les très gros exports)."""
+        batch = cls()
+        for post in posts:
+            batch.append(post)
+            if len(batch) >= size:
+                yield batch
+                batch = cls()
+        if len(batch):
+            yield batch
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def append(self, post: Union[PostModel, Dict]):
+        if isinstance(post, dict):
+            post = PostModel.from_dict(post)
+        page_name = post.page_name or ""
+        page_id = self._page_ids.get(page_name)
+        if page_id is None:
+            page_id = self._page_ids[page_name] = len(self._page_names)
+            self._page_names.append(page_name)
+        self.page_index.append(page_id)
+        self.texts.append(post.text or "")
+        self.image_values.extend(post.images)
+        self.image_offsets.append(len(self.image_values))
+        self.comments.append(post.comments if post.comments is not None else _NULL_INT)
+        self.comments_valid.append(post.comments is not None)
+        self.shares.append(post.shares if post.shares is not None else _NULL_INT)
+        self.shares_valid.append(post.shares is not None)
+        self.fingerprints += bytes.fromhex(post.fingerprint)
+        self.image_hash_values.extend(post.image_hashes)
+        self.image_hash_offsets.append(len(self.image_hash_values))
+        self.minhashes.append(post.minhash)
+        self.cluster_ids.append(post.cluster_id)
+
+    def extend(self, posts: Iterable[Union[PostModel, Dict]]):
+        for post in posts:
+            self.append(post)
+
+    @property
+    def page_names(self) -> List[str]:
+        """Dictionnaire des noms de page (indexé par page_index)."""
+        return self._page_names
+
+    def images_of(self, i: int) -> List[str]:
+        return self.image_values[self.image_offsets[i]:self.image_offsets[i + 1]]
+
+    def image_hashes_of(self, i: int) -> List[Optional[str]]:
+        return self.image_hash_values[self.image_hash_offsets[i]:self.image_hash_offsets[i + 1]]
+
+    def fingerprint_of(self, i: int) -> str:
+        return self.fingerprints[i * 16:(i + 1) * 16].hex()
+
+    def __iter__(self) -> Iterator[PostModel]:
+        for i in range(len(self)):
+            yield PostModel(
+                page_name=self._page_names[self.page_index[i]],
+                text=self.texts[i],
+                images=self.images_of(i),
+                comments=self.comments[i] if self.comments_valid[i] else None,
+                shares=self.shares[i] if self.shares_valid[i] else None,
+                image_hashes=self.image_hashes_of(i),
+                minhash=self.minhashes[i],
+                cluster_id=self.cluster_ids[i]
+            )
+
+    def write_ndjson(self, target: Union[str, IO[str]], append: bool = True) -> int:
+        """
+        Écrit une ligne JSON par post, directement depuis les colonnes (aucun dict intermédiaire).
+        Comme PostModel.to_dict, 'image_hashes', 'minhash' et 'cluster_id' n'apparaissent que s'ils sont renseignés.
+        Retourne le nombre de lignes écrites.
+        """
+        if isinstance(target, str):
+            with open(target, "a" if append else "w", encoding="utf-8") as f:
+                return self.write_ndjson(f)
+        dumps = json.dumps
+        encoded_pages = [dumps(name, ensure_ascii=False) for name in self._page_names]
+        for i in range(len(self)):
+            comments = str(self.comments[i]) if self.comments_valid[i] else "null"
+            shares = str(self.shares[i]) if self.shares_valid[i] else "null"
+            optional = ""
+            image_hashes = self.image_hashes_of(i)
+            if image_hashes:
+                optional += ',"image_hashes":' + dumps(image_hashes)
+            if self.minhashes[i]:
+                optional += ',"minhash":"' + self.minhashes[i] + '"'
+            if self.cluster_ids[i]:
+                optional += ',"cluster_id":"' + self.cluster_ids[i] + '"'
+            target.write(
+                '{"page_name":' + encoded_pages[self.page_index[i]]
+                + ',"text":' + dumps(self.texts[i], ensure_ascii=False)
+                + ',"images":' + dumps(self.images_of(i), ensure_ascii=False)
+                + ',"comments":' + comments
+                + ',"shares":' + shares
+                + ',"fingerprint":"' + self.fingerprint_of(i) + '"'
+                + optional + '}\n'
+            )
+        return len(self)
+
+    @staticmethod
+    def arrow_schema():
+        _require_pyarrow()
+        pa = pyarrow
+        return pa.schema([
+            ("page_name", pa.dictionary(pa.int32(), pa.string())),
+            ("text", pa.large_string()),
+            ("images", pa.list_(pa.string())),
+            ("comments", pa.int64()),
+            ("shares", pa.int64()),
+            ("fingerprint", pa.binary(16)),
+            ("image_hashes", pa.list_(pa.string())),
+            ("minhash", pa.string()),
+            ("cluster_id", pa.string()),
+        ])
+
+    def to_arrow(self):
+        """Table Arrow construite à partir des buffers des colonnes (noms de page en dictionnaire)."""
+        _require_pyarrow()
+        pa = pyarrow
+        schema = self.arrow_schema()
+
+        def nullable(values: array, validity: bytearray):
+            mask = pa.array([not v for v in validity], type=pa.bool_())
+            return pa.array(values, type=pa.int64(), mask=mask)
+
+        columns = [
+            pa.DictionaryArray.from_arrays(
+                pa.array(self.page_index, type=pa.int32()), pa.array(self._page_names, type=pa.string())
+            ),
+            pa.array(self.texts, type=pa.large_string()),
+            pa.ListArray.from_arrays(
+                pa.array(self.image_offsets, type=pa.int32()), pa.array(self.image_values, type=pa.string())
+            ),
+            nullable(self.comments, self.comments_valid),
+            nullable(self.shares, self.shares_valid),
+            pa.FixedSizeBinaryArray.from_buffers(pa.binary(16), len(self), [None, pa.py_buffer(bytes(self.fingerprints))]),
+            pa.ListArray.from_arrays(
+                pa.array(self.image_hash_offsets, type=pa.int32()), pa.array(self.image_hash_values, type=pa.string())
+            ),
+            pa.array(self.minhashes, type=pa.string()),
+            pa.array(self.cluster_ids, type=pa.string()),
+        ]
+        return pa.Table.from_arrays(columns, schema=schema)
+
+    def write_parquet(self, path: str, compression: str = "zstd"):
+        """Écrit le lot dans un fichier Parquet (un fichier par lot ; voir ParquetStreamWriter pour un flux)."""
+        pyarrow.parquet.write_table(self.to_arrow(), path, compression=compression)
+
+
+class ParquetStreamWriter:
+    """Écrit une suite de PostBatch dans un même fichier Parquet (un row group par lot)."""
+
+    def __init__(self, path: str, compression: str = "zstd"):
+        _require_pyarrow()
+        self._writer = pyarrow.parquet.ParquetWriter(path, PostBatch.arrow_schema(), compression=compression)
+        self.rows = 0
+
+    def write(self, batch: PostBatch):
+        if len(batch):
+            self._writer.write_table(batch.to_arrow())
+            self.rows += len(batch)
+
+    def close(self):
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,49 @@
+from utils.logger import setup_logger
+
+from collections import defaultdict
+from typing import Callable, Dict
+import json
+
+"""
+Accès aux événements Chrome DevTools (journal 'performance' de chromedriver).
+
+Le journal ne peut être lu qu'une fois (chaque lecture le vide) : un seul lecteur par navigateur
+le draine et redistribue les événements aux abonnés (blocage de ressources, capture réseau…).
+"""
+
+
+def enable_performance_logging(options):
+    """Active le journal 'performance' (événements Network.* de DevTools) dans les options Chrome."""
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+
+class PerformanceLogReader:
+    """Draine le journal 'performance' du navigateur et distribue les événements par méthode DevTools."""
+
+    def __init__(self, driver):
+        self.logger = setup_logger(__name__)
+        self.driver = driver
+        self._listeners = defaultdict(list)
+
+    def subscribe(self, method: str, callback: Callable[[Dict], None]):
+        """Abonne callback(params) aux événements 'method' (ex : 'Network.loadingFailed')."""
+        self._listeners[method].append(callback)
+
+    def poll(self) -> int:
+        """Lit les événements accumulés depuis le dernier appel et les distribue. Retourne leur nombre."""
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception as e:
+            self.logger.warning("⚠️ Lecture du journal DevTools impossible : %s", e)
+            return 0
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            for callback in self._listeners.get(message.get("method"), ()):
+                try:
+                    callback(message.get("params", {}))
+                except Exception:
+                    self.logger.exception("Erreur dans un abonné DevTools (%s)", message.get('method'))
+        return len(entries)
@@ -0,0 +1,292 @@
+from selenium_scraper import selector_registry as sel
+from selenium_scraper.model import PostModel
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import base64
+import json
+
+"""
+Extraction des posts depuis les réponses GraphQL de Facebook, sans rendu ni parsing HTML.
+
+La page de recherche reçoit ses résultats en JSON (/api/graphql/) : GraphQLCapture repère ces
+réponses dans le journal DevTools (voir devtools.PerformanceLogReader) et lit leur corps via
+Network.getResponseBody ; GraphQLPostExtractor décode ces corps (préfixe anti-JSON-hijacking,
+plusieurs objets JSON concaténés en mode @defer) et convertit chaque nœud 'Story' en PostModel,
+avec le texte complet (pas de "En voir plus") et des compteurs entiers exacts.
+"""
+
+GRAPHQL_URL_PATTERN = "/api/graphql/"
+# Préfixe ajouté par Facebook devant certaines réponses JSON
+_JSON_PREFIX = "for (;;);"
+STORY_TYPENAME = "Story"
+# Sous-arbres à ne pas explorer pour un post : post d'origine d'un partage et commentaires
+_SKIPPED_KEYS = frozenset({"attached_story", "comments", "comment_list_renderer", "top_level_comments"})
+_IMAGE_KEYS = frozenset({"photo_image", "image", "large_share_image", "viewer_image", "preferred_thumbnail"})
+
+# Script injecté : données JSON embarquées dans la page (premiers résultats, rendus côté serveur)
+_INITIAL_DATA_SCRIPT = """
+const payloads = [];
+for (const script of document.querySelectorAll('script[type="application/json"]')) {
+    const text = script.textContent;
+    if (text && text.includes('"__typename":"Story"')) payloads.push(text);
+}
+return payloads;
+"""
+
+
+def decode_graphql_payload(body: str) -> Iterator[Any]:
+    """Décode un corps de réponse GraphQL : préfixe 'for (;;);' retiré, objets JSON concaténés renvoyés un à un."""
+    if not body:
+        return
+    if body.startswith(_JSON_PREFIX):
+        body = body[len(_JSON_PREFIX):]
+    decoder = json.JSONDecoder()
+    index, length = 0, len(body)
+    while index < length:
+        while index < length and body[index].isspace():
+            index += 1
+        if index >= length:
+            break
+        try:
+            obj, index = decoder.raw_decode(body, index)
+        except json.JSONDecodeError:
+            # Fin de flux tronquée : on garde ce qui a déjà été décodé
+            metrics.inc("fb_graphql_decode_errors_total")
+            return
+        yield obj
+
+
+def iter_story_nodes(obj: Any) -> Iterator[Dict]:
+    """Parcourt (itérativement) un objet décodé et renvoie les nœuds 'Story' les plus externes."""
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if node.get("__typename") == STORY_TYPENAME and node.get("id"):
+                yield node
+                continue
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+
+def _walk(node: Any) -> Iterator[tuple]:
+    """Parcours en largeur d'un nœud de post : renvoie (clé, valeur) pour chaque entrée de dictionnaire."""
+    queue = deque([node])
+    while queue:
+        current = queue.popleft()
+        if isinstance(current, dict):
+            for key, value in current.items():
+                if key in _SKIPPED_KEYS:
+                    continue
+                yield key, value
+                if isinstance(value, (dict, list)):
+                    queue.append(value)
+        elif isinstance(current, list):
+            queue.extend(current)
+
+
+def _as_int(value: Any) -> Optional[int]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None
+
+
+class GraphQLPostExtractor:
+    """
+    Convertit les nœuds 'Story' des réponses GraphQL en PostModel.
+
+    extract() traite un lot de réponses indépendant ; feed() garde les fragments d'un flux entier
+    (réponses @defer arrivées plusieurs cycles de scroll plus tard) : voir FacebookScraper.stream_graphql_posts.
+    """
+
+    def __init__(self):
+        self.logger = setup_logger(__name__)
+        # Flux en cours : identifiant de story -> champs fusionnés, et posts déjà émis
+        self._stories: Dict[str, Dict] = {}
+        self._posts: Dict[str, PostModel] = {}
+
+    def extract(self, bodies: Iterable[str]) -> List[PostModel]:
+        """
+        Décode un ensemble de corps de réponse et retourne les posts trouvés.
+        Les fragments d'un même post (réponses différées @defer) sont fusionnés par identifiant.
+        """
+        stories: Dict[str, Dict] = {}
+        self._merge(bodies, stories)
+        posts = [self._build(fields) for fields in stories.values()]
+        metrics.inc("fb_graphql_stories_total", len(posts))
+        return posts
+
+    def feed(self, bodies: Iterable[str]) -> Tuple[List[PostModel], List[Dict]]:
+        """
+        Ajoute des réponses au flux en cours.
+
+        Un post n'est émis qu'une fois son texte et sa page connus ; les compteurs (ou images) reçus
+        ensuite sont appliqués au PostModel déjà émis, modifié en place.
+
+        Returns:
+            (nouveaux posts, mises à jour {'fingerprint', 'comments', 'shares'} des posts déjà émis
+            dont les compteurs ont changé, au format de StorageBackend.update_engagement).
+        """
+        new_posts, updates = [], []
+        for story_id in self._merge(bodies, self._stories):
+            fields = self._stories[story_id]
+            post = self._posts.get(story_id)
+            if post is None:
+                if fields.get("text") and fields.get("page_name"):
+                    post = self._posts[story_id] = self._build(fields)
+                    new_posts.append(post)
+                continue
+            if not post.images and fields.get("images"):
+                post.images = fields["images"]
+            counts = (fields.get("comments"), fields.get("shares"))
+            if counts != (post.comments, post.shares):
+                post.comments, post.shares = counts
+                updates.append({"fingerprint": post.fingerprint, "comments": post.comments, "shares": post.shares})
+        metrics.inc("fb_graphql_stories_total", len(new_posts))
+        return new_posts, updates
+
+    def _merge(self, bodies: Iterable[str], stories: Dict[str, Dict]) -> List[str]:
+        """Fusionne les nœuds 'Story' des réponses dans 'stories' ; retourne les identifiants touchés (ordre d'arrivée)."""
+        touched: Dict[str, None] = {}
+        for body in bodies:
+            for obj in decode_graphql_payload(body):
+                for node in iter_story_nodes(obj):
+                    merged = stories.setdefault(node["id"], {})
+                    for key, value in self.story_fields(node).items():
+                        if value is None or value == []:
+                            continue
+                        # Texte, page, images : premier fragment renseigné ; compteurs : le plus récent
+                        if not merged.get(key) or key in ("comments", "shares"):
+                            merged[key] = value
+                    touched[node["id"]] = None
+        return list(touched)
+
+    @staticmethod
+    def _build(fields: Dict) -> PostModel:
+        return PostModel(
+            page_name=fields.get("page_name"),
+            text=fields.get("text"),
+            images=fields.get("images"),
+            comments=fields.get("comments"),
+            shares=fields.get("shares")
+        )
+
+    def story_fields(self, story: Dict) -> Dict:
+        """Champs d'un nœud 'Story' : page, texte, images, commentaires, partages (None si absents)."""
+        fields = {"page_name": None, "text": None, "images": [], "comments": None, "shares": None}
+        for key, value in _walk(story):
+            if key == "actors" and fields["page_name"] is None and isinstance(value, list) and value:
+                actor = value[0]
+                if isinstance(actor, dict) and isinstance(actor.get("name"), str):
+                    fields["page_name"] = actor["name"]
+            elif key == "message" and fields["text"] is None and isinstance(value, dict):
+                if isinstance(value.get("text"), str):
+                    fields["text"] = value["text"]
+            elif key in ("comment_count", "comments_count") and fields["comments"] is None and isinstance(value, dict):
+                fields["comments"] = _as_int(value.get("total_count"))
+            elif key == "comment_rendering_instance" and fields["comments"] is None and isinstance(value, dict):
+                fields["comments"] = _as_int((value.get("comments") or {}).get("total_count"))
+            elif key == "total_comment_count" and fields["comments"] is None:
+                fields["comments"] = _as_int(value)
+            elif key == "share_count" and fields["shares"] is None and isinstance(value, dict):
+                fields["shares"] = _as_int(value.get("count"))
+            elif key == "attachments":
+                fields["images"].extend(self._attachment_images(value))
+        # Ordre conservé, doublons retirés (même image sous plusieurs tailles d'aperçu)
+        fields["images"] = list(dict.fromkeys(fields["images"]))
+        return fields
+
+    @staticmethod
+    def _attachment_images(attachments: Any) -> Iterator[str]:
+        for key, value in _walk(attachments):
+            if key in _IMAGE_KEYS and isinstance(value, dict):
+                uri = value.get("uri")
+                if (isinstance(uri, str) and sel.IMAGE_REQUIRED_HOST in uri
+                        and not any(pattern in uri for pattern in sel.IMAGE_EXCLUDED_PATTERNS)):
+                    yield uri
+
+
+class GraphQLCapture:
+    """
+    Capture des réponses GraphQL d'un navigateur via le journal DevTools.
+
+    Args:
+        driver: WebDriver Chrome lancé avec le journal 'performance' (enable_performance_logging).
+        reader (PerformanceLogReader): Lecteur du journal partagé avec les autres abonnés (mode lean…).
+        url_pattern (str): Fragment d'URL des réponses à capturer.
+    """
+
+    def __init__(self, driver, reader, url_pattern: str = GRAPHQL_URL_PATTERN):
+        self.logger = setup_logger(__name__)
+        self.driver = driver
+        self.reader = reader
+        self.url_pattern = url_pattern
+        # requestId -> URL des réponses GraphQL en cours de chargement
+        self._pending: Dict[str, str] = {}
+        # requestId des réponses complètement reçues, corps pas encore lu
+        self._ready = deque()
+
+    def install(self):
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+        except Exception as e:
+            self.logger.warning("⚠️ Network.enable impossible : %s", e)
+        self.reader.subscribe("Network.responseReceived", self._on_response)
+        self.reader.subscribe("Network.loadingFinished", self._on_finished)
+        self.reader.subscribe("Network.loadingFailed", self._on_failed)
+
+    def _on_response(self, params: Dict):
+        url = params.get("response", {}).get("url", "")
+        if self.url_pattern in url:
+            self._pending[params.get("requestId")] = url
+
+    def _on_finished(self, params: Dict):
+        if params.get("requestId") in self._pending:
+            self._ready.append(params["requestId"])
+
+    def _on_failed(self, params: Dict):
+        self._pending.pop(params.get("requestId"), None)
+
+    def reset(self):
+        """Vide le journal DevTools et oublie les réponses en attente (avant une nouvelle navigation)."""
+        self.reader.poll()
+        self._pending.clear()
+        self._ready.clear()
+
+    def drain(self) -> List[str]:
+        """Lit le journal DevTools puis retourne le corps des réponses GraphQL terminées depuis le dernier appel."""
+        self.reader.poll()
+        bodies = []
+        while self._ready:
+            request_id = self._ready.popleft()
+            self._pending.pop(request_id, None)
+            try:
+                result = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            except Exception as e:
+                # Corps déjà évincé du cache de Chrome ou requête annulée
+                metrics.inc("fb_graphql_body_errors_total")
+                self.logger.debug("Corps GraphQL indisponible (%s) : %s", request_id, e)
+                continue
+            body = result.get("body", "")
+            if result.get("base64Encoded"):
+                body = base64.b64decode(body).decode("utf-8", errors="replace")
+            bodies.append(body)
+        metrics.inc("fb_graphql_responses_total", len(bodies))
+        metrics.inc("fb_graphql_bytes_total", sum(len(body) for body in bodies))
+        return bodies
+
+    def initial_payloads(self) -> List[str]:
+        """Données JSON embarquées dans la page courante (premiers résultats, qui ne passent pas par /api/graphql/)."""
+        try:
+            return self.driver.execute_script(_INITIAL_DATA_SCRIPT) or []
+        except Exception as e:
+            self.logger.warning("⚠️ Lecture des données embarquées impossible : %s", e)
+            return []
@@ -0,0 +1,118 @@
+from selenium_scraper.devtools import PerformanceLogReader
+from utils.logger import setup_logger
+
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+"""
+Mode "lean" : bloque dans Chrome les ressources inutiles au scraping (images, vidéos, polices, traceurs).
+
+Le blocage passe par DevTools (Network.setBlockedURLs) : la requête n'est jamais émise, mais
+le DOM est intact, donc les attributs 'src' des <img> restent lisibles par le parser.
+"""
+
+# Extensions bloquées par défaut (voir extension_patterns)
+BLOCKED_EXTENSIONS = (
+    # Images
+    "jpg", "jpeg", "png", "gif", "webp", "svg", "ico",
+    # Vidéos et flux
+    "mp4", "webm", "m3u8", "mpd",
+    # Polices
+    "woff", "woff2", "ttf", "otf",
+)
+
+
+def extension_patterns(extensions: Iterable[str]) -> tuple:
+    """
+    Motifs DevTools ('*' = joker, '?' littéral) ancrés sur la fin du chemin : '….png' ou '….png?…'.
+    Un motif '*.png*' bloquerait aussi 'app.icons.js' (pour 'ico') ou une requête dont un paramètre contient '.png'.
+    """
+    patterns = []
+    for extension in extensions:
+        patterns += [f"*.{extension}", f"*.{extension}?*"]
+    return tuple(patterns)
+
+
+# Motifs bloqués par défaut
+DEFAULT_BLOCK_PATTERNS = extension_patterns(BLOCKED_EXTENSIONS) + (
+    # Flux vidéo des hôtes video*.fbcdn.net
+    "*://video*.fbcdn.net/*",
+    # Traceurs et pixels
+    "*://*.facebook.com/tr?*", "*://*.facebook.com/tr/*", "*://connect.facebook.net/*", "*://*.facebook.com/ajax/bz*",
+)
+
+# Raison DevTools des requêtes bloquées par Network.setBlockedURLs (les autres : CSP, contenu mixte…)
+_BLOCKED_BY_US = "inspector"
+
+# Taille moyenne estimée (octets) d'une ressource bloquée par type DevTools : sert à estimer les octets économisés
+DEFAULT_ESTIMATED_SIZES = {
+    "Image": 60_000,
+    "Media": 1_500_000,
+    "Font": 40_000,
+    "Script": 50_000,
+    "Ping": 500,
+    "Other": 5_000,
+}
+
+
+class ResourceBlocker:
+    """
+    Bloque des ressources par motifs d'URL et compte les requêtes bloquées.
+
+    Args:
+        driver: Navigateur Chrome (Selenium).
+        reader (PerformanceLogReader): Lecteur du journal DevTools (pour compter les blocages).
+        block_patterns: Motifs à bloquer (défaut : DEFAULT_BLOCK_PATTERNS).
+        allow_patterns: Motifs toujours autorisés, prioritaires sur les motifs bloqués.
+        estimated_sizes: Taille moyenne par type de ressource pour l'estimation des octets économisés.
+    """
+
+    def __init__(self, driver, reader: Optional[PerformanceLogReader] = None,
+                 block_patterns: Optional[Iterable[str]] = None, allow_patterns: Optional[Iterable[str]] = None,
+                 estimated_sizes: Optional[Dict[str, int]] = None):
+        self.logger = setup_logger(__name__)
+        self.driver = driver
+        self.block_patterns = list(block_patterns) if block_patterns is not None else list(DEFAULT_BLOCK_PATTERNS)
+        self.allow_patterns = list(allow_patterns or [])
+        self.estimated_sizes = dict(DEFAULT_ESTIMATED_SIZES, **(estimated_sizes or {}))
+        self.blocked = 0
+        self.blocked_by_type = Counter()
+        self.estimated_bytes_saved = 0
+        self.reader = reader
+        if reader is not None:
+            reader.subscribe("Network.loadingFailed", self._on_loading_failed)
+
+    def install(self):
+        """Active le blocage dans le navigateur (à appeler une fois, avant la navigation)."""
+        self.driver.execute_cdp_cmd("Network.enable", {})
+        if self.allow_patterns:
+            # Les motifs 'urlPatterns' sont évalués dans l'ordre : les autorisations d'abord
+            url_patterns = [{"urlPattern": p, "block": False} for p in self.allow_patterns]
+            url_patterns += [{"urlPattern": p, "block": True} for p in self.block_patterns]
+            try:
+                self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urlPatterns": url_patterns})
+                self.logger.info("🪶 Mode lean : %s motifs bloqués, %s autorisés.", len(self.block_patterns), len(self.allow_patterns))
+                return
+            except Exception as e:
+                self.logger.warning("⚠️ Liste d'autorisation non supportée par ce Chrome, elle est ignorée : %s", e)
+        self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.block_patterns})
+        self.logger.info("🪶 Mode lean : %s motifs bloqués.", len(self.block_patterns))
+
+    def _on_loading_failed(self, params: Dict):
+        # Seules les requêtes bloquées par nos motifs comptent dans les octets économisés
+        if params.get("blockedReason") != _BLOCKED_BY_US:
+            return
+        resource_type = params.get("type", "Other")
+        self.blocked += 1
+        self.blocked_by_type[resource_type] += 1
+        self.estimated_bytes_saved += self.estimated_sizes.get(resource_type, self.estimated_sizes["Other"])
+
+    def stats(self) -> Dict:
+        """Compteurs de blocage (à jour après lecture du journal DevTools)."""
+        if self.reader is not None:
+            self.reader.poll()
+        return {
+            "blocked_requests": self.blocked,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "estimated_bytes_saved": self.estimated_bytes_saved,
+        }
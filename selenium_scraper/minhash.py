@@ -0,0 +1,134 @@
+from selenium_scraper import selector_registry as sel
+
+from typing import Optional, Tuple
+import hashlib
+import random
+import re
+import struct
+import unicodedata
+
+"""
+Signatures MinHash des textes de post, pour la détection de quasi-doublons (voir storage/lsh_index.py).
+
+Le texte est normalisé (casse, accents, emoji, ponctuation, espaces, URL, « En voir plus ») puis
+découpé en k-grammes de caractères ; la signature estime la similarité de Jaccard entre deux posts
+sans les comparer directement. Implémentation en Python pur (hash blake2b stables d'un processus
+à l'autre : les signatures sont persistées).
+"""
+
+DEFAULT_NUM_PERM = 64
+DEFAULT_SHINGLE_SIZE = 5
+# Hachage multiply-add-shift : (a * x + b) mod 2^64 avec 'a' impair, 32 bits de poids fort gardés
+# (un masque au lieu d'un modulo premier : deux fois plus rapide en Python)
+_MASK_64 = (1 << 64) - 1
+
+_URL_RE = re.compile(r"https?://\S+|www\.\S+")
+_NON_WORD_RE = re.compile(r"[^\w\s]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRUNCATION_MARKS = ("…", "...")
+_SEE_MORE = tuple(label.lower() for label in sel.SEE_MORE_LABELS)
+
+
+def is_truncated(text: Optional[str]) -> bool:
+    """Vrai si le texte se termine par « … » ou un libellé « En voir plus » (post non déplié)."""
+    if not text:
+        return False
+    tail = text.rstrip().lower()
+    for label in _SEE_MORE:
+        if tail.endswith(label):
+            return True
+    return tail.endswith(_TRUNCATION_MARKS)
+
+
+def normalize_for_similarity(text: Optional[str]) -> str:
+    """Forme canonique d'un texte pour la comparaison : sans accents, emoji, ponctuation, URL ni « En voir plus »."""
+    if not text:
+        return ""
+    value = unicodedata.normalize("NFKC", text).casefold()
+    for label in _SEE_MORE:
+        if value.rstrip().endswith(label):
+            value = value.rstrip()[:-len(label)]
+            break
+    value = _URL_RE.sub(" ", value)
+    value = "".join(c for c in unicodedata.normalize("NFKD", value) if not unicodedata.combining(c))
+    # Emoji et ponctuation ne sont pas des caractères de mot : remplacés par un espace
+    value = _NON_WORD_RE.sub(" ", value).replace("_", " ")
+    return _WHITESPACE_RE.sub(" ", value).strip()
+
+
+def shingles(normalized: str, size: int = DEFAULT_SHINGLE_SIZE) -> set:
+    """k-grammes de caractères du texte normalisé (le texte entier s'il est plus court que k)."""
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+class MinHasher:
+    """
+    Args:
+        num_perm (int): Nombre de permutations (longueur de la signature) : précision contre coût.
+        shingle_size (int): Taille des k-grammes de caractères.
+        seed (int): Graine des permutations ; doit rester la même pour des signatures comparables.
+    """
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, shingle_size: int = DEFAULT_SHINGLE_SIZE, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+        rng = random.Random(seed)
+        self._permutations = [(rng.getrandbits(64) | 1, rng.getrandbits(64)) for _ in range(num_perm)]
+
+    def signature(self, text: Optional[str]) -> Optional[Tuple[int, ...]]:
+        """Signature MinHash du texte (None si le texte normalisé est vide)."""
+        grams = shingles(normalize_for_similarity(text), self.shingle_size)
+        if not grams:
+            return None
+        hashes = [
+            int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "little")
+            for gram in grams
+        ]
+        return tuple(min([(a * h + b) & _MASK_64 for h in hashes]) >> 32 for a, b in self._permutations)
+
+    def hex_signature(self, text: Optional[str]) -> Optional[str]:
+        """Signature sous forme compacte (champ 'minhash' des posts), None si le texte normalisé est vide."""
+        signature = self.signature(text)
+        return signature_to_hex(signature) if signature else None
+
+    @staticmethod
+    def similarity(left: Tuple[int, ...], right: Tuple[int, ...]) -> float:
+        """Similarité de Jaccard estimée : part des positions égales entre deux signatures."""
+        if not left or not right or len(left) != len(right):
+            return 0.0
+        return sum(1 for a, b in zip(left, right) if a == b) / len(left)
+
+
+def signature_to_hex(signature: Tuple[int, ...]) -> str:
+    """Forme compacte et portable d'une signature (4 octets petit-boutiste par permutation)."""
+    return struct.pack(f"<{len(signature)}I", *signature).hex()
+
+
+def signature_from_hex(value: str) -> Tuple[int, ...]:
+    raw = bytes.fromhex(value)
+    return struct.unpack(f"<{len(raw) // 4}I", raw)
+
+
+def _integrate(func, start: float, end: float, steps: int = 100) -> float:
+    width = (end - start) / steps
+    return sum(func(start + (i + 0.5) * width) for i in range(steps)) * width
+
+
+def optimal_bands(num_perm: int, threshold: float, false_negative_weight: float = 0.8) -> Tuple[int, int]:
+    """
+    Découpage (bandes, lignes par bande) de la signature pour le LSH : minimise la somme pondérée
+    des probabilités de faux positifs (sous le seuil) et de faux négatifs (au-dessus).
+    Les faux négatifs pèsent plus : les candidats sont de toute façon vérifiés contre le seuil exact.
+    """
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        false_positive = _integrate(lambda s: 1 - (1 - s ** rows) ** bands, 0.0, threshold)
+        false_negative = _integrate(lambda s: (1 - s ** rows) ** bands, threshold, 1.0)
+        error = (1 - false_negative_weight) * false_positive + false_negative_weight * false_negative
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
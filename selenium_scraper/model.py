@@ -1,32 +1,93 @@
 from typing import List, Dict, Optional
+import hashlib
+import re
+import sys
+import unicodedata
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _normalize(value: Optional[str]) -> str:
+    """Normalise une chaîne pour l'identité d'un post (unicode NFKC, minuscules, espaces compactés)."""
+    if not value:
+        return ""
+    value = unicodedata.normalize("NFKC", value)
+    return _WHITESPACE_RE.sub(" ", value).strip().lower()
+
+
+def compute_fingerprint(page_name: Optional[str], text: Optional[str]) -> str:
+    """
+    Empreinte stable (32 caractères hexadécimaux) d'un post, calculée sur le nom de page
+    et le texte normalisés. Sert de clé d'unicité compacte dans MongoDB.
+    """
+    payload = f"{_normalize(page_name)}\x1f{_normalize(text)}".encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
 
 
 class PostModel:
+    # Pas de __dict__ par instance : empreinte mémoire réduite pour les gros volumes
+    __slots__ = ("page_name", "text", "images", "comments", "shares", "fingerprint", "image_hashes", "minhash", "cluster_id")
+
     def __init__(self,
                 page_name: str,
                 text: str,
                 images: Optional[List[str]] = None,
                 comments: Optional[int] = None,
-                shares: Optional[int] = None):
-        self.page_name = page_name.strip() if page_name else None
+                shares: Optional[int] = None,
+                image_hashes: Optional[List[Optional[str]]] = None,
+                minhash: Optional[str] = None,
+                cluster_id: Optional[str] = None):
+        # Nom de page interné : une seule chaîne partagée par tous les posts d'une même page
+        self.page_name = sys.intern(page_name.strip()) if page_name else None
         self.text = text.strip() if text else None
         self.images = images if images else []
         self.comments = comments
         self.shares = shares
+        self.fingerprint = compute_fingerprint(self.page_name, self.text)
+        # SHA-256 des images téléchargées (même ordre que images, None si échec), voir pipeline/media.py
+        self.image_hashes = image_hashes if image_hashes else []
+        # Signature MinHash du texte (hexadécimal) et groupe de quasi-doublons, voir storage/lsh_index.py
+        self.minhash = minhash
+        self.cluster_id = cluster_id
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PostModel":
+        """Reconstruit un PostModel depuis to_dict() (ou un document MongoDB) ; les clés inconnues sont ignorées."""
+        return cls(
+            page_name=data.get("page_name"),
+            text=data.get("text"),
+            images=data.get("images"),
+            comments=data.get("comments"),
+            shares=data.get("shares"),
+            image_hashes=data.get("image_hashes"),
+            minhash=data.get("minhash"),
+            cluster_id=data.get("cluster_id")
+        )
 
     def is_valid(self) -> bool:
         """Vérifie si le post est complet et prêt à être inséré."""
         return bool(self.page_name and self.text)
 
     def to_dict(self) -> Dict:
-        """Retourne un dictionnaire compatible MongoDB."""
-        return {
+        """
+        Retourne un dictionnaire compatible MongoDB. 'image_hashes', 'minhash' et 'cluster_id'
+        n'y figurent que si l'étape correspondante a tourné.
+        """
+        data = {
             "page_name": self.page_name,
             "text": self.text,
             "images": self.images,
             "comments": self.comments,
-            "shares": self.shares
+            "shares": self.shares,
+            "fingerprint": self.fingerprint
         }
+        if self.image_hashes:
+            data["image_hashes"] = self.image_hashes
+        if self.minhash:
+            data["minhash"] = self.minhash
+        if self.cluster_id:
+            data["cluster_id"] = self.cluster_id
+        return data
         
     def __repr__(self):
         return (
@@ -1,141 +1,129 @@
-from typing import List, Dict, Optional
-from bs4 import BeautifulSoup, Tag
+from typing import Dict, Iterable, Iterator, List, Optional
+from selenium_scraper.minhash import MinHasher
 from selenium_scraper.model import PostModel
-import re
+from selenium_scraper.parser_backends import extract_counts, get_backend, parse_number
+from selenium_scraper import selector_registry as sel
 
-from utils.logger import setup_logger
+from utils.logger import setup_logger, short_id
+from utils.metrics import metrics
+
+import time
 
 """
-Classe qui transforme les balises HTML d’un post Facebook (BeautifulSoup) en dictionnaires structurés prêts à être insérés dans une base de données
+Classe qui transforme les balises HTML d’un post Facebook en dictionnaires structurés prêts à être insérés dans une base de données.
+Le parsing est délégué à un backend interchangeable (voir parser_backends) :
+  - "lxml" : parsing en C et XPath compilés (rapide)
+  - "bs4"  : BeautifulSoup + html.parser (implémentation de référence)
+  - "auto" : lxml s'il est installé, sinon bs4
 """
 
 class FacebookParser:
-    def __init__(self, html: str):
-        """Initialise le parser avec la page HTML brute (Facebook search page)."""
+    def __init__(self, html: Optional[str] = None, backend: str = "auto", minhasher: Optional[MinHasher] = None):
+        """
+        Initialise le parser avec la page HTML brute (Facebook search page), ou sans HTML pour parse_stream.
+        Avec 'minhasher', la signature MinHash du texte est calculée pour chaque post (détection de quasi-doublons).
+        """
         self.logger = setup_logger(__name__)
-        self.soup = BeautifulSoup(html, "html.parser")
+        self.backend = get_backend(backend) if isinstance(backend, str) else backend
+        self.html = html
+        self.minhasher = minhasher
 
+    @metrics.timed("fb_parse_all_seconds")
     def parse_all(self) -> List[PostModel]:
         """Extrait tous les posts présents dans la page HTML."""
         try:
-            post_divs = self.soup.find_all("div", {"class": "x1n2onr6 x1ja2u2z"})
-            self.logger.info(f"{len(post_divs)} blocs de post trouvés.")
+            with metrics.timer("fb_parse_find_posts_seconds", backend=self.backend.name):
+                post_divs = self.backend.find_posts(self.html)
+            self.logger.info("%s blocs de post trouvés (backend : %s).", len(post_divs), self.backend.name)
         except Exception as e:
             self.logger.exception("Erreur lors de la recherche des blocs de post.")
             return []
 
-        parsed_posts = []
-        for post_div in post_divs:
+        return list(self._iter_valid_posts(post_divs))
+
+    def parse_stream(self, fragments: Iterable[str]) -> Iterator[PostModel]:
+        """
+        Parse au fil de l'eau des fragments HTML (un ou plusieurs blocs de post chacun),
+        par exemple ceux produits par FacebookScraper.stream_post_fragments.
+        """
+        for fragment in fragments:
+            try:
+                post_divs = self.backend.find_posts(fragment)
+            except Exception:
+                self.logger.exception("Erreur lors de la lecture d'un fragment HTML.")
+                continue
+            yield from self._iter_valid_posts(post_divs)
+
+    def _iter_valid_posts(self, post_divs) -> Iterator[PostModel]:
+        for index, post_div in enumerate(post_divs):
             try:
+                started = time.perf_counter() if metrics.enabled else 0.0
                 parsed_dict = self._parse_single_post(post_div)
                 post = PostModel(**parsed_dict)
+                metrics.observe("fb_parse_post_seconds", time.perf_counter() - started if metrics.enabled else 0.0,
+                                backend=self.backend.name)
                 if post.is_valid():
-                    parsed_posts.append(post)
+                    metrics.inc("fb_parsed_posts_total", backend=self.backend.name)
+                    if self.minhasher is not None:
+                        post.minhash = self.minhasher.hex_signature(post.text)
+                    yield post
                 else:
-                    self.logger.warning(f"Post {post_div} ignoré : données incomplètes.")
+                    metrics.inc("fb_skipped_posts_total", reason="incomplete")
+                    # Jamais le HTML du post dans les logs : index + extrait court
+                    self.logger.warning("Post #%d ignoré : données incomplètes (page=%s).", index, short_id(post.page_name))
             except Exception as e:
-                self.logger.exception(f"Erreur lors du parsing du post {post_div}")
-        return parsed_posts
+                metrics.inc("fb_skipped_posts_total", reason="error")
+                self.logger.exception("Erreur lors du parsing du post #%d", index)
     
-    def _parse_single_post(self, post_div: Tag) -> Dict:
-        """Extrait toutes les informations d'un seul post HTML"""
-        return {
-            "page_name": self._extract_page_name(post_div),
-            "text": self._extract_text(post_div),
-            "images": self._extract_images(post_div),
-            "comments": self._extract_comment_count(post_div),
-            "shares": self._extract_share_count(post_div)
-        }
+    def _parse_single_post(self, post_div) -> Dict:
+        """Extrait toutes les informations d'un seul post HTML, en une seule passe"""
+        return self.backend.extract(post_div)
 
-    def _extract_page_name(self, post_div: Tag) -> str:
+    def _extract_page_name(self, post_div) -> str:
         """Récupère le nom de la page Facebook ayant publié le post"""
         try:
-            page_div = post_div.find("div", {"data-ad-rendering-role": "profile_name"})
-            if page_div:
-                span = page_div.find("span")
-                while span and span.find("span"):
-                    span = span.find("span")
-                if span:
-                    return span.get_text(strip=True)
+            return self.backend.page_name(post_div)
         except Exception:
             self.logger.warning("Impossible d'extraire le nom de la page.")
         return None
 
-    def _extract_text(self, post_div: Tag) -> str:
+    def _extract_text(self, post_div) -> str:
         """Récupère le texte principal du post"""
         try:
-            message = post_div.find("div", {"data-ad-preview": "message"})
-            return message.get_text(strip=True) if message else None
+            return self.backend.text(post_div)
         except Exception:
             self.logger.warning("Erreur lors de l'extraction du texte.")
             return None
 
-    def _extract_images(self, post_div: Tag) -> List[str]:
+    def _extract_images(self, post_div) -> List[str]:
         """Récupère les URLs d’images du post et on filtre les stickers, emojis, et images inline (base64)"""
-        image_urls = []
         try:
-            for img in post_div.find_all("img"):
-                src = img.get("src", "")
-                if (
-                    src.startswith("http")
-                    and "fbcdn.net" in src
-                    and "emoji.php" not in src
-                    and "sticker" not in src
-                    and not src.startswith("data:image")
-                ):
-                    image_urls.append(src)
+            return self.backend.images(post_div)
         except Exception:
             self.logger.warning("Erreur lors de l'extraction des images.")
-            
-        return image_urls
+            return []
 
-    def _extract_comment_count(self, post_div: Tag) -> int:
+    def _extract_comment_count(self, post_div) -> int:
         """Récupère le nombre de commentaires (entier) d’un post"""
-        return self._extract_number(post_div, keyword="commentaire")
+        return self._extract_number(post_div, keyword=sel.COUNT_KEYWORDS["comments"])
 
-    def _extract_share_count(self, post_div: Tag) -> int:
+    def _extract_share_count(self, post_div) -> int:
         """Récupère le nombre de partages (entier) d’un post"""
-        return self._extract_number(post_div, keyword="partage")
+        return self._extract_number(post_div, keyword=sel.COUNT_KEYWORDS["shares"])
 
-    def _extract_number(self, post_div: Tag, keyword: str) -> int:
+    def _extract_number(self, post_div, keyword: str) -> int:
         """Extrait un nombre à partir d’un mot-clé (commentaire ou partage)"""
         try:
-            for span in post_div.find_all("span"):
-                text = span.get_text(" ", strip=True).lower()
-                text = text.replace("\xa0", " ").replace("&nbsp;", " ")
-                
-                # Évite les boutons "commenter" ou textes sans chiffres
-                if keyword in text and keyword + "s" in text and any(char.isdigit() for char in text):
-                    if not any(bad in text for bad in ["commenter", "partager"]):
-                        self.logger.debug(f"[{keyword}] ➕ Match trouvé dans : '{text}'")
-                        return self._parse_number(text)
-
-            self.logger.debug(f"[{keyword}] ❌ Aucun span correspondant trouvé dans ce post.")
-            return None
-
+            field = next(f for f, k in sel.COUNT_KEYWORDS.items() if k == keyword)
+            return extract_counts(self.backend.span_texts(post_div))[field]
         except Exception as e:
-            self.logger.warning(f"[{keyword}] ⚠️ Erreur lors de l'extraction : {e}")
+            self.logger.warning("[%s] ⚠️ Erreur lors de l'extraction : %s", keyword, e)
             return None
 
     def _parse_number(self, text: str) -> int:
         """Convertit un texte avec des formats abrégés (K, M) en entier | Exemple : "3,2 K commentaires" → 3200"""
         try:
-            match = re.search(r"(\d+(?:[.,]\d+)?)(?:\s*([km]))?", text.lower())
-            if not match:
-                self.logger.debug(f"🔎 Aucun nombre détecté dans : '{text}'")
-                return None
-
-            number = float(match.group(1).replace(",", "."))
-            suffix = match.group(2)
-
-            if suffix == "k":
-                number *= 1_000
-            elif suffix == "m":
-                number *= 1_000_000
-                
-            final_number = int(number)
-            self.logger.debug(f"✅ Nombre extrait : {final_number} à partir de '{text}'")
-            return int(number)
+            return parse_number(text)
         except Exception:
-            self.logger.warning(f"Erreur lors du parsing du nombre : '{text}'")
-            return None
\ No newline at end of file
+            self.logger.warning("Erreur lors du parsing du nombre : '%s'", text)
+            return None
@@ -0,0 +1,191 @@
+from typing import Dict, Iterable, List, Optional
+import re
+
+from selenium_scraper import selector_registry as sel
+
+"""
+Moteurs d'extraction du FacebookParser.
+
+Chaque backend sait trouver les blocs de post dans une page et extraire tous les champs
+d'un post en une seule passe. Les sélecteurs viennent de selector_registry, de sorte que
+les backends produisent des PostModel identiques.
+"""
+
+_NUMBER_RE = re.compile(r"(\d+(?:[.,]\d+)?)(?:\s*([km]))?")
+
+
+def parse_number(text: str) -> Optional[int]:
+    """Convertit un texte avec des formats abrégés (K, M) en entier | Exemple : "3,2 K commentaires" → 3200"""
+    match = _NUMBER_RE.search(text.lower())
+    if not match:
+        return None
+
+    number = float(match.group(1).replace(",", "."))
+    suffix = match.group(2)
+
+    if suffix == "k":
+        number *= 1_000
+    elif suffix == "m":
+        number *= 1_000_000
+    # round() et non int() : 32,3 K → 32299.999… en flottant
+    return int(round(number))
+
+
+def match_count_keyword(text: str, keyword: str) -> bool:
+    """Vrai si le texte d'un span est un compteur pour ce mot-clé (ex : '12 commentaires')."""
+    return (
+        keyword in text
+        and keyword + "s" in text
+        and any(char.isdigit() for char in text)
+        and not any(bad in text for bad in sel.COUNT_EXCLUDED_WORDS)
+    )
+
+
+def extract_counts(span_texts: Iterable[str]) -> Dict[str, Optional[int]]:
+    """Parcourt une seule fois les textes des spans et retourne tous les compteurs (premier match par mot-clé)."""
+    counts = dict.fromkeys(sel.COUNT_KEYWORDS)
+    remaining = dict(sel.COUNT_KEYWORDS)
+    for text in span_texts:
+        text = text.lower().replace("\xa0", " ").replace("&nbsp;", " ")
+        for field, keyword in list(remaining.items()):
+            if match_count_keyword(text, keyword):
+                counts[field] = parse_number(text)
+                del remaining[field]
+        if not remaining:
+            break
+    return counts
+
+
+def is_post_image(src: str) -> bool:
+    """Filtre les stickers, emojis et images inline (base64)."""
+    return (
+        src.startswith("http")
+        and sel.IMAGE_REQUIRED_HOST in src
+        and not any(pattern in src for pattern in sel.IMAGE_EXCLUDED_PATTERNS)
+        and not src.startswith("data:image")
+    )
+
+
+class BeautifulSoupBackend:
+    """Backend de référence (BeautifulSoup + html.parser, pur Python)."""
+
+    name = "bs4"
+
+    def __init__(self):
+        from bs4 import BeautifulSoup
+        self._soup_factory = BeautifulSoup
+
+    def find_posts(self, html: str) -> List:
+        soup = self._soup_factory(html, "html.parser")
+        return soup.find_all(sel.POST_CONTAINER_TAG, {"class": sel.POST_CONTAINER_CLASS})
+
+    def extract(self, post) -> Dict:
+        counts = extract_counts(span.get_text(" ", strip=True) for span in post.find_all("span"))
+        return {
+            "page_name": self.page_name(post),
+            "text": self.text(post),
+            "images": self.images(post),
+            "comments": counts["comments"],
+            "shares": counts["shares"]
+        }
+
+    def page_name(self, post) -> Optional[str]:
+        page_div = post.find("div", {sel.PAGE_NAME_ATTR[0]: sel.PAGE_NAME_ATTR[1]})
+        if page_div:
+            span = page_div.find("span")
+            while span and span.find("span"):
+                span = span.find("span")
+            if span:
+                return span.get_text(strip=True)
+        return None
+
+    def text(self, post) -> Optional[str]:
+        message = post.find("div", {sel.MESSAGE_ATTR[0]: sel.MESSAGE_ATTR[1]})
+        return message.get_text(strip=True) if message else None
+
+    def images(self, post) -> List[str]:
+        return [src for src in (img.get("src", "") for img in post.find_all("img")) if is_post_image(src)]
+
+    def span_texts(self, post) -> List[str]:
+        return [span.get_text(" ", strip=True) for span in post.find_all("span")]
+
+
+class LxmlBackend:
+    """Backend rapide : parsing en C (lxml) et expressions XPath compilées une seule fois."""
+
+    name = "lxml"
+
+    def __init__(self):
+        from lxml import etree, html as lxml_html
+        self._document_fromstring = lxml_html.document_fromstring
+        self._fragment_fromstring = lxml_html.fragment_fromstring
+        self._posts = etree.XPath(sel.POST_CONTAINER_XPATH)
+        # Variante relative pour un fragment dont la racine peut être le bloc de post lui-même
+        self._posts_self = etree.XPath(
+            f'descendant-or-self::{sel.POST_CONTAINER_TAG}[@class="{sel.POST_CONTAINER_CLASS}"]'
+        )
+        self._page_div = etree.XPath(f"({sel.PAGE_NAME_XPATH})[1]")
+        self._message = etree.XPath(f"({sel.MESSAGE_XPATH})[1]")
+        self._first_span = etree.XPath("(.//span)[1]")
+        self._spans = etree.XPath(".//span")
+        self._img_src = etree.XPath(".//img")
+        self._strings = etree.XPath(".//text()[not(ancestor::script) and not(ancestor::style)]")
+
+    def find_posts(self, html: str) -> List:
+        if not html or not html.strip():
+            return []
+        if html.lstrip()[:15].lower().startswith(("<!doctype", "<html")):
+            return self._posts(self._document_fromstring(html))
+        # Fragment HTML (mode streaming) : on l'enveloppe pour accepter plusieurs racines
+        return self._posts_self(self._fragment_fromstring(html, create_parent="div"))
+
+    def _stripped(self, element) -> List[str]:
+        return [s.strip() for s in self._strings(element) if s.strip()]
+
+    def extract(self, post) -> Dict:
+        counts = extract_counts(" ".join(self._stripped(span)) for span in self._spans(post))
+        return {
+            "page_name": self.page_name(post),
+            "text": self.text(post),
+            "images": self.images(post),
+            "comments": counts["comments"],
+            "shares": counts["shares"]
+        }
+
+    def page_name(self, post) -> Optional[str]:
+        page_div = self._page_div(post)
+        if page_div:
+            span = self._first_span(page_div[0])
+            while span and self._first_span(span[0]):
+                span = self._first_span(span[0])
+            if span:
+                return "".join(self._stripped(span[0]))
+        return None
+
+    def text(self, post) -> Optional[str]:
+        message = self._message(post)
+        return "".join(self._stripped(message[0])) if message else None
+
+    def images(self, post) -> List[str]:
+        return [src for src in (img.get("src", "") for img in self._img_src(post)) if is_post_image(src)]
+
+    def span_texts(self, post) -> List[str]:
+        return [" ".join(self._stripped(span)) for span in self._spans(post)]
+
+
+BACKENDS = {
+    BeautifulSoupBackend.name: BeautifulSoupBackend,
+    LxmlBackend.name: LxmlBackend,
+}
+
+
+def get_backend(name: str = "auto"):
+    """Instancie un backend par nom ('bs4', 'lxml' ou 'auto' : lxml s'il est installé, sinon bs4)."""
+    if name == "auto":
+        try:
+            return LxmlBackend()
+        except ImportError:
+            return BeautifulSoupBackend()
+    if name not in BACKENDS:
+        raise ValueError(f"Backend de parsing inconnu : {name!r} (disponibles : {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
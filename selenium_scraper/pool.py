@@ -0,0 +1,353 @@
+from selenium_scraper.parser import FacebookParser
+from selenium_scraper.model import PostModel
+from selenium_scraper.minhash import MinHasher
+from storage.snapshot_archive import SnapshotArchive
+from pipeline.incremental import IncrementalCrawler
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional
+import multiprocessing as mp
+import os
+import queue
+import random
+import time
+
+if TYPE_CHECKING:
+    from selenium_scraper.scraper import FacebookScraper
+
+"""
+Pool de workers pour scraper plusieurs sujets en parallèle.
+
+Chaque worker est un processus qui possède son propre FacebookScraper (et donc son propre Chrome).
+Le processus principal distribue les sujets un par un, dans la file propre à chaque worker : il sait
+toujours quel sujet est confié à quel worker. Les posts extraits remontent vers lui, seul à écrire
+dans le stockage. Un navigateur planté est relancé par son worker ; un worker mort est relancé par
+le superviseur et son sujet est remis en attente (nouvelle tentative).
+"""
+
+# Messages échangés sur la file de résultats : (type, worker_id, tâche, données)
+MSG_RESULT = "result"
+MSG_RETRY = "retry"
+MSG_FAILED = "failed"
+
+
+def load_queries(path: Optional[str] = None, queries: Iterable[str] = ()) -> List[str]:
+    """Construit la liste des sujets depuis un fichier (un par ligne, '#' pour commenter) et/ou une liste."""
+    result = [q.strip() for q in queries if q and q.strip()]
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            result.extend(line.strip() for line in f if line.strip() and not line.lstrip().startswith("#"))
+    # Sans doublons, en gardant l'ordre
+    return list(dict.fromkeys(result))
+
+
+class RateLimiter:
+    """Impose un intervalle minimal (avec une part aléatoire) entre deux sujets traités par un même worker."""
+
+    def __init__(self, min_interval: float, jitter: float = 0.25):
+        self.min_interval = min_interval
+        self.jitter = jitter
+        self._last = None
+
+    def wait(self):
+        if self._last is not None and self.min_interval > 0:
+            interval = self.min_interval * (1 + random.uniform(0, self.jitter))
+            remaining = interval - (time.monotonic() - self._last)
+            if remaining > 0:
+                time.sleep(remaining)
+        self._last = time.monotonic()
+
+
+def scrape_query(scraper: "FacebookScraper", query: str, scrolls: int = 50, max_idle_cycles: int = 3,
+                 archive: Optional[SnapshotArchive] = None, graphql: bool = False,
+                 minhasher: Optional[MinHasher] = None) -> List[PostModel]:
+    """
+    Scrape un sujet de bout en bout avec un scraper déjà connecté et retourne les posts valides.
+    Avec 'graphql', les posts sont lus dans les réponses réseau (rien à archiver).
+    Avec 'minhasher', la signature MinHash est calculée dans le worker (au parsing HTML ou à la lecture GraphQL).
+    """
+    scraper.go_to_search(query)
+    if graphql:
+        posts = [post for post in scraper.stream_graphql_posts(scrolls=scrolls, max_idle_cycles=max_idle_cycles)
+                 if post.is_valid()]
+        if minhasher is not None:
+            for post in posts:
+                post.minhash = minhasher.hex_signature(post.text)
+        return posts
+    html = scraper.prepare_html_with_scrolls(scrolls=scrolls, max_idle_cycles=max_idle_cycles)
+    if archive is not None and html:
+        archive.save(html, query)
+    return [post for post in FacebookParser(html, minhasher=minhasher).parse_all() if post.is_valid()]
+
+
+def _is_browser_failure(error: Exception) -> bool:
+    try:
+        from selenium.common.exceptions import WebDriverException
+    except ImportError:
+        return False
+    return isinstance(error, WebDriverException)
+
+
+def _start_scraper(settings: Dict) -> "FacebookScraper":
+    # Import local : le module (et ses tests) reste utilisable sans Selenium
+    from selenium_scraper.scraper import FacebookScraper
+
+    scraper = FacebookScraper(
+        email=settings["email"], password=settings["password"], headless=settings["headless"], lean=settings["lean"],
+        capture_graphql=settings["graphql"]
+    )
+    scraper.login()
+    return scraper
+
+
+def _worker_main(worker_id: int, settings: Dict, task_queue, result_queue):
+    """
+    Boucle d'un worker : un navigateur, les sujets confiés par le superviseur (sa propre file)
+    jusqu'au signal d'arrêt (None). Chaque sujet reçoit exactement une réponse (résultat, reprise ou échec).
+    """
+    logger = setup_logger(f"{__name__}.worker{worker_id}")
+    limiter = RateLimiter(settings["rate_limit"])
+    archive = SnapshotArchive() if settings["archive"] else None
+    minhasher = MinHasher() if settings["signatures"] else None
+    crawler = (IncrementalCrawler(stop_after_known=settings["stop_after_known"], minhasher=minhasher)
+               if settings["incremental"] else None)
+    if settings["metrics_dir"]:
+        # Chaque worker exporte ses propres fichiers, distingués par le label 'worker'
+        metrics.enable()
+        metrics.const_labels = {"worker": str(worker_id)}
+    scraper = None
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            query, attempt = task
+            limiter.wait()
+            try:
+                if scraper is None:
+                    scraper = settings["scraper_factory"](settings)
+                if crawler is not None:
+                    # Re-crawl incrémental : nouveaux posts + compteurs modifiés des posts connus
+                    scraper.go_to_search(query)
+                    # L'état du sujet est enregistré par le processus parent, après l'écriture (voir ScraperPool.run)
+                    posts, updates, delta = crawler.collect(scraper, query, settings["scrolls"], settings["max_idle_cycles"])
+                else:
+                    posts = [post.to_dict() for post in
+                             scrape_query(scraper, query, settings["scrolls"], settings["max_idle_cycles"], archive,
+                                          graphql=settings["graphql"], minhasher=minhasher)]
+                    updates, delta = [], None
+                result_queue.put((MSG_RESULT, worker_id, task, {"posts": posts, "updates": updates, "state": delta}))
+            except Exception as e:
+                logger.exception("❌ [worker %s] Échec du sujet '%s' (tentative %s) :", worker_id, query, attempt + 1)
+                if _is_browser_failure(e) and scraper is not None:
+                    # Navigateur planté ou déconnecté : on le relancera au prochain sujet
+                    logger.warning("🔄 [worker %s] Redémarrage du navigateur.", worker_id)
+                    try:
+                        scraper.driver.quit()
+                    except Exception:
+                        pass
+                    scraper = None
+                # Le superviseur remet le sujet en attente (ou l'abandonne) selon le nombre de tentatives
+                result_queue.put((MSG_RETRY if attempt + 1 < settings["max_retries"] else MSG_FAILED,
+                                  worker_id, task, str(e)))
+    finally:
+        if scraper is not None:
+            try:
+                scraper.driver.quit()
+            except Exception:
+                pass
+        if settings["metrics_dir"]:
+            metrics.write_prometheus(os.path.join(settings["metrics_dir"], f"fb_scraper_worker{worker_id}.prom"))
+            metrics.write_json_report(os.path.join(settings["metrics_dir"], f"run_report_worker{worker_id}.json"))
+
+
+class ScraperPool:
+    """
+    Orchestration du pool : N workers navigateur, une file de sujets et un unique écrivain (ce processus).
+
+    Args:
+        email, password (str): Identifiants Facebook utilisés par chaque worker.
+        workers (int): Nombre de navigateurs en parallèle.
+        headless (bool): Chrome sans interface.
+        rate_limit (float): Intervalle minimal (secondes) entre deux sujets pour un même worker.
+        max_retries (int): Nombre maximal de tentatives par sujet.
+        scrolls (int), max_idle_cycles (int): Paramètres de scroll adaptatif (voir FacebookScraper).
+        lean (bool): Mode lean des navigateurs (ressources lourdes bloquées).
+        archive (bool): Archive le HTML de chaque sujet (voir storage/snapshot_archive.py).
+        metrics_dir (str): Si défini, chaque worker y écrit ses métriques (fb_scraper_worker<N>.prom / .json).
+        incremental (bool): Re-crawl incrémental (voir pipeline/incremental.py) ; arrêt après
+            'stop_after_known' posts connus consécutifs.
+        graphql (bool): Extraction par capture des réponses GraphQL (voir FacebookScraper.stream_graphql_posts).
+        signatures (bool): Signatures MinHash calculées par les workers (détection de quasi-doublons).
+        scraper_factory: Fonction de niveau module settings -> scraper connecté, appelée dans chaque worker
+            (défaut : FacebookScraper + login ; les tests y branchent un faux scraper).
+        check_interval (float): Intervalle (secondes) de vérification des workers morts.
+    """
+
+    def __init__(self, email: str, password: str, workers: int = 2, headless: bool = True,
+                 rate_limit: float = 30.0, max_retries: int = 3, scrolls: int = 50, max_idle_cycles: int = 3,
+                 lean: bool = False, archive: bool = False, metrics_dir: Optional[str] = None,
+                 incremental: bool = False, stop_after_known: int = 10, graphql: bool = False,
+                 signatures: bool = False, scraper_factory: Callable[[Dict], "FacebookScraper"] = _start_scraper,
+                 check_interval: float = 1.0):
+        self.logger = setup_logger(__name__)
+        self.workers = max(1, workers)
+        self.settings = {
+            "email": email,
+            "password": password,
+            "headless": headless,
+            "rate_limit": rate_limit,
+            "max_retries": max(1, max_retries),
+            "scrolls": scrolls,
+            "max_idle_cycles": max_idle_cycles,
+            "lean": lean,
+            "archive": archive,
+            "metrics_dir": metrics_dir,
+            "incremental": incremental,
+            "stop_after_known": stop_after_known,
+            "graphql": graphql,
+            "signatures": signatures,
+            "scraper_factory": scraper_factory,
+        }
+        self.check_interval = check_interval
+        # Enregistre l'état des sujets re-crawlés, une fois les résultats des workers écrits
+        self._crawler = IncrementalCrawler(stop_after_known=stop_after_known) if incremental else None
+        # 'spawn' : pas de fork d'un processus qui pilote déjà Chrome
+        self._ctx = mp.get_context("spawn")
+
+    def _spawn(self, worker_id: int, task_queue, result_queue):
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self.settings, task_queue, result_queue),
+            name=f"fb-scraper-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        return process
+
+    def run(self, queries: Iterable[str], on_posts: Callable[[str, List[Dict]], None],
+            on_updates: Optional[Callable[[str, List[Dict]], None]] = None) -> Dict:
+        """
+        Traite tous les sujets et appelle on_posts(query, posts) dans ce processus pour chaque résultat
+        (typiquement l'insertion en base), et on_updates(query, updates) pour les compteurs modifiés
+        en mode incrémental. Retourne un résumé de l'exécution.
+
+        En mode incrémental, l'état du sujet est enregistré après ces deux appels ; s'ils retournent un
+        BulkInsertResult, les posts en échec ne sont pas retenus comme connus.
+        """
+        queries = list(queries)
+        result_queue = self._ctx.Queue()
+        waiting = deque((query, 0) for query in queries)
+
+        summary = {"queries": len(queries), "done": 0, "failed": [], "retries": 0, "posts": 0, "restarts": 0}
+        start = time.perf_counter()
+        # Une file par worker ; 'assigned' : sujet confié à chaque worker (absent = worker libre)
+        inboxes, processes, assigned = {}, {}, {}
+        for worker_id in range(min(self.workers, len(queries))):
+            inboxes[worker_id] = self._ctx.Queue()
+            processes[worker_id] = self._spawn(worker_id, inboxes[worker_id], result_queue)
+        pending = len(queries)
+        next_check = time.monotonic() + self.check_interval
+
+        try:
+            while pending > 0:
+                self._dispatch(waiting, inboxes, assigned)
+                for kind, worker_id, task, payload in self._receive(result_queue, timeout=min(1.0, self.check_interval)):
+                    if assigned.get(worker_id) != tuple(task):
+                        # Message d'un worker mort dont le sujet a déjà été remis en attente : ignoré
+                        self.logger.warning("⚠️ Message périmé du worker %s ignoré ('%s').", worker_id, task[0])
+                        continue
+                    del assigned[worker_id]
+                    pending -= self._handle(kind, worker_id, task, payload, waiting, summary, on_posts, on_updates)
+                # Vérification périodique, même si les autres workers produisent des résultats en continu
+                if time.monotonic() >= next_check:
+                    pending -= self._recover_dead_workers(processes, inboxes, assigned, waiting, result_queue, summary)
+                    next_check = time.monotonic() + self.check_interval
+        finally:
+            for inbox in inboxes.values():
+                inbox.put(None)
+            for process in processes.values():
+                process.join(timeout=30)
+                if process.is_alive():
+                    process.terminate()
+
+        summary["elapsed"] = round(time.perf_counter() - start, 2)
+        self.logger.info(
+            "✅ Pool terminé : %d/%d sujets, %d posts, %d échecs, %d reprises en %ss",
+            summary["done"], summary["queries"], summary["posts"], len(summary["failed"]), summary["retries"], summary["elapsed"]
+        )
+        return summary
+
+    @staticmethod
+    def _receive(result_queue, timeout: float) -> List:
+        """Attend un message puis prend tous ceux déjà arrivés (avant de conclure qu'un worker mort n'a rien rendu)."""
+        try:
+            messages = [result_queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                messages.append(result_queue.get_nowait())
+            except queue.Empty:
+                return messages
+
+    @staticmethod
+    def _dispatch(waiting: deque, inboxes: Dict, assigned: Dict):
+        """Confie un sujet en attente à chaque worker libre."""
+        for worker_id, inbox in inboxes.items():
+            if not waiting:
+                return
+            if worker_id not in assigned:
+                assigned[worker_id] = waiting.popleft()
+                inbox.put(assigned[worker_id])
+
+    def _handle(self, kind: str, worker_id: int, task, payload, waiting: deque, summary: Dict,
+                on_posts: Callable, on_updates: Optional[Callable]) -> int:
+        """Traite un message d'un worker. Retourne le nombre de sujets terminés (résultat ou abandon)."""
+        if kind == MSG_RESULT:
+            summary["done"] += 1
+            summary["posts"] += len(payload["posts"])
+            self.logger.info("📦 [worker %s] '%s' : %s posts", worker_id, task[0], len(payload["posts"]))
+            inserted = on_posts(task[0], payload["posts"])
+            updated = None
+            if payload["updates"] and on_updates is not None:
+                updated = on_updates(task[0], payload["updates"])
+            if payload.get("state") is not None:
+                self._crawler.commit(task[0], payload["state"], inserted, updated)
+            return 1
+        if kind == MSG_RETRY:
+            summary["retries"] += 1
+            waiting.append((task[0], task[1] + 1))
+            return 0
+        summary["failed"].append(task[0])
+        self.logger.error("❌ Sujet abandonné après %s tentatives : '%s' (%s)", task[1] + 1, task[0], payload)
+        return 1
+
+    def _recover_dead_workers(self, processes: Dict, inboxes: Dict, assigned: Dict, waiting: deque,
+                              result_queue, summary: Dict) -> int:
+        """
+        Relance les workers morts et remet leur sujet en attente (nouvelle tentative).
+        Retourne le nombre de sujets abandonnés (tentatives épuisées).
+        """
+        abandoned = 0
+        for worker_id, process in list(processes.items()):
+            if process.is_alive():
+                continue
+            self.logger.warning("🔄 Worker %s arrêté (code %s) : redémarrage.", worker_id, process.exitcode)
+            summary["restarts"] += 1
+            task = assigned.pop(worker_id, None)
+            if task is not None:
+                query, attempt = task
+                if attempt + 1 < self.settings["max_retries"]:
+                    waiting.append((query, attempt + 1))
+                    summary["retries"] += 1
+                else:
+                    summary["failed"].append(query)
+                    self.logger.error("❌ Sujet abandonné après %s tentatives : '%s' (worker arrêté)", attempt + 1, query)
+                    abandoned += 1
+            # Nouvelle file : un sujet resté dans l'ancienne ne doit pas être traité deux fois
+            inboxes[worker_id] = self._ctx.Queue()
+            processes[worker_id] = self._spawn(worker_id, inboxes[worker_id], result_queue)
+        return abandoned
@@ -8,24 +8,120 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
 
+from selenium_scraper import selector_registry as sel
+from selenium_scraper.devtools import PerformanceLogReader, enable_performance_logging
+from selenium_scraper.graphql import GraphQLCapture, GraphQLPostExtractor
+from selenium_scraper.model import PostModel
+from selenium_scraper.parser import FacebookParser
+from selenium_scraper.lean_mode import ResourceBlocker
+from selenium_scraper.session import DEFAULT_SESSION_DIR, SessionStore
+from selenium_scraper.waits import (
+    AdaptiveScrollController, any_of, count_posts, document_height,
+    document_height_changed, network_idle, post_count_increased, wait_for
+)
 from utils.logger import setup_logger
+from utils.metrics import metrics
 
 from bs4 import BeautifulSoup
 from bs4.element import Tag
 
-from typing import List
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 import random
 import time
 
 
+# Script injecté : récupère en un seul appel les blocs de post pas encore collectés.
+# Seuls les blocs entièrement remontés au-dessus du bas de l'écran sont pris (rendu terminé),
+# sauf si 'flush' est vrai. Avec 'prune', le contenu du bloc collecté est vidé et remplacé
+# par un espace de même hauteur pour garder la position de scroll sans faire grossir le DOM.
+_HARVEST_SCRIPT = """
+const [selector, prune, flush] = arguments;
+const limit = window.innerHeight;
+const fragments = [];
+for (const node of document.querySelectorAll(selector + ':not([data-fbs-harvested])')) {
+    if (node.parentElement && node.parentElement.closest('[data-fbs-harvested]')) continue;
+    if (!flush && node.getBoundingClientRect().bottom > limit) continue;
+    node.setAttribute('data-fbs-harvested', '1');
+    for (const inner of node.querySelectorAll(selector)) inner.setAttribute('data-fbs-harvested', '1');
+    fragments.push(node.outerHTML);
+    if (prune) {
+        const height = node.getBoundingClientRect().height;
+        node.replaceChildren();
+        node.style.height = height + 'px';
+    }
+}
+return fragments;
+"""
+
+
+# Script injecté : clique en un seul appel sur tous les boutons "En voir plus" pas encore traités.
+# Le bloc de post est marqué 'data-fbs-expanded' : ses boutons ne seront plus jamais recherchés.
+# Les boutons cliqués sont gardés dans window.__fbsSeeMorePending pour l'attente de dépliage.
+_EXPAND_SCRIPT = """
+const [postSelector, labels] = arguments;
+const wanted = new Set(labels.map(l => l.trim().toLowerCase()));
+const clicked = [];
+for (const button of document.querySelectorAll('div[role="button"]:not([data-fbs-expanded])')) {
+    if (!wanted.has(button.textContent.trim().toLowerCase())) continue;
+    const post = button.closest(postSelector);
+    if (post && post.hasAttribute('data-fbs-expanded')) continue;
+    button.setAttribute('data-fbs-expanded', '1');
+    try { button.click(); clicked.push(button); } catch (e) {}
+}
+for (const button of clicked) {
+    const post = button.closest(postSelector);
+    if (post) post.setAttribute('data-fbs-expanded', '1');
+}
+window.__fbsSeeMorePending = clicked;
+return clicked.length;
+"""
+
+# Vrai quand tous les boutons cliqués ont disparu ou sont masqués (texte déplié)
+_SEE_MORE_DONE_SCRIPT = """
+return (window.__fbsSeeMorePending || []).every(b => !b.isConnected || b.offsetParent === null);
+"""
+
+
 #Déclaration d'une classe nommée FacebookScraper. Elle regroupe toutes les fonctionnalités liées au scraping de Facebook (connexion, extraction, etc.).
 class FacebookScraper:
-    def __init__(self, email: str, password: str, headless: bool):
+    def __init__(self, email: str, password: str, headless: bool, load_timeout: float = 10,
+                 session_dir: Optional[str] = DEFAULT_SESSION_DIR, user_data_dir: Optional[str] = None,
+                 lean: bool = False, block_patterns: Optional[Iterable[str]] = None,
+                 allow_patterns: Optional[Iterable[str]] = None, see_more_labels: Optional[Iterable[str]] = None,
+                 capture_graphql: bool = False):
+        """
+        Args:
+            session_dir (str): Dossier des sessions sauvegardées (cookies + localStorage) ; None pour désactiver.
+            user_data_dir (str): Profil Chrome persistant à réutiliser (un par compte, non partageable
+                entre navigateurs ouverts en même temps).
+            lean (bool): Bloque images, vidéos, polices et traceurs (voir lean_mode) ; les 'src' restent dans le DOM.
+            block_patterns, allow_patterns: Motifs d'URL bloqués / toujours autorisés en mode lean.
+            see_more_labels: Libellés du bouton "En voir plus" (défaut : toutes les langues de selector_registry).
+            capture_graphql (bool): Capture les réponses GraphQL via DevTools (voir stream_graphql_posts).
+        """
         self.logger = setup_logger(__name__)
         self.email = email
         self.password = password
         self.headless = headless
+        # Délai maximal des attentes événementielles (chargement de page, nouveaux posts…)
+        self.load_timeout = load_timeout
+        self.session_store = SessionStore(session_dir) if session_dir else None
+        self.user_data_dir = user_data_dir
+        self.lean = lean
+        self.see_more_labels = list(see_more_labels or sel.SEE_MORE_LABELS)
+        self.capture_graphql = capture_graphql
+        self.devtools = None
+        self.resource_blocker = None
+        self.graphql_capture = None
         self.driver = self._init_driver()
+        if self.lean:
+            self.resource_blocker = ResourceBlocker(
+                self.driver, self.devtools, block_patterns=block_patterns, allow_patterns=allow_patterns
+            )
+            self.resource_blocker.install()
+        if self.capture_graphql:
+            self.graphql_capture = GraphQLCapture(self.driver, self.devtools)
+            self.graphql_capture.install()
         
     
     def _init_driver(self):
@@ -38,6 +134,16 @@ class FacebookScraper:
         if self.headless:
             options.add_argument("--headless=new")  # headless "new" pour les versions récentes de Chrome
 
+        if self.user_data_dir:
+            options.add_argument(f"--user-data-dir={self.user_data_dir}")
+
+        if self.lean:
+            # Pas de lecture automatique des vidéos
+            options.add_argument("--autoplay-policy=user-gesture-required")
+        if self.lean or self.capture_graphql:
+            # Journal DevTools : requêtes bloquées (mode lean), réponses GraphQL (capture réseau)
+            enable_performance_logging(options)
+
         #Désactiver les notifications
         prefs = {
             "profile.default_content_setting_values.notifications": 2  # 2 = Bloquer
@@ -46,6 +152,8 @@ class FacebookScraper:
         options.add_experimental_option("prefs", prefs)
         driver = webdriver.Chrome(options=options)
         driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        if self.lean or self.capture_graphql:
+            self.devtools = PerformanceLogReader(driver)
         
         self.logger.info("Navigateur Chrome initialisé avec succès.")
         
@@ -67,16 +175,47 @@ class FacebookScraper:
                 if btn.text.strip() == "Autoriser tous les cookies":
                     self.driver.execute_script("arguments[0].click();", btn)
                     self.logger.info("✅ Bouton 'Autoriser tous les cookies' cliqué.")
-                    time.sleep(2)
+                    wait_for(self.driver, EC.staleness_of(btn), timeout=5)
                     return
             self.logger.warning("❌ Bouton 'Autoriser tous les cookies' non trouvé.")
         except Exception as e:
             self.logger.exception("❌ Erreur lors de la gestion des cookies :")
         
-    def login(self):
-        """Login to Facebook"""
+    def is_logged_in(self) -> bool:
+        """Vérification rapide : cookie de compte présent et page d'accueil sans formulaire de connexion."""
+        try:
+            if not self.driver.get_cookie("c_user"):
+                return False
+            self.driver.get("https://www.facebook.com/")
+            return "/login" not in self.driver.current_url and not self.driver.find_elements(By.NAME, "pass")
+        except Exception as e:
+            self.logger.warning("⚠️ Impossible de vérifier la session : %s", e)
+            return False
+
+    def _restore_session(self) -> bool:
+        """Réutilise une session existante (profil Chrome ou session sauvegardée) si elle est encore valide."""
+        if self.user_data_dir and self.is_logged_in():
+            self.logger.info("✅ Session du profil Chrome encore valide : connexion ignorée.")
+            return True
+        if self.session_store is None:
+            return False
+        try:
+            if self.session_store.restore(self.driver, self.email) and self.is_logged_in():
+                self.logger.info("✅ Session restaurée et valide : connexion ignorée.")
+                return True
+        except Exception as e:
+            self.logger.warning("⚠️ Échec de la restauration de session : %s", e)
+        self.logger.info("🔐 Aucune session valide : connexion complète.")
+        return False
+
+    @metrics.timed("fb_login_seconds")
+    def login(self, force: bool = False):
+        """Login to Facebook (réutilise la session sauvegardée si elle est valide, sauf si force=True)"""
+        if not force and self._restore_session():
+            return
         try:
-            self.driver.get("https://www.facebook.com/login")
+            login_url = "https://www.facebook.com/login"
+            self.driver.get(login_url)
             self.logger.info("🔐 Navigation vers la page de connexion Facebook.")
             #On accepte les cookies
             self._accept_cookies()
@@ -101,35 +240,48 @@ class FacebookScraper:
                 .click()\
                 .perform()
             
-            self.logger.info("✅ Connexion réussie à Facebook.")
-            
-            time.sleep(10)
+            # On attend la redirection hors de la page de connexion plutôt qu'un délai fixe
+            if wait_for(self.driver, lambda d: "/login" not in d.current_url, timeout=self.load_timeout * 2):
+                self.logger.info("✅ Connexion réussie à Facebook.")
+                if self.session_store is not None:
+                    self.session_store.save(self.driver, self.email)
+            else:
+                self.logger.warning("⚠️ Toujours sur la page de connexion après l'envoi du formulaire.")
         except Exception as e:
             self.logger.exception("❌ Erreur lors de la connexion à Facebook :")
     
+    @metrics.timed("fb_navigation_seconds")
     def go_to_search(self, query:str):
         try:
             """Navigue vers la page de recherche Facebook pour un mot-clé donné."""
             search_url = f"https://www.facebook.com/search/posts/?q={query.replace(' ', '%20')}"
+            if self.graphql_capture is not None:
+                # Les réponses des pages précédentes (fil d'actualité, autre sujet) ne doivent pas être extraites
+                self.graphql_capture.reset()
             self.driver.get(search_url)
-            self.logger.info(f"🔍 Navigation vers : {search_url}")
-            time.sleep(5)  # Attente du chargement initial
+            self.logger.info("🔍 Navigation vers : %s", search_url)
+            # Attente du chargement initial : premier bloc de post affiché
+            if not wait_for(self.driver, post_count_increased(0), timeout=self.load_timeout * 2):
+                self.logger.warning("⚠️ Aucun post affiché après le chargement de la recherche.")
         except Exception as e:
             self.logger.exception("❌ Erreur lors de la navigation vers la page de recherche :")
             
-    def expand_all_see_more(self):
-        """Clique sur tous les boutons 'En voir plus' pour afficher le texte complet des posts."""
+    @metrics.timed("fb_see_more_seconds")
+    def expand_all_see_more(self) -> int:
+        """
+        Clique en un seul appel JavaScript sur tous les boutons 'En voir plus' des posts pas encore dépliés,
+        puis attend une seule fois que les textes soient dépliés. Retourne le nombre de boutons cliqués.
+        """
         try:
-            buttons = self.driver.find_elements(By.XPATH, "//div[@role='button' and contains(., 'En voir plus')]")
-            self.logger.info(f"🔎 {len(buttons)} boutons 'En voir plus' trouvés")
-            for btn in buttons:
-                try:
-                    self.driver.execute_script("arguments[0].click();", btn)
-                    time.sleep(0.5)
-                except Exception as e:
-                    self.logger.warning(f"⚠️ Impossible de cliquer sur un bouton : {e}")
+            clicked = self.driver.execute_script(_EXPAND_SCRIPT, sel.POST_CONTAINER_CSS, self.see_more_labels) or 0
+            self.logger.info("🔎 %s boutons 'En voir plus' cliqués", clicked)
+            metrics.inc("fb_see_more_clicks_total", clicked)
+            if clicked:
+                wait_for(self.driver, lambda d: d.execute_script(_SEE_MORE_DONE_SCRIPT), timeout=2)
+            return clicked
         except Exception as e:
-            self.logger.warning(f"❌ Erreur lors de la recherche des boutons 'En voir plus' : {e}")
+            self.logger.warning("❌ Erreur lors du dépliage des boutons 'En voir plus' : %s", e)
+            return 0
             
     def scroll_to_bottom(self, steps: int, step_size: int, delay: float):
         """
@@ -147,32 +299,185 @@ class FacebookScraper:
                 #self.logger.info(f"⬇️ Scroll étape {i+1}/{steps} ({step_size}px)")
                 time.sleep(delay)
         except Exception as e:
-            self.logger.warning(f"⚠️ Erreur lors du scroll progressif : {e}")
+            self.logger.warning("⚠️ Erreur lors du scroll progressif : %s", e)
 
-            
-    def prepare_html_with_scrolls(self, scrolls: int) -> str:
-        """Effectue plusieurs cycles de clics sur 'En voir plus' + scroll pour charger un maximum de contenu"""
+    @metrics.timed("fb_scroll_cycle_seconds")
+    def scroll_and_wait(self) -> int:
+        """
+        Scrolle jusqu'en bas puis attend que Facebook charge la suite (nouveaux posts ou page plus haute),
+        ou que le réseau redevienne calme, au plus self.load_timeout secondes.
+
+        Returns:
+            int: Nombre de nouveaux blocs de post apparus.
+        """
+        try:
+            before_count = count_posts(self.driver)
+            before_height = document_height(self.driver)
+            # Petit scroll progressif (comportement humain) puis saut en bas de page
+            self.scroll_to_bottom(steps = 5, step_size = 200, delay = 0.05)
+            self.driver.execute_script("window.scrollTo(0, document.documentElement.scrollHeight);")
+            wait_for(
+                self.driver,
+                any_of(post_count_increased(before_count), document_height_changed(before_height)),
+                timeout=self.load_timeout
+            )
+            # Les posts arrivent souvent par vagues : on laisse le réseau se calmer avant de compter
+            wait_for(self.driver, network_idle(idle_time=0.3), timeout=2)
+            if self.devtools is not None:
+                # Vide le journal DevTools à chaque cycle pour qu'il ne grossisse pas
+                self.devtools.poll()
+            new_posts = max(0, count_posts(self.driver) - before_count)
+            metrics.inc("fb_scroll_cycles_total")
+            metrics.inc("fb_loaded_posts_total", new_posts)
+            return new_posts
+        except Exception as e:
+            self.logger.warning("⚠️ Erreur lors du scroll : %s", e)
+            return 0
+
+    def prepare_html_with_scrolls(self, scrolls: int = 50, max_idle_cycles: int = 3) -> str:
+        """
+        Effectue des cycles de clics sur 'En voir plus' + scroll pour charger un maximum de contenu.
+        S'arrête après 'max_idle_cycles' cycles consécutifs sans nouveau post, ou après 'scrolls' cycles.
+        """
         try:
-            for i in range(scrolls):
-                self.logger.info(f"🔁 Scroll cycle {i+1}/{scrolls}")
+            controller = AdaptiveScrollController(max_idle_cycles=max_idle_cycles, max_cycles=scrolls)
+            while controller.should_continue():
+                self.logger.info("🔁 Scroll cycle %s/%s", controller.cycles+1, scrolls)
 
                 # Étape 1 : Cliquer sur les boutons "En voir plus"
                 self.expand_all_see_more()
-                
-                time.sleep(2)
-                    
-                # Étape 2 : Scroller en bas de page
-                self.scroll_to_bottom(steps = 10, step_size = 50, delay = 0.5)
-                
-                time.sleep(3)
+
+                # Étape 2 : Scroller en bas de page et attendre le chargement
+                controller.record(self.scroll_and_wait())
+
+            # Dépliage des derniers posts chargés
+            self.expand_all_see_more()
+
+            if self.resource_blocker is not None:
+                stats = self.lean_stats()
+                self.logger.info(
+                    "🪶 %d requêtes bloquées (~%.1f Mo économisés)",
+                    stats["blocked_requests"], stats["estimated_bytes_saved"] / 1_000_000
+                )
+                metrics.set("fb_lean_blocked_requests", stats["blocked_requests"])
+                metrics.set("fb_lean_estimated_bytes_saved", stats["estimated_bytes_saved"])
 
             # 🔁 Retourne le HTML complet après interaction
-            self.logger.info("✅ code HTML récupéré :")
-            return self.driver.page_source
+            self.logger.info("✅ code HTML récupéré (%s nouveaux posts en %s cycles) :", controller.total_new, controller.cycles)
+            with metrics.timer("fb_page_source_seconds"):
+                html = self.driver.page_source
+            metrics.set("fb_page_source_bytes", len(html))
+            return html
         
         except Exception as e:
             self.logger.exception("❌ Erreur dans prepare_html_with_scrolls :")
             return ""
 
-        
-    
+    def lean_stats(self) -> Dict:
+        """Compteurs du mode lean : requêtes bloquées (par type) et estimation des octets économisés."""
+        if self.resource_blocker is None:
+            return {}
+        return self.resource_blocker.stats()
+
+    def harvest_new_posts(self, prune: bool = True, flush: bool = False) -> List[str]:
+        """
+        Récupère en un seul appel JavaScript le HTML des blocs de post apparus depuis le dernier appel.
+
+        Args:
+            prune (bool): Vide les blocs collectés dans le DOM pour garder la mémoire de Chrome stable.
+            flush (bool): Collecte aussi les blocs encore sous le bas de l'écran (dernier cycle).
+        """
+        try:
+            with metrics.timer("fb_harvest_seconds"):
+                fragments = self.driver.execute_script(_HARVEST_SCRIPT, sel.POST_CONTAINER_CSS, prune, flush) or []
+            metrics.inc("fb_harvested_posts_total", len(fragments))
+            return fragments
+        except Exception as e:
+            self.logger.warning("⚠️ Erreur lors de la collecte des nouveaux posts : %s", e)
+            return []
+
+    def stream_post_fragments(self, scrolls: int = 50, prune: bool = True, max_idle_cycles: int = 3) -> Iterator[str]:
+        """
+        Variante streaming de prepare_html_with_scrolls : après chaque cycle (clics + scroll),
+        renvoie au fur et à mesure le HTML des nouveaux blocs de post, sans jamais sérialiser toute la page.
+        Même critère d'arrêt adaptatif que prepare_html_with_scrolls, sur les blocs pas encore collectés
+        (voir count_posts) : ni les blocs vidés ni les posts retirés par Facebook ne font croire à un fil terminé.
+        Les posts que Facebook retire du DOM en cours de scroll sont ainsi capturés avant de disparaître.
+
+        Usage :
+            parser = FacebookParser(None)
+            for post in parser.parse_stream(scraper.stream_post_fragments(scrolls=50)):
+                ...
+        """
+        total = 0
+        controller = AdaptiveScrollController(max_idle_cycles=max_idle_cycles, max_cycles=scrolls)
+        while controller.should_continue():
+            self.logger.info("🔁 Scroll cycle %s/%s (streaming)", controller.cycles+1, scrolls)
+            self.expand_all_see_more()
+
+            fragments = self.harvest_new_posts(prune=prune)
+            total += len(fragments)
+            yield from fragments
+
+            controller.record(self.scroll_and_wait())
+
+        # Dernier passage : on collecte aussi les blocs restés en bas de page
+        self.expand_all_see_more()
+        fragments = self.harvest_new_posts(prune=prune, flush=True)
+        total += len(fragments)
+        yield from fragments
+        self.logger.info("✅ %s blocs de post collectés en streaming.", total)
+
+    def stream_graphql_posts(self, scrolls: int = 50, max_idle_cycles: int = 3, fallback: bool = True,
+                             on_updates: Optional[Callable[[List[Dict]], None]] = None) -> Iterator[PostModel]:
+        """
+        Extraction par capture réseau : scrolle comme prepare_html_with_scrolls mais lit les posts dans les
+        réponses GraphQL (et les données JSON embarquées dans la page) au lieu du HTML rendu.
+        Ni clic "En voir plus" (le texte est complet), ni page_source, ni parsing HTML ; compteurs exacts.
+        S'arrête après 'max_idle_cycles' cycles sans nouveau post.
+
+        Args:
+            fallback (bool): Si aucun post n'a été capturé, bascule sur le parsing HTML (stream_post_fragments).
+            on_updates: Reçoit les compteurs arrivés (réponses différées) après l'émission d'un post, au format
+                de update_engagement. Les PostModel émis sont aussi mis à jour en place : inutile si les posts
+                ne sont stockés qu'en fin de flux.
+
+        Nécessite capture_graphql=True. Les posts renvoyés ne sont pas filtrés (voir PostModel.is_valid).
+        """
+        if self.graphql_capture is None:
+            raise RuntimeError("stream_graphql_posts nécessite FacebookScraper(capture_graphql=True).")
+        extractor = GraphQLPostExtractor()
+        seen = set()
+
+        def new_posts(bodies: List[str]) -> List[PostModel]:
+            # Un seul extracteur pour tout le flux : les fragments @defer d'un post peuvent arriver plusieurs cycles plus tard
+            with metrics.timer("fb_graphql_extract_seconds"):
+                posts, updates = extractor.feed(bodies)
+            posts = [post for post in posts if post.fingerprint not in seen]
+            seen.update(post.fingerprint for post in posts)
+            if updates:
+                metrics.inc("fb_graphql_late_updates_total", len(updates))
+                if on_updates is not None:
+                    on_updates(updates)
+            return posts
+
+        # Premiers résultats : embarqués dans la page et déjà arrivés par GraphQL au chargement
+        yield from new_posts(self.graphql_capture.initial_payloads() + self.graphql_capture.drain())
+
+        controller = AdaptiveScrollController(max_idle_cycles=max_idle_cycles, max_cycles=scrolls)
+        while controller.should_continue():
+            self.logger.info("🔁 Scroll cycle %s/%s (capture GraphQL)", controller.cycles+1, scrolls)
+            self.scroll_and_wait()
+            posts = new_posts(self.graphql_capture.drain())
+            controller.record(len(posts))
+            yield from posts
+
+        self.logger.info("✅ %s posts capturés via GraphQL en %s cycles.", len(seen), controller.cycles)
+        metrics.inc("fb_graphql_posts_total", len(seen))
+        if not seen and fallback:
+            self.logger.warning("⚠️ Aucune réponse GraphQL exploitable : repli sur le parsing HTML.")
+            metrics.inc("fb_graphql_fallbacks_total")
+            self.driver.execute_script("window.scrollTo(0, 0);")
+            yield from FacebookParser(None).parse_stream(
+                self.stream_post_fragments(scrolls=scrolls, max_idle_cycles=max_idle_cycles)
+            )
@@ -0,0 +1,44 @@
+"""
+Registre unique des sélecteurs Facebook utilisés par les backends du parser.
+Quand Facebook modifie son balisage, c'est le seul fichier à mettre à jour.
+"""
+
+# Bloc englobant un post dans la page de recherche (valeur exacte de l'attribut class)
+POST_CONTAINER_TAG = "div"
+POST_CONTAINER_CLASS = "x1n2onr6 x1ja2u2z"
+
+# Nom de la page ayant publié le post
+PAGE_NAME_ATTR = ("data-ad-rendering-role", "profile_name")
+
+# Texte principal du post
+MESSAGE_ATTR = ("data-ad-preview", "message")
+
+# Filtrage des images : on garde les URLs fbcdn, sans emojis ni stickers
+IMAGE_REQUIRED_HOST = "fbcdn.net"
+IMAGE_EXCLUDED_PATTERNS = ("emoji.php", "sticker")
+
+# Compteurs d'engagement : mot-clé recherché dans les spans -> champ du PostModel
+COUNT_KEYWORDS = {
+    "comments": "commentaire",
+    "shares": "partage",
+}
+# Libellés de boutons contenant les mots-clés mais sans valeur numérique
+COUNT_EXCLUDED_WORDS = ("commenter", "partager")
+
+# Sélecteurs CSS / XPath dérivés (partagés par le scraper et le backend lxml)
+POST_CONTAINER_CSS = f'{POST_CONTAINER_TAG}[class="{POST_CONTAINER_CLASS}"]'
+POST_CONTAINER_XPATH = f'//{POST_CONTAINER_TAG}[@class="{POST_CONTAINER_CLASS}"]'
+PAGE_NAME_XPATH = f'.//div[@{PAGE_NAME_ATTR[0]}="{PAGE_NAME_ATTR[1]}"]'
+MESSAGE_XPATH = f'.//div[@{MESSAGE_ATTR[0]}="{MESSAGE_ATTR[1]}"]'
+
+# Libellés du bouton qui déplie le texte tronqué d'un post, selon la langue du compte
+SEE_MORE_LABELS = (
+    "En voir plus",   # fr
+    "Voir plus",      # fr (variante)
+    "See more",       # en
+    "Ver más",        # es
+    "Ver mais",       # pt
+    "Mehr ansehen",   # de
+    "Altro...",       # it
+    "Meer weergeven", # nl
+)
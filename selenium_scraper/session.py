@@ -0,0 +1,109 @@
+from utils.logger import setup_logger
+
+from typing import Dict, Optional
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+"""
+Persistance de la session Facebook (cookies + localStorage) entre deux exécutions,
+pour éviter de refaire une connexion complète à chaque lancement ou à chaque nouveau navigateur.
+"""
+
+# Dossier par défaut des sessions sauvegardées (contient des cookies d'authentification : ne pas versionner)
+DEFAULT_SESSION_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'sessions')
+
+# Page légère du domaine Facebook, chargée uniquement pour pouvoir poser les cookies
+COOKIE_ORIGIN_URL = "https://www.facebook.com/robots.txt"
+
+_DUMP_LOCAL_STORAGE = """
+const data = {};
+for (let i = 0; i < window.localStorage.length; i++) {
+    const key = window.localStorage.key(i);
+    data[key] = window.localStorage.getItem(key);
+}
+return data;
+"""
+
+_LOAD_LOCAL_STORAGE = """
+const data = arguments[0];
+for (const key of Object.keys(data)) window.localStorage.setItem(key, data[key]);
+"""
+
+
+class SessionStore:
+    """Sauvegarde et restaure la session d'un compte dans un fichier JSON (un fichier par compte)."""
+
+    def __init__(self, directory: str = DEFAULT_SESSION_DIR, max_age: float = 7 * 24 * 3600):
+        self.logger = setup_logger(__name__)
+        self.directory = directory
+        # Au-delà de cet âge (secondes), la session sauvegardée est ignorée
+        self.max_age = max_age
+
+    def _path(self, account: str) -> str:
+        # Le nom de fichier ne contient pas l'adresse e-mail en clair
+        digest = hashlib.sha256(account.strip().lower().encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.directory, f"session_{digest}.json")
+
+    def load(self, account: str) -> Optional[Dict]:
+        path = self._path(account)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                session = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning("⚠️ Session illisible (%s) : %s", path, e)
+            return None
+        if time.time() - session.get("saved_at", 0) > self.max_age:
+            self.logger.info("⌛ Session sauvegardée trop ancienne : ignorée.")
+            return None
+        return session
+
+    def save(self, driver, account: str):
+        """Enregistre les cookies et le localStorage du domaine courant (écriture atomique)."""
+        session = {
+            "saved_at": time.time(),
+            "cookies": driver.get_cookies(),
+            "local_storage": driver.execute_script(_DUMP_LOCAL_STORAGE) or {},
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        # Fichier temporaire + os.replace : plusieurs workers peuvent sauvegarder en même temps
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(session, f)
+            os.replace(tmp_path, self._path(account))
+        except BaseException:
+            # Échec : la session précédente reste intacte, aucun fichier temporaire ne traîne
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.logger.info("💾 Session sauvegardée (%s cookies).", len(session['cookies']))
+
+    def restore(self, driver, account: str) -> bool:
+        """Pose les cookies et le localStorage sauvegardés dans le navigateur. Retourne False si aucune session."""
+        session = self.load(account)
+        if not session or not session.get("cookies"):
+            return False
+        driver.get(COOKIE_ORIGIN_URL)
+        for cookie in session["cookies"]:
+            cookie = {k: v for k, v in cookie.items() if k in ("name", "value", "domain", "path", "expiry", "secure", "httpOnly")}
+            if "expiry" in cookie:
+                cookie["expiry"] = int(cookie["expiry"])
+            try:
+                driver.add_cookie(cookie)
+            except Exception as e:
+                self.logger.debug("Cookie '%s' ignoré : %s", cookie.get('name'), e)
+        if session.get("local_storage"):
+            driver.execute_script(_LOAD_LOCAL_STORAGE, session["local_storage"])
+        self.logger.info("♻️ Session restaurée (%s cookies).", len(session['cookies']))
+        return True
+
+    def clear(self, account: str):
+        try:
+            os.remove(self._path(account))
+        except FileNotFoundError:
+            pass
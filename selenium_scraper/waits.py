@@ -0,0 +1,126 @@
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from selenium_scraper import selector_registry as sel
+
+from typing import Callable, Optional
+import time
+
+"""
+Attentes événementielles pour le scraper : au lieu de dormir un temps fixe, on attend
+qu'une condition observable soit vraie (nouveaux posts, page plus haute, réseau calme,
+élément présent), avec un délai maximal.
+Chaque condition est un callable(driver) utilisable avec WebDriverWait.until.
+"""
+
+
+def count_posts(driver) -> int:
+    """
+    Nombre de blocs de post présents dans le DOM et pas encore collectés (voir FacebookScraper.harvest_new_posts).
+    Les blocs collectés sont vidés et Facebook retire les anciens posts du fil : le nombre total de blocs
+    peut stagner alors que de nouveaux posts arrivent, pas celui des blocs restant à collecter.
+    """
+    return driver.execute_script(
+        "return document.querySelectorAll(arguments[0] + ':not([data-fbs-harvested])').length;", sel.POST_CONTAINER_CSS
+    )
+
+
+def document_height(driver) -> int:
+    return driver.execute_script("return document.documentElement.scrollHeight;")
+
+
+class post_count_increased:
+    """Vraie dès que le nombre de blocs de post dépasse 'previous' ; renvoie le nouveau nombre."""
+
+    def __init__(self, previous: int):
+        self.previous = previous
+
+    def __call__(self, driver):
+        count = count_posts(driver)
+        return count if count > self.previous else False
+
+
+class document_height_changed:
+    """Vraie dès que la hauteur du document diffère de 'previous' ; renvoie la nouvelle hauteur."""
+
+    def __init__(self, previous: int):
+        self.previous = previous
+
+    def __call__(self, driver):
+        height = document_height(driver)
+        return height if height != self.previous else False
+
+
+# Nombre de ressources chargées depuis l'échantillon précédent, puis tampon vidé : le tampon Resource Timing
+# (250 entrées par défaut) ne se remplit jamais, sinon le compte cesserait d'augmenter et le réseau paraîtrait calme
+_RESOURCES_SINCE_LAST_SAMPLE_SCRIPT = """
+const count = performance.getEntriesByType('resource').length;
+performance.clearResourceTimings();
+return count;
+"""
+
+
+class network_idle:
+    """
+    Vraie quand aucune nouvelle ressource réseau (Resource Timing API) n'a été chargée
+    depuis 'idle_time' secondes. Chaque échantillon vide le tampon Resource Timing de la page.
+    """
+
+    def __init__(self, idle_time: float = 0.5):
+        self.idle_time = idle_time
+        self._since = None
+
+    def __call__(self, driver):
+        loaded = driver.execute_script(_RESOURCES_SINCE_LAST_SAMPLE_SCRIPT)
+        now = time.monotonic()
+        if loaded or self._since is None:
+            self._since = now
+            return False
+        return now - self._since >= self.idle_time
+
+
+class any_of:
+    """Vraie dès qu'une des conditions est vraie ; renvoie le premier résultat non faux."""
+
+    def __init__(self, *conditions: Callable):
+        self.conditions = conditions
+
+    def __call__(self, driver):
+        for condition in self.conditions:
+            result = condition(driver)
+            if result:
+                return result
+        return False
+
+
+def wait_for(driver, condition: Callable, timeout: float, poll_frequency: float = 0.1):
+    """Attend 'condition' au plus 'timeout' secondes. Renvoie son résultat, ou None si le délai expire."""
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(condition)
+    except TimeoutException:
+        return None
+
+
+class AdaptiveScrollController:
+    """
+    Décide quand arrêter de scroller : on s'arrête après 'max_idle_cycles' cycles consécutifs
+    sans nouveau post, ou après 'max_cycles' cycles au total.
+    """
+
+    def __init__(self, max_idle_cycles: int = 3, max_cycles: Optional[int] = None):
+        self.max_idle_cycles = max_idle_cycles
+        self.max_cycles = max_cycles
+        self.cycles = 0
+        self.idle_cycles = 0
+        self.total_new = 0
+
+    def record(self, new_posts: int):
+        """Enregistre le nombre de nouveaux posts chargés par le dernier cycle."""
+        self.cycles += 1
+        self.total_new += new_posts
+        self.idle_cycles = 0 if new_posts > 0 else self.idle_cycles + 1
+
+    def should_continue(self) -> bool:
+        if self.max_cycles is not None and self.cycles >= self.max_cycles:
+            return False
+        return self.idle_cycles < self.max_idle_cycles
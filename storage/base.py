@@ -0,0 +1,188 @@
+# storage/base.py
+
+from selenium_scraper.model import compute_fingerprint
+from storage.seen_filter import create_seen_filter
+
+from utils.logger import setup_logger
+
+from typing import Dict, Iterable, Iterator, List
+import time
+
+
+class BulkInsertResult:
+    """Statistiques d'une insertion en masse (cumulées sur tous les lots)."""
+
+    def __init__(self):
+        self.inserted = 0
+        self.duplicates = 0
+        self.updated = 0
+        self.failed = 0
+        self.batches = 0
+        self.elapsed = 0.0
+        # Empreintes des documents non écrits (échecs, doublons exclus) : à renvoyer plus tard
+        self.failed_ids: List[str] = []
+
+    def merge(self, other: "BulkInsertResult"):
+        """Ajoute les compteurs d'un autre résultat (ex : un lot) à celui-ci."""
+        self.inserted += other.inserted
+        self.duplicates += other.duplicates
+        self.updated += other.updated
+        self.failed += other.failed
+        self.batches += other.batches
+        self.elapsed += other.elapsed
+        self.failed_ids.extend(other.failed_ids)
+
+    def to_dict(self) -> Dict:
+        return {
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "updated": self.updated,
+            "failed": self.failed,
+            "batches": self.batches,
+            "elapsed": round(self.elapsed, 4)
+        }
+
+    def __repr__(self):
+        return (
+            f"BulkInsertResult(inserted={self.inserted}, duplicates={self.duplicates}, "
+            f"updated={self.updated}, failed={self.failed}, batches={self.batches}, "
+            f"elapsed={self.elapsed:.3f}s)"
+        )
+
+
+class StorageBackend:
+    """
+    Interface commune des moteurs de stockage (MongoDB, SQLite, JSONL).
+
+    La logique partagée (conversion en document, empreinte, filtre des posts déjà vus,
+    découpage en lots) vit ici ; chaque moteur implémente l'écriture d'un lot,
+    la mise à jour des compteurs et la relecture des posts.
+    """
+
+    # Nom du moteur (utilisé dans les logs et par storage.factory)
+    name = "base"
+    # Empreinte compacte du post (nom de page + texte normalisés), clé d'unicité
+    IDENTITY_FIELD = "fingerprint"
+
+    def __init__(self, batch_size: int = 500):
+        self.logger = setup_logger(self.__class__.__module__)
+        self.batch_size = batch_size
+        # Filtre en mémoire des empreintes déjà stockées (voir preload_seen)
+        self.seen = None
+
+    def preload_seen(self, kind: str = "exact", error_rate: float = 0.001, capacity: int = None):
+        """
+        Charge en mémoire les empreintes déjà stockées pour écarter les doublons
+        avant toute écriture dans insert_many_posts.
+
+        Args:
+            kind (str): 'exact' (set) ou 'bloom' (filtre de Bloom, plus compact).
+            error_rate (float): Taux de faux positifs du filtre de Bloom.
+            capacity (int): Capacité du filtre de Bloom (défaut : 2x le nombre de posts stockés).
+        """
+        if kind == "bloom" and capacity is None:
+            capacity = max(1_000, 2 * self.count())
+        self.seen = create_seen_filter(kind, capacity=capacity or 1_000_000, error_rate=error_rate)
+        self.seen.update(self._iter_fingerprints())
+        self.logger.info("🧠 %s empreintes préchargées (filtre : %s).", len(self.seen), kind)
+        return self.seen
+
+    def insert_post(self, post):
+        result = self.insert_many_posts([post])
+        if result.duplicates:
+            self.logger.warning("⚠️ Doublon détecté : insertion ignorée.")
+        return result
+
+    def insert_many_posts(self, posts, batch_size: int = None, upsert: bool = False) -> BulkInsertResult:
+        """
+        Insère plusieurs posts par lots.
+
+        Args:
+            posts: Liste (ou itérable) de PostModel ou de dictionnaires.
+            batch_size (int): Taille des lots (défaut : self.batch_size).
+            upsert (bool): Si True, met à jour les posts existants (clé 'fingerprint')
+                au lieu de les rejeter comme doublons.
+
+        Si preload_seen a été appelé, les posts déjà connus (ou répétés dans l'appel) sont
+        écartés avant l'écriture et comptés comme doublons (hors mode upsert). Seuls les posts
+        effectivement écrits (ou déjà présents) rejoignent le filtre : un lot en échec peut être renvoyé.
+
+        Returns:
+            BulkInsertResult: compteurs inserted / duplicates / updated / failed / elapsed.
+        """
+        batch_size = batch_size or self.batch_size
+        result = BulkInsertResult()
+        start = time.perf_counter()
+
+        batch = []
+        # Empreintes envoyées dans cet appel : un doublon dans le même appel est écarté aussi
+        sent = set()
+        for post in posts:
+            doc = self._to_document(post)
+            if doc is None:
+                result.failed += 1
+                continue
+            if not upsert and self.seen is not None:
+                fingerprint = doc[self.IDENTITY_FIELD]
+                if fingerprint in self.seen or fingerprint in sent:
+                    result.duplicates += 1
+                    continue
+                sent.add(fingerprint)
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                result.merge(self._write_and_remember(batch, upsert))
+                batch = []
+        if batch:
+            result.merge(self._write_and_remember(batch, upsert))
+
+        result.elapsed = time.perf_counter() - start
+        self.logger.info(
+            "✅ Insertion terminée (%s) : %d insérés, %d mis à jour, %d doublons, %d échecs (%d lots, %.2fs)",
+            self.name, result.inserted, result.updated, result.duplicates, result.failed, result.batches, result.elapsed
+        )
+        return result
+
+    def _write_and_remember(self, batch: List[Dict], upsert: bool) -> BulkInsertResult:
+        """Écrit un lot puis ajoute au filtre 'seen' les empreintes écrites ou déjà présentes (pas les échecs)."""
+        batch_result = self._write_batch(batch, upsert)
+        if self.seen is not None:
+            failed = set(batch_result.failed_ids)
+            self.seen.update(doc[self.IDENTITY_FIELD] for doc in batch if doc[self.IDENTITY_FIELD] not in failed)
+        return batch_result
+
+    def update_engagement(self, updates: Iterable[Dict], history_size: int = 20, batch_size: int = None) -> BulkInsertResult:
+        """Met à jour les compteurs {'fingerprint', 'comments', 'shares'} de posts déjà stockés."""
+        raise NotImplementedError
+
+    def iter_posts(self) -> Iterator[Dict]:
+        """Relit tous les posts stockés (sans identifiant interne du moteur)."""
+        raise NotImplementedError
+
+    def count(self) -> int:
+        """Nombre (éventuellement estimé) de posts stockés."""
+        raise NotImplementedError
+
+    def close(self):
+        """Libère les ressources du moteur (connexion, fichier)."""
+
+    def _write_batch(self, docs: List[Dict], upsert: bool) -> BulkInsertResult:
+        raise NotImplementedError
+
+    def _iter_fingerprints(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def _to_document(self, post):
+        if hasattr(post, "to_dict"):
+            post = post.to_dict()
+        if not isinstance(post, dict):
+            self.logger.error("❌ Le document à insérer n'est pas un dictionnaire valide.")
+            return None
+        if not post.get(self.IDENTITY_FIELD):
+            post = dict(post, **{self.IDENTITY_FIELD: compute_fingerprint(post.get("page_name"), post.get("text"))})
+        return post
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,94 @@
+# storage/crawl_state.py
+
+from utils.logger import setup_logger
+
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+
+"""
+État de crawl par sujet : empreintes des posts déjà vus et derniers compteurs d'engagement connus.
+Permet aux re-crawls planifiés de s'arrêter dès qu'ils retombent sur du contenu connu et de ne
+mettre à jour que les compteurs qui ont changé.
+"""
+
+DEFAULT_STATE_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'crawl_state')
+
+
+class CrawlState:
+    """
+    Args:
+        query (str): Sujet de recherche.
+        max_known (int): Nombre maximal d'empreintes retenues (les plus anciennes sont oubliées).
+    """
+
+    def __init__(self, query: str, max_known: int = 5_000):
+        self.query = query
+        self.max_known = max_known
+        # empreinte -> (commentaires, partages) vus au dernier passage, du plus ancien au plus récent
+        self.known: "OrderedDict[str, Tuple[Optional[int], Optional[int]]]" = OrderedDict()
+        self.last_run: Optional[float] = None
+
+    def __contains__(self, fingerprint: str) -> bool:
+        return fingerprint in self.known
+
+    def engagement_of(self, fingerprint: str) -> Optional[Tuple[Optional[int], Optional[int]]]:
+        return self.known.get(fingerprint)
+
+    def remember(self, fingerprint: str, comments: Optional[int], shares: Optional[int]):
+        self.known[fingerprint] = (comments, shares)
+        self.known.move_to_end(fingerprint)
+        while len(self.known) > self.max_known:
+            self.known.popitem(last=False)
+
+    def to_dict(self) -> Dict:
+        return {
+            "query": self.query,
+            "last_run": self.last_run,
+            "known": [[fp, c, s] for fp, (c, s) in self.known.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, max_known: int = 5_000) -> "CrawlState":
+        state = cls(data["query"], max_known=max_known)
+        state.last_run = data.get("last_run")
+        for fingerprint, comments, shares in data.get("known", []):
+            state.known[fingerprint] = (comments, shares)
+        return state
+
+
+class CrawlStateStore:
+    """Un fichier JSON par sujet dans 'directory'."""
+
+    def __init__(self, directory: str = DEFAULT_STATE_DIR, max_known: int = 5_000):
+        self.logger = setup_logger(__name__)
+        self.directory = directory
+        self.max_known = max_known
+
+    def _path(self, query: str) -> str:
+        slug = re.sub(r"[^a-z0-9]+", "-", query.lower()).strip("-")[:40] or "query"
+        digest = hashlib.sha1(query.encode("utf-8")).hexdigest()[:8]
+        return os.path.join(self.directory, f"{slug}_{digest}.json")
+
+    def load(self, query: str) -> CrawlState:
+        try:
+            with open(self._path(query), "r", encoding="utf-8") as f:
+                return CrawlState.from_dict(json.load(f), max_known=self.max_known)
+        except FileNotFoundError:
+            return CrawlState(query, max_known=self.max_known)
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning("⚠️ État de crawl illisible pour '%s', repart de zéro : %s", query, e)
+            return CrawlState(query, max_known=self.max_known)
+
+    def save(self, state: CrawlState):
+        state.last_run = time.time()
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state.to_dict(), f)
+        os.replace(tmp_path, self._path(state.query))
@@ -0,0 +1,39 @@
+# storage/factory.py
+
+from storage.base import StorageBackend
+
+import os
+
+"""
+Choix du moteur de stockage à l'exécution.
+
+Variables d'environnement :
+    FB_SCRAPER_STORAGE : 'mongo' (défaut), 'sqlite' ou 'jsonl'.
+    FB_SCRAPER_STORAGE_PATH : fichier des moteurs locaux (sqlite / jsonl).
+Les modules des moteurs sont importés à la demande : pymongo n'est pas requis
+pour les moteurs locaux.
+"""
+
+STORAGE_KINDS = ("mongo", "sqlite", "jsonl")
+
+
+def create_storage(kind: str = None, path: str = None, **kwargs) -> StorageBackend:
+    """
+    Args:
+        kind (str): Moteur ('mongo', 'sqlite', 'jsonl'), défaut : FB_SCRAPER_STORAGE ou 'mongo'.
+        path (str): Fichier des moteurs locaux, défaut : FB_SCRAPER_STORAGE_PATH ou data/.
+        **kwargs: Transmis au constructeur du moteur (ex : batch_size).
+    """
+    kind = (kind or os.environ.get("FB_SCRAPER_STORAGE") or "mongo").lower()
+    path = path or os.environ.get("FB_SCRAPER_STORAGE_PATH")
+
+    if kind == "mongo":
+        from storage.mongo_client import MongoDBClient
+        return MongoDBClient(**kwargs)
+    if kind == "sqlite":
+        from storage.sqlite_backend import DEFAULT_SQLITE_PATH, SQLiteStorage
+        return SQLiteStorage(path or DEFAULT_SQLITE_PATH, **kwargs)
+    if kind == "jsonl":
+        from storage.jsonl_backend import DEFAULT_JSONL_PATH, JsonLinesStorage
+        return JsonLinesStorage(path or DEFAULT_JSONL_PATH, **kwargs)
+    raise ValueError(f"Moteur de stockage inconnu : '{kind}' (attendu : {', '.join(STORAGE_KINDS)})")
@@ -0,0 +1,200 @@
+# storage/jsonl_backend.py
+
+from storage.base import BulkInsertResult, StorageBackend
+
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional
+import hashlib
+import json
+import os
+import threading
+import time
+
+"""
+Moteur de stockage en ajout seul : un document JSON par ligne, jamais réécrit.
+Les mises à jour (upsert, compteurs d'engagement) sont ajoutées comme de nouvelles lignes
+et appliquées à la relecture (iter_posts) : la dernière version d'un post l'emporte.
+"""
+
+DEFAULT_JSONL_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'posts.jsonl')
+
+# Clé des lignes d'opération (les lignes sans cette clé sont des posts)
+OP_FIELD = "_op"
+
+
+def _digest(doc: Dict) -> str:
+    """Condensé d'une version de document (détection des upserts identiques)."""
+    payload = json.dumps(doc, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class JsonLinesStorage(StorageBackend):
+    """
+    Args:
+        path (str): Fichier JSONL (créé si absent).
+        batch_size (int): Nombre de posts écrits par appel à write().
+        fsync (bool): Force l'écriture sur disque après chaque lot.
+    """
+
+    name = "jsonl"
+
+    def __init__(self, path: str = DEFAULT_JSONL_PATH, batch_size: int = 500, fsync: bool = False):
+        super().__init__(batch_size=batch_size)
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Sans index, l'unicité repose sur les empreintes présentes dans le fichier, chacune associée au
+        # condensé de sa dernière version écrite (None après une mise à jour des compteurs)
+        self._known: Dict[str, Optional[str]] = self._scan_versions()
+        self._file = open(path, "a", encoding="utf-8")
+        self.logger.info("✅ Fichier JSONL ouvert : %s (%d posts)", path, len(self._known))
+
+    def count(self) -> int:
+        return len(self._known)
+
+    def iter_posts(self) -> Iterator[Dict]:
+        with self._lock:
+            self._file.flush()
+        posts: "OrderedDict[str, Dict]" = OrderedDict()
+        for record in self._read_records():
+            op = record.pop(OP_FIELD, None)
+            fingerprint = record.get(self.IDENTITY_FIELD)
+            if op == "engagement":
+                post = posts.get(fingerprint)
+                if post is None:
+                    continue
+                keep = record.pop("keep")
+                counts = {"comments": record["comments"], "shares": record["shares"]}
+                post.update(counts, engagement_updated_at=record["at"])
+                post["engagement_history"] = (post.get("engagement_history", []) + [dict(counts, at=record["at"])])[-keep:]
+            elif op == "upsert" and fingerprint in posts:
+                posts[fingerprint].update(record)
+            else:
+                posts[fingerprint] = record
+        return iter(posts.values())
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def update_engagement(self, updates: Iterable[Dict], history_size: int = 20, batch_size: int = None) -> BulkInsertResult:
+        """
+        Ajoute une ligne de mise à jour des compteurs par post connu.
+
+        Args:
+            updates: Dictionnaires {'fingerprint', 'comments', 'shares'}.
+            history_size (int): Nombre maximal d'entrées gardées dans 'engagement_history' à la relecture.
+        """
+        result = BulkInsertResult()
+        start = time.perf_counter()
+        now = datetime.now(timezone.utc).isoformat()
+        records = []
+        with self._lock:
+            # Vérification, écriture et mise à jour de _known sous le même verrou (écritures concurrentes)
+            for update in updates:
+                if update[self.IDENTITY_FIELD] not in self._known:
+                    result.failed += 1
+                    result.failed_ids.append(update[self.IDENTITY_FIELD])
+                    continue
+                records.append({
+                    OP_FIELD: "engagement",
+                    self.IDENTITY_FIELD: update[self.IDENTITY_FIELD],
+                    "comments": update.get("comments"),
+                    "shares": update.get("shares"),
+                    "at": now,
+                    "keep": history_size,
+                })
+            try:
+                self._append(records)
+            except OSError as e:
+                result.failed += len(records)
+                result.failed_ids.extend(record[self.IDENTITY_FIELD] for record in records)
+                self.logger.error("❌ Erreur lors de la mise à jour des compteurs : %s", e)
+                records = []
+            for record in records:
+                self._known[record[self.IDENTITY_FIELD]] = None
+        if records:
+            result.batches = 1
+            result.updated = len(records)
+            self.logger.info("📈 %d compteurs d'engagement mis à jour (%d non trouvés).", result.updated, result.failed)
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def _iter_fingerprints(self) -> Iterable[str]:
+        return iter(self._known)
+
+    def _write_batch(self, docs: List[Dict], upsert: bool) -> BulkInsertResult:
+        result = BulkInsertResult()
+        result.batches = 1
+        start = time.perf_counter()
+        records = []
+        # Versions écrites par ce lot : reportées dans _known seulement une fois l'écriture réussie
+        written: Dict[str, str] = {}
+        with self._lock:
+            for doc in docs:
+                fingerprint = doc[self.IDENTITY_FIELD]
+                known = fingerprint in self._known or fingerprint in written
+                digest = _digest(doc)
+                if not known:
+                    records.append(doc)
+                    result.inserted += 1
+                elif not upsert or written.get(fingerprint, self._known.get(fingerprint)) == digest:
+                    # Même version que la dernière écrite : rien à ajouter (comme Mongo et SQLite)
+                    result.duplicates += 1
+                    continue
+                else:
+                    records.append(dict(doc, **{OP_FIELD: "upsert"}))
+                    result.updated += 1
+                written[fingerprint] = digest
+            # Écriture sous le même verrou que la vérification : deux lots concurrents ne peuvent
+            # pas ajouter chacun le même nouveau post
+            try:
+                self._append(records)
+            except OSError as e:
+                result.failed += len(records)
+                result.failed_ids.extend(record[self.IDENTITY_FIELD] for record in records)
+                result.inserted = result.updated = 0
+                self.logger.error("❌ Erreur lors de l'écriture du lot : %s", e)
+            else:
+                self._known.update(written)
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def _append(self, records: List[Dict]):
+        """Ajoute les lignes au fichier (l'appelant détient self._lock)."""
+        if not records:
+            return
+        payload = "".join(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in records)
+        self._file.write(payload)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _read_records(self) -> Iterator[Dict]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Ligne tronquée (arrêt brutal pendant une écriture) : ignorée
+                    self.logger.warning("⚠️ Ligne %d illisible ignorée dans %s", line_number, self.path)
+
+    def _scan_versions(self) -> Dict[str, Optional[str]]:
+        versions = {}
+        for record in self._read_records():
+            fingerprint = record.get(self.IDENTITY_FIELD)
+            if not fingerprint:
+                continue
+            op = record.pop(OP_FIELD, None)
+            if op is None or (op == "upsert" and fingerprint in versions):
+                versions[fingerprint] = _digest(record)
+            elif op == "engagement" and fingerprint in versions:
+                versions[fingerprint] = None
+        return versions
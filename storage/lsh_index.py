@@ -0,0 +1,176 @@
+# storage/lsh_index.py
+
+from selenium_scraper.minhash import (
+    DEFAULT_NUM_PERM, MinHasher, is_truncated, normalize_for_similarity, optimal_bands,
+    signature_from_hex, signature_to_hex
+)
+from utils.logger import setup_logger
+
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+import struct
+import threading
+
+"""
+Index LSH (locality-sensitive hashing) persistant des signatures MinHash des posts.
+
+La signature est découpée en bandes ; deux posts qui partagent une bande entière deviennent
+candidats, puis sont vérifiés contre le seuil de similarité : la recherche ne compare un post
+qu'à une poignée de candidats au lieu de tout le corpus. Chaque post indexé appartient à un
+groupe ('cluster_id' = empreinte du premier post du groupe).
+
+Les textes tronqués (« … En voir plus ») ont une similarité de Jaccard faible avec le texte
+complet : ils sont aussi rapprochés par le début de leur texte normalisé (PREFIX_CHARS caractères).
+
+Persistance : un fichier JSONL en ajout seul, relu au démarrage.
+"""
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'lsh_index.jsonl')
+DEFAULT_THRESHOLD = 0.8
+# Longueur du préfixe normalisé commun exigé entre un texte tronqué et le texte complet
+PREFIX_CHARS = 200
+
+
+def prefix_key(text: Optional[str]) -> Optional[str]:
+    """Clé du début du texte normalisé (None si le texte est trop court pour être rapproché ainsi)."""
+    normalized = normalize_for_similarity(text)
+    if len(normalized) < PREFIX_CHARS:
+        return None
+    return hashlib.blake2b(normalized[:PREFIX_CHARS].encode("utf-8"), digest_size=12).hexdigest()
+
+
+class LSHIndex:
+    """
+    Args:
+        path (str): Fichier JSONL de l'index (None : index en mémoire seulement).
+        threshold (float): Similarité de Jaccard estimée minimale pour rattacher un post à un groupe.
+        num_perm (int): Longueur des signatures (doit correspondre au MinHasher utilisé).
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_INDEX_PATH, threshold: float = DEFAULT_THRESHOLD,
+                 num_perm: int = DEFAULT_NUM_PERM):
+        self.logger = setup_logger(__name__)
+        self.path = path
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = optimal_bands(num_perm, threshold)
+        self._lock = threading.Lock()
+        # empreinte -> (cluster_id, signature compacte)
+        self._entries: Dict[str, Tuple[str, bytes]] = {}
+        # une table par bande : clé de bande -> empreintes
+        self._buckets: List[Dict[bytes, List[str]]] = [defaultdict(list) for _ in range(self.bands)]
+        # clé de préfixe -> [(empreinte, texte tronqué ?)]
+        self._prefixes: Dict[str, List[Tuple[str, bool]]] = defaultdict(list)
+        self._file = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._load()
+            self._file = open(path, "a", encoding="utf-8")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, fingerprint: str) -> bool:
+        return fingerprint in self._entries
+
+    def cluster_of(self, fingerprint: str) -> Optional[str]:
+        entry = self._entries.get(fingerprint)
+        return entry[0] if entry else None
+
+    def _band_keys(self, packed: bytes) -> List[bytes]:
+        width = self.rows * 4
+        return [packed[i * width:(i + 1) * width] for i in range(self.bands)]
+
+    def query(self, signature: Tuple[int, ...], prefix: Optional[str] = None,
+              truncated: bool = False) -> Optional[Tuple[str, float]]:
+        """
+        Groupe le plus proche d'une signature : (cluster_id, similarité estimée), ou None sous le seuil.
+        Un texte tronqué est rattaché à tout post de même préfixe ; un texte complet, aux posts tronqués de même préfixe.
+        """
+        packed = struct.pack(f"<{len(signature)}I", *signature)
+        candidates = set()
+        for band, key in enumerate(self._band_keys(packed)):
+            candidates.update(self._buckets[band].get(key, ()))
+        best = None
+        for fingerprint in candidates:
+            cluster_id, other = self._entries[fingerprint]
+            similarity = MinHasher.similarity(signature, struct.unpack(f"<{len(other) // 4}I", other))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (cluster_id, similarity)
+        if best is None and prefix is not None:
+            for fingerprint, other_truncated in self._prefixes.get(prefix, ()):
+                if truncated or other_truncated:
+                    return self._entries[fingerprint][0], self.threshold
+        return best
+
+    def add(self, fingerprint: str, signature: Tuple[int, ...], cluster_id: str,
+            prefix: Optional[str] = None, truncated: bool = False, persist: bool = True):
+        """Indexe un post dans un groupe (sans effet si l'empreinte est déjà indexée)."""
+        with self._lock:
+            if fingerprint in self._entries:
+                return
+            packed = struct.pack(f"<{len(signature)}I", *signature)
+            self._entries[fingerprint] = (cluster_id, packed)
+            for band, key in enumerate(self._band_keys(packed)):
+                self._buckets[band][key].append(fingerprint)
+            if prefix is not None:
+                self._prefixes[prefix].append((fingerprint, truncated))
+            if persist and self._file is not None:
+                self._file.write(json.dumps({
+                    "fingerprint": fingerprint, "cluster_id": cluster_id, "minhash": signature_to_hex(signature),
+                    "prefix": prefix, "truncated": truncated
+                }) + "\n")
+
+    def assign(self, fingerprint: str, text: Optional[str], signature: Optional[Tuple[int, ...]] = None,
+               hasher: Optional[MinHasher] = None) -> Optional[Tuple[str, float]]:
+        """
+        Rattache un post à son groupe (ou en crée un) et l'indexe.
+
+        Returns:
+            (cluster_id, similarité) ; similarité 1.0 pour un nouveau groupe. None si le texte est vide.
+        """
+        if fingerprint in self._entries:
+            return self._entries[fingerprint][0], 1.0
+        if signature is None:
+            signature = (hasher or MinHasher(self.num_perm)).signature(text)
+        if signature is None:
+            return None
+        prefix, truncated = prefix_key(text), is_truncated(text)
+        match = self.query(signature, prefix, truncated)
+        cluster_id, similarity = match if match is not None else (fingerprint, 1.0)
+        self.add(fingerprint, signature, cluster_id, prefix, truncated)
+        return cluster_id, similarity
+
+    def flush(self):
+        if self._file is not None:
+            with self._lock:
+                self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            with self._lock:
+                self._file.close()
+            self._file = None
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    signature = signature_from_hex(entry["minhash"])
+                    if len(signature) != self.num_perm:
+                        continue
+                    self.add(entry["fingerprint"], signature, entry["cluster_id"],
+                             entry.get("prefix"), entry.get("truncated", False), persist=False)
+        except FileNotFoundError:
+            return
+        self.logger.info("🧬 Index LSH chargé : %d posts (%d bandes x %d lignes, seuil %.2f).",
+                         len(self._entries), self.bands, self.rows, self.threshold)
@@ -0,0 +1,104 @@
+# storage/media_store.py
+
+from utils.logger import setup_logger
+
+from typing import Dict, Optional
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+"""
+Stockage local des images, adressé par contenu : chaque fichier est nommé par le SHA-256
+de ses octets, donc une image présente sous plusieurs URL n'est écrite qu'une fois.
+Un index JSONL associe la clé normalisée de chaque URL (voir pipeline/media.py) au hash
+téléchargé : une URL déjà connue n'est plus jamais re-téléchargée.
+"""
+
+DEFAULT_MEDIA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'media')
+INDEX_FILENAME = "index.jsonl"
+
+
+class MediaStore:
+    """
+    Args:
+        directory (str): Racine du stockage (fichiers dans <aa>/<hash><ext>).
+    """
+
+    def __init__(self, directory: str = DEFAULT_MEDIA_DIR):
+        self.logger = setup_logger(__name__)
+        self.directory = directory
+        self._lock = threading.Lock()
+        # clé d'URL normalisée -> hash du contenu
+        self._keys: Dict[str, str] = {}
+        # hash du contenu -> chemin relatif du fichier
+        self._files: Dict[str, str] = {}
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.directory, INDEX_FILENAME)
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Hash du contenu déjà téléchargé pour cette clé d'URL, ou None."""
+        return self._keys.get(key)
+
+    def path_of(self, digest: str) -> Optional[str]:
+        relative_path = self._files.get(digest)
+        return os.path.join(self.directory, relative_path) if relative_path else None
+
+    def put(self, key: str, content: bytes, extension: str = "") -> str:
+        """
+        Enregistre le contenu (s'il n'existe pas déjà) et associe la clé à son hash.
+
+        Returns:
+            str: SHA-256 hexadécimal du contenu.
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        with self._lock:
+            known = digest in self._files
+        if not known:
+            relative_path = os.path.join(digest[:2], digest + extension)
+            path = os.path.join(self.directory, relative_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Écriture atomique : jamais de fichier partiel sous un nom de hash
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        with self._lock:
+            if key in self._keys and digest in self._files:
+                return digest
+            if not known:
+                self._files.setdefault(digest, relative_path)
+            self._keys[key] = digest
+            entry = {"key": key, "hash": digest, "path": self._files[digest], "size": len(content)}
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return digest
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    # Une entrée dont le fichier a disparu est ignorée : l'image sera re-téléchargée
+                    if os.path.exists(os.path.join(self.directory, entry["path"])):
+                        self._keys[entry["key"]] = entry["hash"]
+                        self._files[entry["hash"]] = entry["path"]
+        except FileNotFoundError:
+            return
+        self.logger.info("🖼️ Stockage média chargé : %d images, %d URL connues.", len(self._files), len(self._keys))
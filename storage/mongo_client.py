@@ -1,35 +1,97 @@
 # storage/mongo_client.py
 
-from pymongo import MongoClient
-from pymongo.errors import DuplicateKeyError, PyMongoError
+from pymongo import MongoClient, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
 from urllib.parse import quote_plus
 from config.config import get_secret
+from selenium_scraper.model import compute_fingerprint
+from storage.base import BulkInsertResult, StorageBackend
 
-from utils.logger import setup_logger
+from utils.metrics import metrics
 
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List
+import os
+import threading
+import time
 
-class MongoDBClient:
-    def __init__(self, db_name="fb_scraper", collection_name="posts"):
-        self.logger = setup_logger(__name__)
+# Code d'erreur MongoDB pour une violation d'index unique
+DUPLICATE_KEY_CODE = 11000
+
+# Un seul MongoClient (et donc un seul pool de connexions) par URI et par processus
+_SHARED_CLIENTS = {}
+# Collections dont les index ont déjà été vérifiés dans ce processus
+_INDEXED_COLLECTIONS = set()
+_SHARED_LOCK = threading.Lock()
+
+
+def get_shared_client(uri: str, max_pool_size: int = None) -> MongoClient:
+    """
+    Retourne le MongoClient partagé pour cette URI, créé au premier appel.
+
+    MongoClient est thread-safe et gère lui-même son pool : tous les MongoDBClient
+    d'un processus (threads du pipeline, appels successifs) réutilisent les mêmes connexions.
+    Chaque processus du pool de scraping (démarré en 'spawn') a son propre client.
+    """
+    with _SHARED_LOCK:
+        client = _SHARED_CLIENTS.get(uri)
+        if client is None:
+            max_pool_size = max_pool_size or int(os.environ.get("MONGO_MAX_POOL_SIZE", 50))
+            client = MongoClient(uri, maxPoolSize=max_pool_size)
+            _SHARED_CLIENTS[uri] = client
+        return client
+
+
+def close_shared_clients():
+    """Ferme tous les clients partagés (fin de processus)."""
+    with _SHARED_LOCK:
+        for client in _SHARED_CLIENTS.values():
+            client.close()
+        _SHARED_CLIENTS.clear()
+        _INDEXED_COLLECTIONS.clear()
+
+
+class MongoDBClient(StorageBackend):
+    name = "mongo"
+    # Ancien index unique sur le texte complet, remplacé par l'empreinte
+    LEGACY_INDEX_NAME = "text_1_page_name_1"
+
+    def __init__(self, db_name="fb_scraper", collection_name="posts", batch_size: int = 500, shared: bool = True):
+        """
+        Args:
+            shared (bool): Réutilise le MongoClient du processus (voir get_shared_client)
+                et ne vérifie les index qu'une fois par collection. False : client dédié,
+                fermé par close().
+        """
+        super().__init__(batch_size=batch_size)
         self.db_name = db_name
         self.collection_name = collection_name
+        self.shared = shared
+        # URI du client partagé utilisé (None pour un client dédié)
+        self._shared_uri = None
         
         try:
             self.client = self._connect()
             self.collection = self._get_collection()
-            self._ensure_indexes()
-            self.logger.info(f"✅ Connexion à MongoDB établie (DB: {db_name}, Collection: {collection_name})")
+            key = (self._shared_uri, db_name, collection_name)
+            if self._shared_uri is None or key not in _INDEXED_COLLECTIONS:
+                if self._ensure_indexes():
+                    _INDEXED_COLLECTIONS.add(key)
+            self.logger.info("✅ Connexion à MongoDB établie (DB: %s, Collection: %s)", db_name, collection_name)
         except Exception as e:
-            self.logger.error(f"❌ Erreur lors de l'initialisation de MongoDB : {e}")
+            self.logger.error("❌ Erreur lors de l'initialisation de MongoDB : %s", e)
             raise
             
     def _connect(self):
         username = quote_plus(get_secret("MONGO_USER"))
         password = quote_plus(get_secret("MONGO_PASSWORD"))
-        host = get_secret("MONGO_HOST") or "localhost"
-        port = get_secret("MONGO_PORT") or 27017
+        host = get_secret("MONGO_HOST", "localhost")
+        port = get_secret("MONGO_PORT", 27017)
 
         uri = f"mongodb://{username}:{password}@{host}:{port}/"
+        if self.shared:
+            self._shared_uri = uri
+            return get_shared_client(uri)
         return MongoClient(uri)
 
     def _get_collection(self):
@@ -38,20 +100,88 @@ class MongoDBClient:
 
     def _ensure_indexes(self):
         try :
+            # sparse : les documents antérieurs sans empreinte ne bloquent pas l'index (voir migrate_fingerprints)
             self.collection.create_index(
-                [("text", 1), ("page_name", 1)],
-                unique=True
+                [(self.IDENTITY_FIELD, 1)],
+                unique=True,
+                sparse=True
             )
-            self.logger.info("📌 Index unique créé sur ('text', 'page_name')")
+            self.logger.info("📌 Index unique créé sur ('%s')", self.IDENTITY_FIELD)
+            # Regroupement des quasi-doublons (voir pipeline/dedup.py)
+            self.collection.create_index([("cluster_id", 1)], sparse=True)
+            return True
         except PyMongoError as e:
-            self.logger.warning(f"⚠️ Impossible de créer l'index : {e}")
+            self.logger.warning("⚠️ Impossible de créer l'index : %s", e)
+            return False
 
-    def insert_post(self, post):
-        if hasattr(post, "to_dict"):
-            post = post.to_dict()
+    def migrate_fingerprints(self, batch_size: int = None, drop_legacy_index: bool = True) -> Dict:
+        """
+        Migre une collection existante vers l'identité par empreinte :
+        calcule 'fingerprint' pour les documents qui n'en ont pas, supprime les doublons
+        révélés par la normalisation (le plus ancien est conservé), puis retire l'ancien
+        index unique ('text', 'page_name').
+        """
+        batch_size = batch_size or self.batch_size
+        stats = {"updated": 0, "removed_duplicates": 0, "legacy_index_dropped": False}
+        known = {
+            doc[self.IDENTITY_FIELD]
+            for doc in self.collection.find({self.IDENTITY_FIELD: {"$exists": True}}, {self.IDENTITY_FIELD: 1, "_id": 0})
+        }
+
+        updates, duplicates = [], []
+        cursor = self.collection.find(
+            {self.IDENTITY_FIELD: {"$exists": False}},
+            {"page_name": 1, "text": 1}
+        ).sort("_id", 1)
+        for doc in cursor:
+            fingerprint = compute_fingerprint(doc.get("page_name"), doc.get("text"))
+            if fingerprint in known:
+                duplicates.append(doc["_id"])
+                continue
+            known.add(fingerprint)
+            updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": {self.IDENTITY_FIELD: fingerprint}}))
+            if len(updates) >= batch_size:
+                stats["updated"] += self.collection.bulk_write(updates, ordered=False).modified_count
+                updates = []
+        if updates:
+            stats["updated"] += self.collection.bulk_write(updates, ordered=False).modified_count
+        for i in range(0, len(duplicates), batch_size):
+            stats["removed_duplicates"] += self.collection.delete_many(
+                {"_id": {"$in": duplicates[i:i + batch_size]}}
+            ).deleted_count
+
+        self._ensure_indexes()
+        if drop_legacy_index and self.LEGACY_INDEX_NAME in self.collection.index_information():
+            self.collection.drop_index(self.LEGACY_INDEX_NAME)
+            stats["legacy_index_dropped"] = True
+
+        self.logger.info(
+            "🔁 Migration des empreintes : %d documents mis à jour, %d doublons supprimés.",
+            stats["updated"], stats["removed_duplicates"]
+        )
+        return stats
+
+    def count(self) -> int:
+        return self.collection.estimated_document_count()
 
-        if not isinstance(post, dict):
-            self.logger.error("❌ Le document à insérer n'est pas un dictionnaire valide.")
+    def iter_posts(self) -> Iterator[Dict]:
+        return self.collection.find({}, {"_id": 0})
+
+    def close(self):
+        # Le client partagé reste ouvert pour les autres instances du processus
+        if not self.shared:
+            self.client.close()
+
+    def _iter_fingerprints(self) -> Iterable[str]:
+        cursor = self.collection.find(
+            {self.IDENTITY_FIELD: {"$exists": True}},
+            {self.IDENTITY_FIELD: 1, "_id": 0}
+        )
+        return (doc[self.IDENTITY_FIELD] for doc in cursor)
+
+    def insert_post(self, post):
+        post = self._to_document(post)
+        if post is None:
             return
 
         try:
@@ -60,15 +190,116 @@ class MongoDBClient:
         except DuplicateKeyError:
             self.logger.warning("⚠️ Doublon détecté : insertion ignorée.")
         except PyMongoError as e:
-            self.logger.error(f"❌ Erreur lors de l'insertion du post : {e}")
-
-    def insert_many_posts(self, posts):
-        self.logger.info(f"📥 Insertion de {len(posts)} posts...")
-        inserted = 0
-        for post in posts:
-            before = self.collection.count_documents({})
-            self.insert_post(post)
-            after = self.collection.count_documents({})
-            if after > before:
-                inserted += 1
-        self.logger.info(f"✅ {inserted} posts insérés avec succès.")
+            self.logger.error("❌ Erreur lors de l'insertion du post : %s", e)
+
+    def update_engagement(self, updates: Iterable[Dict], history_size: int = 20, batch_size: int = None) -> BulkInsertResult:
+        """
+        Met à jour par lots les compteurs de posts déjà stockés et conserve un court historique.
+
+        Args:
+            updates: Dictionnaires {'fingerprint', 'comments', 'shares'}.
+            history_size (int): Nombre maximal d'entrées gardées dans 'engagement_history'.
+        """
+        batch_size = batch_size or self.batch_size
+        result = BulkInsertResult()
+        start = time.perf_counter()
+        now = datetime.now(timezone.utc)
+        operations, fingerprints = [], []
+        for update in updates:
+            counts = {"comments": update.get("comments"), "shares": update.get("shares")}
+            fingerprints.append(update[self.IDENTITY_FIELD])
+            operations.append(UpdateOne(
+                {self.IDENTITY_FIELD: update[self.IDENTITY_FIELD]},
+                {
+                    "$set": dict(counts, engagement_updated_at=now),
+                    "$push": {"engagement_history": {"$each": [dict(counts, at=now)], "$slice": -history_size}},
+                }
+            ))
+        for i in range(0, len(operations), batch_size):
+            chunk = operations[i:i + batch_size]
+            chunk_fingerprints = fingerprints[i:i + batch_size]
+            result.batches += 1
+            try:
+                outcome = self.collection.bulk_write(chunk, ordered=False)
+                result.updated += outcome.modified_count
+                if outcome.matched_count < len(chunk):
+                    self._add_unmatched(result, chunk_fingerprints)
+            except BulkWriteError as e:
+                details = e.details or {}
+                result.updated += details.get("nModified", 0)
+                errors = details.get("writeErrors", [])
+                result.failed += len(errors)
+                result.failed_ids.extend(chunk_fingerprints[error["index"]] for error in errors)
+            except PyMongoError as e:
+                result.failed += len(chunk)
+                result.failed_ids.extend(chunk_fingerprints)
+                self.logger.error("❌ Erreur lors de la mise à jour des compteurs : %s", e)
+        result.elapsed = time.perf_counter() - start
+        metrics.inc("mongo_engagement_updates_total", result.updated)
+        if operations:
+            self.logger.info("📈 %d compteurs d'engagement mis à jour (%d non trouvés/échecs).", result.updated, result.failed)
+        return result
+
+    def _add_unmatched(self, result: BulkInsertResult, fingerprints: List[str]):
+        """Compte en échec les mises à jour sans document correspondant (bulk_write ne dit pas lesquelles)."""
+        try:
+            found = {
+                doc[self.IDENTITY_FIELD]
+                for doc in self.collection.find({self.IDENTITY_FIELD: {"$in": fingerprints}}, {self.IDENTITY_FIELD: 1, "_id": 0})
+            }
+        except PyMongoError as e:
+            self.logger.warning("⚠️ Impossible d'identifier les posts non trouvés : %s", e)
+            found = set()
+        missing = [fingerprint for fingerprint in fingerprints if fingerprint not in found]
+        result.failed += len(missing)
+        result.failed_ids.extend(missing)
+
+    def _build_operations(self, docs: List[Dict], upsert: bool) -> List:
+        if not upsert:
+            return [InsertOne(doc) for doc in docs]
+        return [
+            UpdateOne({self.IDENTITY_FIELD: doc[self.IDENTITY_FIELD]}, {"$set": doc}, upsert=True)
+            for doc in docs
+        ]
+
+    def _write_batch(self, docs: List[Dict], upsert: bool) -> BulkInsertResult:
+        """Envoie un lot en une seule requête et classe les erreurs (doublons vs échecs)."""
+        result = BulkInsertResult()
+        result.batches = 1
+        start = time.perf_counter()
+        try:
+            outcome = self.collection.bulk_write(self._build_operations(docs, upsert), ordered=False)
+            self._count_outcome(result, outcome.bulk_api_result, upsert)
+        except BulkWriteError as e:
+            details = e.details or {}
+            self._count_outcome(result, details, upsert)
+            for error in details.get("writeErrors", []):
+                if error.get("code") == DUPLICATE_KEY_CODE:
+                    result.duplicates += 1
+                else:
+                    result.failed += 1
+                    result.failed_ids.append(docs[error["index"]][self.IDENTITY_FIELD])
+            if details.get("writeErrors"):
+                self.logger.warning("⚠️ Lot partiellement rejeté : %s erreurs d'écriture.", len(details['writeErrors']))
+        except PyMongoError as e:
+            result.failed += len(docs)
+            result.failed_ids.extend(doc[self.IDENTITY_FIELD] for doc in docs)
+            self.logger.error("❌ Erreur lors de l'insertion du lot : %s", e)
+        result.elapsed = time.perf_counter() - start
+        metrics.observe("mongo_batch_write_seconds", result.elapsed, mode="upsert" if upsert else "insert")
+        metrics.inc("mongo_batch_docs_total", len(docs))
+        metrics.inc("mongo_inserted_total", result.inserted)
+        metrics.inc("mongo_updated_total", result.updated)
+        metrics.inc("mongo_duplicates_total", result.duplicates)
+        metrics.inc("mongo_failed_total", result.failed)
+        return result
+
+    @staticmethod
+    def _count_outcome(result: BulkInsertResult, details: Dict, upsert: bool):
+        if upsert:
+            result.inserted += details.get("nUpserted", 0)
+            result.updated += details.get("nModified", 0)
+            # Documents déjà présents et identiques : ni insérés ni modifiés
+            result.duplicates += details.get("nMatched", 0) - details.get("nModified", 0)
+        else:
+            result.inserted += details.get("nInserted", 0)
@@ -0,0 +1,77 @@
+# storage/seen_filter.py
+
+from typing import Iterable
+import hashlib
+import math
+
+
+class SeenSet:
+    """Filtre exact des empreintes déjà connues (set Python)."""
+
+    def __init__(self, fingerprints: Iterable[str] = ()):
+        self._items = set(fingerprints)
+
+    def add(self, fingerprint: str):
+        self._items.add(fingerprint)
+
+    def update(self, fingerprints: Iterable[str]):
+        self._items.update(fingerprints)
+
+    def __contains__(self, fingerprint: str) -> bool:
+        return fingerprint in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class BloomFilter:
+    """
+    Filtre de Bloom pour les empreintes de posts.
+
+    Beaucoup plus compact qu'un set pour de gros historiques, au prix d'un taux de faux
+    positifs configurable : un post nouveau peut (rarement) être considéré comme déjà vu.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        if capacity <= 0:
+            raise ValueError("La capacité du filtre de Bloom doit être positive.")
+        if not 0 < error_rate < 1:
+            raise ValueError("Le taux de faux positifs doit être compris entre 0 et 1.")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+
+    def _positions(self, fingerprint: str):
+        # Double hachage (Kirsch-Mitzenmacher) à partir d'un seul digest
+        digest = hashlib.blake2b(fingerprint.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, fingerprint: str):
+        for pos in self._positions(fingerprint):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self._count += 1
+
+    def update(self, fingerprints: Iterable[str]):
+        for fingerprint in fingerprints:
+            self.add(fingerprint)
+
+    def __contains__(self, fingerprint: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(fingerprint))
+
+    def __len__(self) -> int:
+        return self._count
+
+
+def create_seen_filter(kind: str = "exact", capacity: int = 1_000_000, error_rate: float = 0.001):
+    """Crée un filtre 'exact' (set) ou 'bloom' (filtre de Bloom)."""
+    if kind == "exact":
+        return SeenSet()
+    if kind == "bloom":
+        return BloomFilter(capacity=capacity, error_rate=error_rate)
+    raise ValueError(f"Type de filtre inconnu : {kind!r} (attendu : 'exact' ou 'bloom')")
@@ -0,0 +1,166 @@
+# storage/snapshot_archive.py
+
+from utils.logger import setup_logger
+
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional
+import gzip
+import json
+import os
+import re
+import tempfile
+import uuid
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # zstd optionnel : repli sur gzip
+    zstandard = None
+
+"""
+Archive locale des pages HTML capturées, compressées (zstd si disponible, sinon gzip).
+
+Chaque capture est un fichier compressé ; ses métadonnées (sujet, date, type, taille) sont
+ajoutées à un index JSONL à la racine de l'archive. Permet de re-parser hors ligne (voir reparse.py)
+quand Facebook change son balisage, sans re-scraper.
+"""
+
+DEFAULT_ARCHIVE_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'snapshots')
+INDEX_FILENAME = "index.jsonl"
+
+_EXTENSIONS = {"zstd": ".html.zst", "gzip": ".html.gz"}
+
+# Erreurs de lecture d'une capture absente, tronquée ou corrompue (voir load_snapshot)
+SNAPSHOT_ERRORS = (OSError, EOFError, zlib.error, UnicodeDecodeError) + (
+    (zstandard.ZstdError,) if zstandard is not None else ()
+)
+
+
+def _slugify(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-")[:60] or "query"
+
+
+class SnapshotArchive:
+    """
+    Args:
+        directory (str): Racine de l'archive.
+        codec (str): 'zstd', 'gzip' ou 'auto' (zstd si le module zstandard est installé).
+        level (int): Niveau de compression (défaut adapté au codec).
+    """
+
+    def __init__(self, directory: str = DEFAULT_ARCHIVE_DIR, codec: str = "auto", level: Optional[int] = None):
+        self.logger = setup_logger(__name__)
+        self.directory = directory
+        if codec == "auto":
+            codec = "zstd" if zstandard is not None else "gzip"
+        if codec not in _EXTENSIONS:
+            raise ValueError(f"Codec inconnu : {codec!r} (attendu : 'zstd', 'gzip' ou 'auto')")
+        if codec == "zstd" and zstandard is None:
+            raise ImportError("Le codec 'zstd' nécessite le paquet 'zstandard'.")
+        self.codec = codec
+        self.level = level if level is not None else (10 if codec == "zstd" else 6)
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.directory, INDEX_FILENAME)
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor(level=self.level).compress(data)
+        return gzip.compress(data, compresslevel=self.level)
+
+    def save(self, html: str, query: str, kind: str = "page", captured_at: Optional[datetime] = None) -> Dict:
+        """
+        Compresse et enregistre une capture. Retourne ses métadonnées (telles qu'écrites dans l'index).
+
+        Args:
+            kind (str): 'page' (page_source complète) ou 'fragments' (blocs de post du mode streaming).
+        """
+        captured_at = captured_at or datetime.now(timezone.utc)
+        raw = html.encode("utf-8")
+        day = captured_at.strftime("%Y-%m-%d")
+        filename = f"{_slugify(query)}_{captured_at.strftime('%H%M%S')}_{uuid.uuid4().hex[:8]}{_EXTENSIONS[self.codec]}"
+        relative_path = os.path.join(day, filename)
+        os.makedirs(os.path.join(self.directory, day), exist_ok=True)
+
+        compressed = self._compress(raw)
+        # Écriture atomique : un arrêt en cours d'écriture ne laisse jamais de capture tronquée sous son nom final
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.join(self.directory, day), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(compressed)
+            os.replace(tmp_path, os.path.join(self.directory, relative_path))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        metadata = {
+            "path": relative_path,
+            "query": query,
+            "kind": kind,
+            "captured_at": captured_at.isoformat(),
+            "codec": self.codec,
+            "size": len(raw),
+            "compressed_size": len(compressed),
+        }
+        # Une ligne par capture, écrite en un seul appel (append) : sûr avec plusieurs processus
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(metadata, ensure_ascii=False) + "\n")
+        self.logger.info("🗄️ Capture archivée : %s (%.1f Mo → %.2f Mo)", relative_path, len(raw) / 1_000_000, len(compressed) / 1_000_000)
+        return metadata
+
+    def save_fragments(self, fragments: List[str], query: str) -> Optional[Dict]:
+        """Archive un lot de fragments HTML (mode streaming) en une seule capture."""
+        if not fragments:
+            return None
+        return self.save("\n".join(fragments), query, kind="fragments")
+
+    def tee(self, fragments: Iterable[str], query: str, chunk_size: int = 50) -> Iterator[str]:
+        """Laisse passer les fragments tout en les archivant par paquets de 'chunk_size'."""
+        chunk = []
+        try:
+            for fragment in fragments:
+                chunk.append(fragment)
+                if len(chunk) >= chunk_size:
+                    self.save_fragments(chunk, query)
+                    chunk = []
+                yield fragment
+        finally:
+            self.save_fragments(chunk, query)
+
+    def iter_snapshots(self, query: Optional[str] = None, since: Optional[str] = None) -> Iterator[Dict]:
+        """Parcourt les métadonnées de l'index, filtrées par sujet et/ou date ISO minimale."""
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        metadata = json.loads(line)
+                    except ValueError:
+                        self.logger.warning("⚠️ Ligne d'index illisible ignorée.")
+                        continue
+                    if query is not None and metadata.get("query") != query:
+                        continue
+                    if since is not None and metadata.get("captured_at", "") < since:
+                        continue
+                    yield metadata
+        except FileNotFoundError:
+            return
+
+    def path_of(self, metadata: Dict) -> str:
+        return os.path.join(self.directory, metadata["path"])
+
+
+def load_snapshot(path: str) -> str:
+    """Décompresse une capture (codec déduit de l'extension). Lève une des SNAPSHOT_ERRORS si elle est illisible."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if path.endswith(_EXTENSIONS["zstd"]):
+        if zstandard is None:
+            raise ImportError("Le paquet 'zstandard' est nécessaire pour lire les captures .zst.")
+        data = zstandard.ZstdDecompressor().decompress(data, max_output_size=1 << 31)
+    elif path.endswith(_EXTENSIONS["gzip"]):
+        data = gzip.decompress(data)
+    return data.decode("utf-8")
@@ -0,0 +1,225 @@
+# storage/sqlite_backend.py
+
+from storage.base import BulkInsertResult, StorageBackend
+from utils.metrics import metrics
+
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List
+import json
+import os
+import sqlite3
+import threading
+import time
+
+"""
+Moteur de stockage embarqué SQLite : aucun serveur, un seul fichier.
+Pour les exécutions locales, la CI et les benchmarks du pipeline complet.
+"""
+
+DEFAULT_SQLITE_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'fb_scraper.sqlite3')
+
+# Colonnes dédiées ; les autres champs du document sont conservés dans 'extra' (JSON)
+_COLUMNS = ("fingerprint", "page_name", "text", "images", "comments", "shares",
+            "engagement_history", "engagement_updated_at")
+_JSON_COLUMNS = ("images", "engagement_history")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    fingerprint TEXT PRIMARY KEY,
+    page_name TEXT,
+    text TEXT,
+    images TEXT,
+    comments INTEGER,
+    shares INTEGER,
+    engagement_history TEXT,
+    engagement_updated_at TEXT,
+    extra TEXT
+)
+"""
+
+_INSERT_SQL = (
+    "INSERT OR IGNORE INTO posts (fingerprint, page_name, text, images, comments, shares, extra) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+# Équivalent du $set de MongoDB : seuls les champs du document sont remplacés,
+# et uniquement s'ils ont changé (pour distinguer 'mis à jour' de 'identique')
+_UPSERT_SQL = _INSERT_SQL.replace("INSERT OR IGNORE", "INSERT") + """
+ON CONFLICT(fingerprint) DO UPDATE SET
+    page_name = excluded.page_name, text = excluded.text, images = excluded.images,
+    comments = excluded.comments, shares = excluded.shares, extra = excluded.extra
+WHERE posts.page_name IS NOT excluded.page_name OR posts.text IS NOT excluded.text
+   OR posts.images IS NOT excluded.images OR posts.comments IS NOT excluded.comments
+   OR posts.shares IS NOT excluded.shares OR posts.extra IS NOT excluded.extra
+"""
+
+# Nombre maximal de paramètres par requête 'IN (...)' (limite SQLite historique : 999)
+_MAX_PARAMS = 900
+
+
+class SQLiteStorage(StorageBackend):
+    """
+    Args:
+        path (str): Fichier de base de données (':memory:' accepté).
+        batch_size (int): Nombre de posts par transaction.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str = DEFAULT_SQLITE_PATH, batch_size: int = 500):
+        super().__init__(batch_size=batch_size)
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Une seule connexion protégée par un verrou : utilisable depuis les threads du pipeline
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(_SCHEMA)
+        self.conn.commit()
+        self.logger.info("✅ Base SQLite ouverte : %s", path)
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+    def iter_posts(self) -> Iterator[Dict]:
+        with self._lock:
+            rows = self.conn.execute(f"SELECT {', '.join(_COLUMNS)}, extra FROM posts ORDER BY rowid").fetchall()
+        for row in rows:
+            yield self._from_row(row)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def update_engagement(self, updates: Iterable[Dict], history_size: int = 20, batch_size: int = None) -> BulkInsertResult:
+        """
+        Met à jour par lots les compteurs de posts déjà stockés et conserve un court historique.
+
+        Args:
+            updates: Dictionnaires {'fingerprint', 'comments', 'shares'}.
+            history_size (int): Nombre maximal d'entrées gardées dans 'engagement_history'.
+        """
+        batch_size = batch_size or self.batch_size
+        result = BulkInsertResult()
+        start = time.perf_counter()
+        now = datetime.now(timezone.utc).isoformat()
+        updates = list(updates)
+        for i in range(0, len(updates), batch_size):
+            chunk = updates[i:i + batch_size]
+            result.batches += 1
+            try:
+                with self._lock, self.conn:
+                    histories = self._fetch_histories([u[self.IDENTITY_FIELD] for u in chunk])
+                    rows, missing = [], []
+                    for update in chunk:
+                        fingerprint = update[self.IDENTITY_FIELD]
+                        if fingerprint not in histories:
+                            missing.append(fingerprint)
+                            continue
+                        counts = {"comments": update.get("comments"), "shares": update.get("shares")}
+                        history = (histories[fingerprint] + [dict(counts, at=now)])[-history_size:]
+                        histories[fingerprint] = history
+                        rows.append((counts["comments"], counts["shares"], json.dumps(history), now, fingerprint))
+                    self.conn.executemany(
+                        "UPDATE posts SET comments = ?, shares = ?, engagement_history = ?, engagement_updated_at = ? "
+                        "WHERE fingerprint = ?",
+                        rows
+                    )
+            except sqlite3.Error as e:
+                result.failed += len(chunk)
+                result.failed_ids.extend(u[self.IDENTITY_FIELD] for u in chunk)
+                self.logger.error("❌ Erreur lors de la mise à jour des compteurs : %s", e)
+                continue
+            result.updated += len(rows)
+            result.failed += len(missing)
+            result.failed_ids.extend(missing)
+        result.elapsed = time.perf_counter() - start
+        metrics.inc("sqlite_engagement_updates_total", result.updated)
+        if updates:
+            self.logger.info("📈 %d compteurs d'engagement mis à jour (%d non trouvés/échecs).", result.updated, result.failed)
+        return result
+
+    def _fetch_histories(self, fingerprints: List[str]) -> Dict[str, List[Dict]]:
+        histories = {}
+        for i in range(0, len(fingerprints), _MAX_PARAMS):
+            chunk = fingerprints[i:i + _MAX_PARAMS]
+            cursor = self.conn.execute(
+                f"SELECT fingerprint, engagement_history FROM posts WHERE fingerprint IN ({','.join('?' * len(chunk))})",
+                chunk
+            )
+            for fingerprint, history in cursor:
+                histories[fingerprint] = json.loads(history) if history else []
+        return histories
+
+    def _count_existing(self, fingerprints: List[str]) -> int:
+        existing = 0
+        for i in range(0, len(fingerprints), _MAX_PARAMS):
+            chunk = fingerprints[i:i + _MAX_PARAMS]
+            existing += self.conn.execute(
+                f"SELECT COUNT(*) FROM posts WHERE fingerprint IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchone()[0]
+        return existing
+
+    def _iter_fingerprints(self) -> Iterable[str]:
+        with self._lock:
+            rows = self.conn.execute("SELECT fingerprint FROM posts").fetchall()
+        return (row[0] for row in rows)
+
+    def _write_batch(self, docs: List[Dict], upsert: bool) -> BulkInsertResult:
+        """Écrit un lot dans une seule transaction."""
+        result = BulkInsertResult()
+        result.batches = 1
+        start = time.perf_counter()
+        rows = [self._to_row(doc) for doc in docs]
+        try:
+            with self._lock, self.conn:
+                if upsert:
+                    # Une seule ligne par empreinte (la dernière version l'emporte) : les comptes restent exacts
+                    unique = list({row[0]: row for row in rows}.values())
+                    existing = self._count_existing([row[0] for row in unique])
+                    changed = self.conn.executemany(_UPSERT_SQL, unique).rowcount
+                    result.inserted = len(unique) - existing
+                    result.updated = changed - result.inserted
+                    # Documents déjà présents et identiques (ou répétés dans le lot) : ni insérés ni modifiés
+                    result.duplicates = existing - result.updated + len(rows) - len(unique)
+                else:
+                    result.inserted = self.conn.executemany(_INSERT_SQL, rows).rowcount
+                    result.duplicates = len(rows) - result.inserted
+        except sqlite3.Error as e:
+            result.failed += len(docs)
+            result.failed_ids.extend(row[0] for row in rows)
+            self.logger.error("❌ Erreur lors de l'insertion du lot : %s", e)
+        result.elapsed = time.perf_counter() - start
+        metrics.observe("sqlite_batch_write_seconds", result.elapsed, mode="upsert" if upsert else "insert")
+        metrics.inc("sqlite_inserted_total", result.inserted)
+        metrics.inc("sqlite_duplicates_total", result.duplicates)
+        metrics.inc("sqlite_failed_total", result.failed)
+        return result
+
+    def _to_row(self, doc: Dict) -> tuple:
+        extra = {k: v for k, v in doc.items() if k not in _COLUMNS}
+        return (
+            doc[self.IDENTITY_FIELD],
+            doc.get("page_name"),
+            doc.get("text"),
+            json.dumps(doc.get("images") or []),
+            doc.get("comments"),
+            doc.get("shares"),
+            json.dumps(extra, default=str) if extra else None,
+        )
+
+    @staticmethod
+    def _from_row(row) -> Dict:
+        doc = dict(zip(_COLUMNS, row[:-1]))
+        for column in _JSON_COLUMNS:
+            if doc[column] is not None:
+                doc[column] = json.loads(doc[column])
+        if doc["engagement_history"] is None:
+            del doc["engagement_history"]
+            del doc["engagement_updated_at"]
+        if row[-1]:
+            doc.update(json.loads(row[-1]))
+        return doc
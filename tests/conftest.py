@@ -0,0 +1,129 @@
+# tests/conftest.py
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+import os
+import sys
+import threading
+
+import pytest
+
+"""
+Fixtures partagées de la suite de tests (hors ligne : aucune connexion à Facebook).
+
+Lancer depuis la racine du dépôt :
+    python -m pytest -q
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(ROOT, "tests", "fixtures")
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture
+def search_html() -> str:
+    """Page de résultats de recherche enregistrée (balisage Facebook réel, classes obfusquées)."""
+    return read_fixture("search_results.html")
+
+
+class LocalServer:
+    """
+    Petit serveur HTTP local (127.0.0.1, port libre) aux réponses programmées.
+
+    route(path, *responses) : réponses (statut, content-type, corps) servies dans l'ordre,
+    la dernière étant répétée ; 'hits' compte les requêtes reçues par chemin (paramètres ignorés).
+    """
+
+    def __init__(self):
+        self.routes: Dict[str, List[Tuple[int, str, bytes]]] = {}
+        self.hits = Counter()
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def route(self, path: str, *responses: Tuple[int, str, bytes]):
+        self.routes[path] = list(responses)
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}{path}"
+
+    def _next(self, path: str) -> Tuple[int, str, bytes]:
+        path = path.split("?", 1)[0]
+        with self._lock:
+            self.hits[path] += 1
+            responses = self.routes.get(path)
+            if not responses:
+                return 404, "text/plain", b"introuvable"
+            return responses.pop(0) if len(responses) > 1 else responses[0]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, content_type, body = server._next(self.path)
+                if callable(body):
+                    body = body()
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def local_server():
+    server = LocalServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def feed_url(local_server):
+    """URL du fil de recherche factice (tests/fixtures/feed_page.html) ; 'query' : paramètres du fil."""
+    local_server.route("/feed.html", (200, "text/html; charset=utf-8", read_fixture("feed_page.html").encode()))
+    return lambda query="": local_server.url("/feed.html" + (f"?{query}" if query else ""))
+
+
+@pytest.fixture
+def make_scraper():
+    """
+    Fabrique de FacebookScraper headless sans session ni connexion, à pointer sur une page locale
+    (scraper.driver.get(local_server.url(...))). Test ignoré si selenium ou Chrome est indisponible.
+    """
+    pytest.importorskip("selenium")
+    # Dépendances du scraper (webdriver_manager…) absentes : test ignoré plutôt qu'en erreur
+    FacebookScraper = pytest.importorskip("selenium_scraper.scraper").FacebookScraper
+    from selenium.common.exceptions import WebDriverException
+
+    scrapers = []
+
+    def factory(**kwargs):
+        kwargs.setdefault("load_timeout", 2)
+        try:
+            scraper = FacebookScraper("test@example.org", "", headless=True, session_dir=None, **kwargs)
+        except WebDriverException as e:
+            pytest.skip(f"Chrome indisponible : {e.msg}")
+        scrapers.append(scraper)
+        return scraper
+
+    yield factory
+    for scraper in scrapers:
+        scraper.driver.quit()
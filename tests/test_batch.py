@@ -0,0 +1,92 @@
+# tests/test_batch.py
+import io
+import json
+
+import pytest
+
+from selenium_scraper.batch import ParquetStreamWriter, PostBatch
+from selenium_scraper.model import PostModel
+
+
+def make_posts():
+    return [
+        PostModel(page_name="Le Monde", text="Premier post « accentué » 🎉", images=["https://a/1.jpg", "https://a/2.jpg"],
+                  comments=12, shares=0, image_hashes=["ab" * 32, None], minhash="00ff" * 4, cluster_id="c" * 32),
+        # Compteurs absents (null) et zéro : à distinguer
+        PostModel(page_name="franceinfo", text="Sans compteurs", images=[], comments=None, shares=None),
+        {"page_name": "Le Monde", "text": "Depuis un dict", "images": ["https://a/3.jpg"], "comments": 0, "shares": 5},
+        PostModel(page_name="Page \"guillemets\"", text="Ligne 1\nLigne 2", comments=3, shares=None),
+    ]
+
+
+def expected_dicts():
+    return [post.to_dict() if isinstance(post, PostModel) else PostModel.from_dict(post).to_dict()
+            for post in make_posts()]
+
+
+def test_columns_and_iteration_round_trip():
+    batch = PostBatch.from_posts(make_posts())
+    assert len(batch) == 4
+    # Noms de page encodés par dictionnaire
+    assert batch.page_names == ["Le Monde", "franceinfo", 'Page "guillemets"']
+    assert list(batch.page_index) == [0, 1, 0, 2]
+    assert list(batch.comments_valid) == [1, 0, 1, 1] and list(batch.shares_valid) == [1, 0, 1, 0]
+    assert batch.image_hashes_of(0) == ["ab" * 32, None] and batch.images_of(1) == []
+    assert [post.to_dict() for post in batch] == expected_dicts()
+
+
+def test_ndjson_matches_to_dict(tmp_path):
+    batch = PostBatch.from_posts(make_posts())
+    buffer = io.StringIO()
+    assert batch.write_ndjson(buffer) == 4
+    assert [json.loads(line) for line in buffer.getvalue().splitlines()] == expected_dicts()
+
+    path = str(tmp_path / "posts.ndjson")
+    batch.write_ndjson(path)
+    batch.write_ndjson(path)
+    with open(path, encoding="utf-8") as f:
+        assert len(f.readlines()) == 8
+    batch.write_ndjson(path, append=False)
+    with open(path, encoding="utf-8") as f:
+        assert [PostModel.from_dict(json.loads(line)).to_dict() for line in f] == expected_dicts()
+
+
+def test_chunks_bound_batch_size():
+    posts = make_posts() * 3
+    sizes = [len(batch) for batch in PostBatch.chunks(posts, size=5)]
+    assert sizes == [5, 5, 2]
+    assert list(PostBatch.chunks([], size=5)) == []
+
+
+def arrow_rows(table):
+    rows = table.to_pylist()
+    for row in rows:
+        row["fingerprint"] = row["fingerprint"].hex()
+    return rows
+
+
+def test_arrow_round_trip_keeps_nulls():
+    pytest.importorskip("pyarrow")
+    table = PostBatch.from_posts(make_posts()).to_arrow()
+    assert table.num_rows == 4
+    assert table.column("comments").null_count == 1 and table.column("shares").null_count == 2
+    expected = expected_dicts()
+    for row, post in zip(arrow_rows(table), expected):
+        assert row == {"image_hashes": [], "minhash": None, "cluster_id": None, **post}
+
+
+def test_parquet_files(tmp_path):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "posts.parquet")
+    PostBatch.from_posts(make_posts()).write_parquet(path)
+    assert arrow_rows(parquet.read_table(path)) == arrow_rows(PostBatch.from_posts(make_posts()).to_arrow())
+
+    stream_path = str(tmp_path / "stream.parquet")
+    with ParquetStreamWriter(stream_path) as writer:
+        for batch in PostBatch.chunks(make_posts() * 3, size=5):
+            writer.write(batch)
+        writer.write(PostBatch())
+    assert writer.rows == 12
+    assert parquet.ParquetFile(stream_path).metadata.num_row_groups == 3
+    table = parquet.read_table(stream_path)
+    assert table.column("comments").null_count == 3
@@ -0,0 +1,127 @@
+# tests/test_graphql.py
+import json
+
+from benchmarks.generator import SyntheticPageGenerator
+from selenium_scraper.graphql import GraphQLPostExtractor, decode_graphql_payload, iter_story_nodes
+
+from conftest import read_fixture
+
+# Réponses enregistrées : une page de résultats, puis les compteurs différés (@defer) dans une seconde réponse
+PAGE = read_fixture("graphql_search_page.txt")
+DEFERRED = read_fixture("graphql_search_deferred.txt")
+
+INA_TEXT = ("🇫🇷 Il y a 30 ans, Jacques Chirac entrait à l'Élysée.\n"
+            "Revoir la passation de pouvoirs & le discours : ina.fr/chirac-1995")
+INA_IMAGES = [
+    "https://scontent-cdg4-2.xx.fbcdn.net/v/t39.30808-6/481913482_1034781_5521734_n.jpg"
+    "?stp=dst-jpg_s600x600_tt6&_nc_cat=101&ccb=1-7&_nc_sid=127cfc&oh=00_AYB1d&oe=67E3C1A2",
+    "https://scontent-cdg4-1.xx.fbcdn.net/v/t39.30808-6/481913483_1034782_6630918_n.jpg"
+    "?stp=dst-jpg_p180x540_tt6&_nc_cat=109&oh=00_AYC7e&oe=67E3B0F1",
+]
+EXPECTED = [
+    {"page_name": "Archives INA", "text": INA_TEXT, "images": INA_IMAGES, "comments": 1234, "shares": 56},
+    {"page_name": "Le Monde", "text": "« Mangez des pommes ! » 🍎🍏 #Chirac", "images": [], "comments": 87, "shares": 12},
+]
+FIELDS = ("page_name", "text", "images", "comments", "shares")
+
+
+def fields(posts):
+    return [{k: post.to_dict()[k] for k in FIELDS} for post in posts]
+
+
+def test_decode_strips_prefix_and_splits_concatenated_objects():
+    assert [obj["extensions"]["is_final"] for obj in decode_graphql_payload(DEFERRED)] == [False, False, True]
+    assert list(decode_graphql_payload('{"a": 1}\r\n {"b": 2}{"c"')) == [{"a": 1}, {"b": 2}]
+    assert list(decode_graphql_payload("")) == []
+
+
+def test_story_nodes_are_outermost_only():
+    (page,) = decode_graphql_payload(PAGE)
+    ids = [node["id"] for node in iter_story_nodes(page)]
+    # Un nœud par résultat : ni les sous-nœuds 'Story' du même post, ni le post partagé
+    assert len(ids) == len(set(ids)) == 3
+
+
+def test_extract_recorded_responses():
+    posts = GraphQLPostExtractor().extract([PAGE, DEFERRED])
+    assert fields([post for post in posts if post.is_valid()]) == EXPECTED
+    # Photo seule : pas de texte, post invalide (comme côté HTML)
+    assert [post.page_name for post in posts if not post.is_valid()] == ["Paris Match"]
+
+
+def test_extract_order_of_responses_does_not_matter():
+    reordered = GraphQLPostExtractor().extract([DEFERRED, PAGE])
+    key = lambda post: post["page_name"]
+    assert sorted(fields(reordered), key=key) == sorted(fields(GraphQLPostExtractor().extract([PAGE, DEFERRED])), key=key)
+
+
+def test_feed_applies_late_counts_to_emitted_posts():
+    extractor = GraphQLPostExtractor()
+    posts, updates = extractor.feed([PAGE])
+    assert [post.page_name for post in posts] == ["Archives INA", "Le Monde"]
+    assert (posts[0].comments, posts[0].shares) == (None, None)
+    assert updates == []
+
+    # Compteurs arrivés un cycle de scroll plus tard : mise à jour, pas de nouveau post
+    later, updates = extractor.feed([DEFERRED])
+    assert later == []
+    assert updates == [{"fingerprint": posts[0].fingerprint, "comments": 1234, "shares": 56}]
+    assert fields(posts) == EXPECTED
+
+    # Réponse rejouée : rien de nouveau
+    assert extractor.feed([PAGE, DEFERRED]) == ([], [])
+
+
+def test_feed_waits_for_text_before_emitting():
+    extractor = GraphQLPostExtractor()
+    # Compteurs seuls : post pas encore émis
+    assert extractor.feed([DEFERRED]) == ([], [])
+    posts, updates = extractor.feed([PAGE])
+    assert fields(posts) == EXPECTED
+    assert updates == []
+
+
+def test_generated_responses_match_expected_posts():
+    bodies, expected = SyntheticPageGenerator(seed=3, text_words=15).generate_graphql(posts=25, page_size=10)
+    posts = [post for post in GraphQLPostExtractor().extract(bodies) if post.is_valid()]
+    assert fields(posts) == expected
+
+
+def test_generated_responses_split_across_feeds():
+    """Chaque objet @defer dans un appel séparé : le résultat final est identique à extract()."""
+    bodies, expected = SyntheticPageGenerator(seed=5, text_words=10).generate_graphql(posts=12, page_size=4)
+    chunks = [json.dumps(obj) for body in bodies for obj in decode_graphql_payload(body)]
+    extractor = GraphQLPostExtractor()
+    emitted, updated = [], set()
+    for chunk in chunks:
+        posts, updates = extractor.feed([chunk])
+        emitted.extend(posts)
+        updated.update(update["fingerprint"] for update in updates)
+    assert fields(emitted) == expected
+    assert updated == {post.fingerprint for post in emitted}
+
+
+def test_capture_from_local_page(local_server, make_scraper):
+    """Chrome réel : la page appelle /api/graphql/ au chargement puis au scroll, la capture DevTools lit les corps."""
+    page = b"""<!DOCTYPE html><html><body><div role="feed" style="height:3000px"></div><script>
+    let calls = 0;
+    async function load(name) {
+        calls += 1;
+        await fetch('/api/graphql/?q=' + name);
+        document.querySelector('[role=feed]').style.height = (3000 + calls * 2000) + 'px';
+    }
+    load('page');
+    window.addEventListener('scroll', () => { if (calls === 1) load('deferred'); });
+    </script></body></html>"""
+    local_server.route("/search.html", (200, "text/html; charset=utf-8", page))
+    local_server.route("/api/graphql/", (200, "application/json", PAGE.encode()),
+                       (200, "application/json", DEFERRED.encode()))
+
+    scraper = make_scraper(capture_graphql=True)
+    scraper.graphql_capture.reset()
+    scraper.driver.get(local_server.url("/search.html"))
+    updates = []
+    posts = list(scraper.stream_graphql_posts(scrolls=3, max_idle_cycles=2, fallback=False,
+                                              on_updates=updates.extend))
+    assert fields([post for post in posts if post.is_valid()]) == EXPECTED
+    assert local_server.hits["/api/graphql/"] == 2
@@ -0,0 +1,113 @@
+# tests/test_incremental.py
+import pytest
+
+from pipeline.incremental import IncrementalCrawler
+from storage.crawl_state import CrawlState, CrawlStateStore
+from storage.jsonl_backend import JsonLinesStorage
+
+
+def make_post_html(i: int, comments: int = None) -> str:
+    """Bloc de post au balisage du fil factice (tests/fixtures/feed_page.html)."""
+    comments = i + 1 if comments is None else comments
+    return (
+        '<div class="x1n2onr6 x1ja2u2z"><div class="x1yztbdb">'
+        f'<div data-ad-rendering-role="profile_name"><h4><span><a href="#"><span>Page {i % 3}</span></a></span></h4></div>'
+        f'<div data-ad-preview="message"><div dir="auto"><span class="text">Texte du post numéro {i}</span></div></div>'
+        f'<div class="x168nmei"><span><span>{comments} commentaires</span></span><span>{2 * i + 2} partages</span></div>'
+        '</div></div>'
+    )
+
+
+class FakeScraper:
+    """Fil scrollé : un fragment par cycle ; 'cycles' compte les fragments réellement produits."""
+
+    def __init__(self, fragments):
+        self.fragments = fragments
+        self.cycles = 0
+        self.closed = False
+
+    def stream_post_fragments(self, scrolls=50, max_idle_cycles=3):
+        try:
+            for fragment in self.fragments[:scrolls]:
+                self.cycles += 1
+                yield fragment
+        finally:
+            self.closed = True
+
+
+@pytest.fixture
+def crawler(tmp_path):
+    return IncrementalCrawler(CrawlStateStore(str(tmp_path / "state")), stop_after_known=3, backend="bs4")
+
+
+def fingerprints_of(crawler, query):
+    return set(crawler.state_store.load(query).known)
+
+
+def test_collect_then_commit_remembers_posts(crawler):
+    scraper = FakeScraper([make_post_html(i) + make_post_html(i + 10) for i in range(3)])
+    new_posts, updates, delta = crawler.collect(scraper, "sujet")
+    assert len(new_posts) == 6 and updates == []
+    assert scraper.closed
+    # Rien n'est retenu avant commit()
+    assert fingerprints_of(crawler, "sujet") == set()
+
+    crawler.commit("sujet", delta)
+    assert fingerprints_of(crawler, "sujet") == {post["fingerprint"] for post in new_posts}
+
+
+def test_collect_stops_after_known_posts_and_reports_changed_counts(crawler):
+    crawler.commit("sujet", crawler.collect(FakeScraper([make_post_html(i) for i in range(5)]), "sujet")[2])
+
+    # Deux nouveaux posts en tête de fil, puis les anciens (le post 1 a reçu des commentaires)
+    fragments = [make_post_html(100), make_post_html(101)]
+    fragments += [make_post_html(i, comments=50 if i == 1 else None) for i in range(5)]
+    scraper = FakeScraper(fragments)
+    new_posts, updates, delta = crawler.collect(scraper, "sujet")
+
+    assert [post["text"] for post in new_posts] == ["Texte du post numéro 100", "Texte du post numéro 101"]
+    assert [(update["comments"], update["shares"]) for update in updates] == [(50, 4)]
+    # Arrêt au 3e post connu d'affilée : les posts 3 et 4 ne sont jamais scrollés
+    assert scraper.cycles == 5 and scraper.closed
+    assert len(delta) == 5
+
+
+def test_commit_skips_failed_inserts_and_updates(crawler, tmp_path):
+    storage = JsonLinesStorage(str(tmp_path / "posts.jsonl"))
+    crawler.commit("sujet", crawler.collect(FakeScraper([make_post_html(0)]), "sujet")[2])
+
+    fragments = [make_post_html(1), make_post_html(0, comments=99)]
+    new_posts, updates, delta = crawler.collect(FakeScraper(fragments), "sujet")
+    inserted = storage.insert_many_posts(new_posts)
+    # Le post 0 n'a jamais été écrit dans ce fichier : sa mise à jour échoue
+    updated = storage.update_engagement(updates)
+    assert updated.failed_ids == [updates[0]["fingerprint"]]
+
+    crawler.commit("sujet", delta, inserted, updated)
+    state = crawler.state_store.load("sujet")
+    assert state.engagement_of(new_posts[0]["fingerprint"]) == (2, 4)
+    # Ancien compteur conservé : la mise à jour sera refaite au prochain crawl
+    assert state.engagement_of(updates[0]["fingerprint"]) == (1, 2)
+    storage.close()
+
+
+def test_crawl_state_store_round_trip(tmp_path):
+    store = CrawlStateStore(str(tmp_path), max_known=3)
+    state = CrawlState("élections 2024 / Paris", max_known=3)
+    for i in range(5):
+        state.remember(f"fp{i}", i, None)
+    state.remember("fp2", 20, 1)
+    store.save(state)
+
+    loaded = store.load("élections 2024 / Paris")
+    assert list(loaded.known.items()) == [("fp3", (3, None)), ("fp4", (4, None)), ("fp2", (20, 1))]
+    assert loaded.last_run is not None
+    assert "fp0" not in loaded
+    assert store.load("autre sujet").known == {}
+
+
+def test_crawl_state_store_recovers_from_corrupted_file(tmp_path):
+    store = CrawlStateStore(str(tmp_path))
+    with open(store._path("sujet"), "w", encoding="utf-8") as f:
+        f.write("{tronqué")
+    assert store.load("sujet").known == {}
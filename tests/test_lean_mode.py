@@ -0,0 +1,109 @@
+# tests/test_lean_mode.py
+import json
+import re
+
+import pytest
+
+from selenium_scraper.devtools import PerformanceLogReader
+from selenium_scraper.lean_mode import DEFAULT_BLOCK_PATTERNS, ResourceBlocker, extension_patterns
+
+
+def devtools_match(pattern: str, url: str) -> bool:
+    """Correspondance façon Network.setBlockedURLs : '*' est le seul joker."""
+    return re.fullmatch(".*".join(re.escape(part) for part in pattern.split("*")), url) is not None
+
+
+def is_blocked(url: str, patterns=DEFAULT_BLOCK_PATTERNS) -> bool:
+    return any(devtools_match(pattern, url) for pattern in patterns)
+
+
+class FakeDriver:
+    """Enregistre les commandes DevTools et sert un journal 'performance' programmé."""
+
+    def __init__(self, reject_url_patterns: bool = False):
+        self.commands = []
+        self.log = []
+        self.reject_url_patterns = reject_url_patterns
+
+    def execute_cdp_cmd(self, cmd, params):
+        if self.reject_url_patterns and "urlPatterns" in params:
+            raise RuntimeError("Invalid parameters: urls: array expected")
+        self.commands.append((cmd, params))
+
+    def get_log(self, kind):
+        entries, self.log = self.log, []
+        return entries
+
+    def emit(self, method, **params):
+        self.log.append({"message": json.dumps({"message": {"method": method, "params": params}})})
+
+
+def test_extension_patterns_are_anchored_to_the_path():
+    assert extension_patterns(["png"]) == ("*.png", "*.png?*")
+
+
+@pytest.mark.parametrize("url", [
+    "https://scontent-cdg4-1.xx.fbcdn.net/v/t39.30808-6/1_n.jpg?stp=dst-jpg_s600x600&oh=00_A",
+    "https://static.xx.fbcdn.net/rsrc.php/yb/r/logo.png",
+    "https://static.xx.fbcdn.net/rsrc.php/v4/font.woff2?_nc_x=1",
+    "https://video-cdg4-2.xx.fbcdn.net/o1/v/t2/f2/m69/stream?bytestart=0",
+    "https://www.facebook.com/tr/?id=123&ev=PageView",
+    "https://connect.facebook.net/fr_FR/fbevents.js",
+])
+def test_default_patterns_block_heavy_resources_and_trackers(url):
+    assert is_blocked(url)
+
+
+@pytest.mark.parametrize("url", [
+    # Scripts et requêtes nécessaires au fil : jamais bloqués
+    "https://static.xx.fbcdn.net/rsrc.php/v3/app.icons.js",
+    "https://static.xx.fbcdn.net/rsrc.php/v3/yX/r/bundle.js?_nc_x=logo.png.v2",
+    "https://www.facebook.com/api/graphql/?fb_api_req_friendly_name=SearchCometResultsPaginatedResultsQuery",
+    "https://www.facebook.com/search/posts/?q=image.png%20demo",
+    "https://www.facebook.com/travel/",
+])
+def test_default_patterns_keep_scripts_and_pages(url):
+    assert not is_blocked(url)
+
+
+def test_install_sends_blocked_urls():
+    driver = FakeDriver()
+    ResourceBlocker(driver, block_patterns=["*.png", "*.png?*"]).install()
+    assert driver.commands == [("Network.enable", {}), ("Network.setBlockedURLs", {"urls": ["*.png", "*.png?*"]})]
+
+
+def test_install_puts_allow_patterns_first_and_falls_back():
+    driver = FakeDriver()
+    ResourceBlocker(driver, block_patterns=["*.png"], allow_patterns=["*://static.xx.fbcdn.net/*"]).install()
+    assert driver.commands[-1] == ("Network.setBlockedURLs", {"urlPatterns": [
+        {"urlPattern": "*://static.xx.fbcdn.net/*", "block": False}, {"urlPattern": "*.png", "block": True},
+    ]})
+
+    # Chrome sans 'urlPatterns' : liste d'autorisation ignorée, blocage maintenu
+    driver = FakeDriver(reject_url_patterns=True)
+    ResourceBlocker(driver, block_patterns=["*.png"], allow_patterns=["*://static.xx.fbcdn.net/*"]).install()
+    assert driver.commands[-1] == ("Network.setBlockedURLs", {"urls": ["*.png"]})
+
+
+def test_stats_count_blocked_requests_and_estimated_bytes():
+    driver = FakeDriver()
+    reader = PerformanceLogReader(driver)
+    blocker = ResourceBlocker(driver, reader, estimated_sizes={"Image": 1_000})
+    driver.emit("Network.loadingFailed", requestId="1", type="Image", blockedReason="inspector")
+    driver.emit("Network.loadingFailed", requestId="2", type="Image", blockedReason="inspector")
+    driver.emit("Network.loadingFailed", requestId="3", type="Media", blockedReason="inspector")
+    driver.emit("Network.loadingFailed", requestId="4", type="Font", blockedReason="inspector")
+    driver.emit("Network.loadingFailed", requestId="5", type="Manifest", blockedReason="inspector")
+    # Échecs sans blocage ou bloqués par la page elle-même (CSP) : pas des économies du mode lean
+    driver.emit("Network.loadingFailed", requestId="6", type="Image", errorText="net::ERR_TIMED_OUT")
+    driver.emit("Network.loadingFailed", requestId="7", type="Script", blockedReason="csp")
+    driver.emit("Network.responseReceived", requestId="8", type="Image")
+
+    assert blocker.stats() == {
+        "blocked_requests": 5,
+        "blocked_by_type": {"Image": 2, "Media": 1, "Font": 1, "Manifest": 1},
+        # Types inconnus estimés comme 'Other'
+        "estimated_bytes_saved": 2 * 1_000 + 1_500_000 + 40_000 + 5_000,
+    }
+    # Journal déjà drainé : compteurs inchangés
+    assert blocker.stats()["blocked_requests"] == 5
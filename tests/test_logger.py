@@ -0,0 +1,74 @@
+# tests/test_logger.py
+import json
+import logging
+import sys
+
+import pytest
+
+from utils import logger as logger_module
+from utils.logger import JsonLinesFormatter, RateLimitFilter, short_id
+
+
+def make_record(msg, *args, level=logging.WARNING, name="selenium_scraper.parser"):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Horloge monotone contrôlée par le test."""
+    now = [1000.0]
+    monkeypatch.setattr(logger_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_rate_limit_suppresses_repeats_then_reports_them(clock):
+    rate_limit = RateLimitFilter(limit=2, window=60)
+    # Même gabarit, arguments différents : un seul compteur
+    passed = [rate_limit.filter(make_record("Post #%d ignoré : données incomplètes (page=%s).", i, "Le Monde"))
+              for i in range(5)]
+    assert passed == [True, True, False, False, False]
+    # Autre gabarit, autre logger, niveau INFO ou ERROR : jamais limités
+    assert rate_limit.filter(make_record("Autre avertissement"))
+    assert rate_limit.filter(make_record("Post #%d ignoré : données incomplètes (page=%s).", 1, "x", name="autre"))
+    assert all(rate_limit.filter(make_record("Bloc %d", i, level=logging.INFO)) for i in range(5))
+    assert all(rate_limit.filter(make_record("Échec %d", i, level=logging.ERROR)) for i in range(5))
+
+    clock[0] += 59
+    assert not rate_limit.filter(make_record("Post #%d ignoré : données incomplètes (page=%s).", 6, "Le Monde"))
+
+    # Fenêtre suivante : le premier record passe et porte le résumé des messages supprimés
+    clock[0] += 1
+    record = make_record("Post #%d ignoré : données incomplètes (page=%s).", 7, "Le Monde")
+    assert rate_limit.filter(record)
+    assert record.getMessage() == "Post #7 ignoré : données incomplètes (page=Le Monde). (+4 messages similaires supprimés)"
+    second = make_record("Post #%d ignoré : données incomplètes (page=%s).", 8, "Le Monde")
+    assert rate_limit.filter(second) and "supprimés" not in second.getMessage()
+    assert not rate_limit.filter(make_record("Post #%d ignoré : données incomplètes (page=%s).", 9, "Le Monde"))
+
+
+def test_rate_limit_disabled_with_zero_limit(clock):
+    rate_limit = RateLimitFilter(limit=0)
+    assert all(rate_limit.filter(make_record("Même message")) for _ in range(100))
+
+
+def test_json_lines_formatter():
+    record = make_record("Sujet '%s' : %d posts", "élections", 3, level=logging.INFO, name="main")
+    payload = json.loads(JsonLinesFormatter().format(record))
+    assert payload["message"] == "Sujet 'élections' : 3 posts"
+    assert (payload["level"], payload["logger"]) == ("INFO", "main")
+    assert "exception" not in payload
+
+    try:
+        raise ValueError("fragment illisible")
+    except ValueError:
+        record = logging.LogRecord("main", logging.ERROR, __file__, 1, "Erreur", (), sys.exc_info())
+    payload = json.loads(JsonLinesFormatter().format(record))
+    assert "ValueError: fragment illisible" in payload["exception"]
+
+
+def test_short_id_never_returns_the_full_text():
+    assert short_id(None) == short_id("") == "∅"
+    assert short_id("  Le   Monde \n") == "Le Monde"
+    long_text = "<div>" + "x" * 500 + "</div>"
+    assert short_id(long_text) == long_text[:39] + "…"
+    assert len(short_id(long_text, length=10)) == 10
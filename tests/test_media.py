@@ -0,0 +1,94 @@
+# tests/test_media.py
+import hashlib
+import time
+
+import pytest
+
+from pipeline.media import MediaDownloader, normalize_image_url
+from storage.media_store import MediaStore
+
+JPEG = b"\xff\xd8\xff\xe0" + b"image-de-test" * 64
+
+
+@pytest.fixture
+def downloader(tmp_path):
+    with MediaDownloader(MediaStore(str(tmp_path / "media")), workers=4, timeout=5, max_retries=2, backoff=0) as media:
+        yield media
+
+
+def test_normalize_image_url_ignores_cdn_host_and_signature():
+    a = "https://scontent-cdg4-1.xx.fbcdn.net/v/t39.30808-6/1_n.jpg?stp=dst-jpg_s600x600&_nc_cat=1&oh=00_A&oe=67E"
+    b = "https://scontent-cdg4-3.xx.fbcdn.net/v/t39.30808-6/1_n.jpg?oe=99F&oh=00_B&stp=dst-jpg_s600x600&_nc_cat=7"
+    c = "https://scontent-cdg4-3.xx.fbcdn.net/v/t39.30808-6/1_n.jpg?stp=dst-jpg_p180x540&oh=00_B"
+    assert normalize_image_url(a) == normalize_image_url(b) == "fbcdn.net/v/t39.30808-6/1_n.jpg?stp=dst-jpg_s600x600"
+    assert normalize_image_url(c) != normalize_image_url(a)
+    assert normalize_image_url("https://SCONTENT.xx.fbcdn.net:443/v/1_n.jpg?oh=00_A") == "fbcdn.net/v/1_n.jpg"
+
+
+def test_normalize_image_url_only_collapses_fbcdn_hosts():
+    # Hôtes qui ressemblent à fbcdn : URL complète gardée, jamais confondue avec une image fbcdn
+    assert normalize_image_url("https://evilfbcdn.net/v/1_n.jpg?oh=00_A") == "evilfbcdn.net/v/1_n.jpg?oh=00_A"
+    assert normalize_image_url("https://fbcdn.net.example.org/v/1_n.jpg") == "fbcdn.net.example.org/v/1_n.jpg"
+
+
+def test_normalize_image_url_other_hosts_and_invalid():
+    assert normalize_image_url("https://Example.org/a.png?b=2&a=1#x") == "example.org/a.png?a=1&b=2"
+    assert normalize_image_url("data:image/gif;base64,R0lGOD") is None
+    assert normalize_image_url("") is None
+    assert normalize_image_url("/relative.jpg") is None
+
+
+def test_downloads_in_parallel_and_sets_hashes(local_server, downloader):
+    def slow_body():
+        time.sleep(0.3)
+        return JPEG
+
+    for i in range(4):
+        local_server.route(f"/img{i}.jpg", (200, "image/jpeg", slow_body))
+    posts = [{"images": [local_server.url(f"/img{i}.jpg")]} for i in range(4)]
+
+    start = time.perf_counter()
+    stats = downloader.process(posts)
+    assert time.perf_counter() - start < 1.0
+    assert (stats["downloaded"], stats["failed"]) == (4, 0)
+    # Même contenu sous quatre URL : un seul fichier, même hash
+    assert {post["image_hashes"][0] for post in posts} == {hashlib.sha256(JPEG).hexdigest()}
+    assert len(downloader.store) == 1
+    assert all(normalize_image_url(post["images"][0]) in downloader.store for post in posts)
+
+
+def test_retries_on_503(local_server, downloader):
+    local_server.route("/retry.jpg", (503, "text/plain", b"occupe"), (200, "image/jpeg", JPEG))
+    post = {"images": [local_server.url("/retry.jpg")]}
+    stats = downloader.process([post])
+    assert stats["downloaded"] == 1
+    assert post["image_hashes"][0] is not None
+    assert local_server.hits["/retry.jpg"] == 2
+
+
+def test_404_and_wrong_content_type_are_failures(local_server, downloader):
+    local_server.route("/page.html", (200, "text/html", b"<html></html>"))
+    post = {"images": [local_server.url("/absente.jpg"), local_server.url("/page.html"), "data:image/gif;base64,R0"]}
+    stats = downloader.process([post])
+    assert stats["failed"] == 2
+    assert post["image_hashes"] == [None, None, None]
+    assert local_server.hits["/absente.jpg"] == 1
+
+
+def test_known_images_are_not_fetched_again(local_server, tmp_path):
+    local_server.route("/photo.jpg", (200, "image/jpeg", JPEG))
+    url = local_server.url("/photo.jpg")
+    store_dir = str(tmp_path / "media")
+    with MediaDownloader(MediaStore(store_dir), workers=2, backoff=0) as media:
+        # Même image deux fois dans le lot (paramètres dans un autre ordre) : un seul téléchargement
+        first = media.process([{"images": [url + "?a=1&b=2"]}, {"images": [url + "?b=2&a=1"]}])
+        second = media.process([{"images": [url + "?a=1&b=2"]}])
+    assert (first["unique"], first["downloaded"]) == (1, 1)
+    assert (second["cached"], second["downloaded"]) == (1, 0)
+
+    # Index persistant : un nouveau stockage sur le même dossier connaît déjà l'image
+    with MediaDownloader(MediaStore(store_dir), workers=2, backoff=0) as media:
+        post = {"images": [url + "?b=2&a=1"]}
+        assert media.process([post])["cached"] == 1
+        assert post["image_hashes"][0] is not None
+    assert local_server.hits["/photo.jpg"] == 1
@@ -0,0 +1,90 @@
+# tests/test_metrics.py
+import json
+import os
+
+from utils.metrics import MetricsRegistry
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry(enabled=False)
+    registry.inc("fb_posts_total")
+    registry.set("fb_gauge", 3)
+    registry.observe("fb_seconds", 0.2)
+    with registry.timer("fb_timer_seconds"):
+        pass
+    assert registry.to_prometheus() == "\n"
+    assert registry.to_dict()["counters"] == {}
+
+
+def test_prometheus_text_format():
+    registry = MetricsRegistry(enabled=True, buckets=(0.1, 1), const_labels={"worker": "2"})
+    registry.inc("fb_posts_total", backend="lxml")
+    registry.inc("fb_posts_total", 2, backend="lxml")
+    registry.inc("fb_posts_total", backend="bs4")
+    registry.set("fb_lean_blocked_requests", 7)
+    for value in (0.05, 0.1, 0.5, 3):
+        registry.observe("fb_parse_seconds", value)
+
+    assert registry.to_prometheus().splitlines() == [
+        "# TYPE fb_posts_total counter",
+        'fb_posts_total{worker="2",backend="bs4"} 1',
+        'fb_posts_total{worker="2",backend="lxml"} 3',
+        "# TYPE fb_lean_blocked_requests gauge",
+        'fb_lean_blocked_requests{worker="2"} 7',
+        "# TYPE fb_parse_seconds histogram",
+        # Bornes incluses ('le') et cumulées, +Inf = nombre total d'observations
+        'fb_parse_seconds_bucket{worker="2",le="0.1"} 2',
+        'fb_parse_seconds_bucket{worker="2",le="1.0"} 3',
+        'fb_parse_seconds_bucket{worker="2",le="+Inf"} 4',
+        'fb_parse_seconds_sum{worker="2"} 3.65',
+        'fb_parse_seconds_count{worker="2"} 4',
+    ]
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry(enabled=True)
+    registry.inc("fb_errors_total", reason='quote " and \\ backslash')
+    assert 'fb_errors_total{reason="quote \\" and \\\\ backslash"} 1' in registry.to_prometheus()
+
+
+def test_timer_and_timed_feed_histograms():
+    registry = MetricsRegistry(enabled=True)
+
+    @registry.timed("fb_call_seconds", step="parse")
+    def work(x):
+        return x * 2
+
+    assert work(21) == 42
+    with registry.timer("fb_block_seconds") as timer:
+        pass
+    assert timer.elapsed >= 0
+    histograms = registry.to_dict()["histograms"]
+    assert histograms["fb_call_seconds"]["step=parse"]["count"] == 1
+    assert histograms["fb_block_seconds"]["_"]["count"] == 1
+
+
+def test_json_report_and_atomic_files(tmp_path):
+    registry = MetricsRegistry(enabled=True, const_labels={"worker": "0"})
+    registry.inc("fb_posts_total", 5)
+    registry.inc("fb_skipped_posts_total", reason="incomplete")
+    registry.set("fb_memory_bytes", 1024)
+    registry.observe("fb_scroll_seconds", 0.25)
+    registry.observe("fb_scroll_seconds", 0.75)
+
+    prom_path = tmp_path / "metrics" / "fb_scraper.prom"
+    json_path = tmp_path / "metrics" / "run_report.json"
+    registry.write_prometheus(str(prom_path))
+    registry.write_json_report(str(json_path))
+    # Écriture atomique : aucun fichier temporaire restant
+    assert sorted(os.listdir(tmp_path / "metrics")) == ["fb_scraper.prom", "run_report.json"]
+    assert prom_path.read_text(encoding="utf-8") == registry.to_prometheus()
+
+    report = json.loads(json_path.read_text(encoding="utf-8"))
+    assert report["labels"] == {"worker": "0"}
+    assert report["counters"] == {"fb_posts_total": {"_": 5}, "fb_skipped_posts_total": {"reason=incomplete": 1}}
+    assert report["gauges"] == {"fb_memory_bytes": {"_": 1024}}
+    assert report["histograms"]["fb_scroll_seconds"]["_"] == {"count": 2, "sum": 1.0, "mean": 0.5}
+    assert report["duration"] >= 0
+
+    registry.reset()
+    assert registry.to_dict()["counters"] == {}
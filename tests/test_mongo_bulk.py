@@ -0,0 +1,115 @@
+# tests/test_mongo_bulk.py
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+from pymongo.errors import AutoReconnect
+
+from selenium_scraper.model import PostModel, compute_fingerprint
+from storage.mongo_client import MongoDBClient
+
+
+class MockMongoDBClient(MongoDBClient):
+    def _connect(self):
+        return mongomock.MongoClient()
+
+
+@pytest.fixture
+def storage():
+    client = MockMongoDBClient(db_name="tests", collection_name="posts", batch_size=2)
+    yield client
+    client.close()
+
+
+def make_posts(n, start=0):
+    return [
+        PostModel(page_name=f"Page {i}", text=f"Texte du post {i}", images=[], comments=i, shares=0)
+        for i in range(start, start + n)
+    ]
+
+
+def test_insert_many_posts_batches_and_counts(storage):
+    result = storage.insert_many_posts(make_posts(5))
+    assert (result.inserted, result.duplicates, result.failed) == (5, 0, 0)
+    assert result.batches == 3
+    assert storage.count() == 5
+    assert {doc["fingerprint"] for doc in storage.iter_posts()} == {
+        compute_fingerprint(f"Page {i}", f"Texte du post {i}") for i in range(5)
+    }
+
+
+def test_duplicates_are_rejected_by_unique_index(storage):
+    storage.insert_many_posts(make_posts(3))
+    result = storage.insert_many_posts(make_posts(4))
+    assert (result.inserted, result.duplicates, result.failed) == (1, 3, 0)
+    assert storage.count() == 4
+
+
+def test_seen_filter_skips_known_and_repeated_posts(storage):
+    storage.insert_many_posts(make_posts(2))
+    storage.preload_seen()
+    result = storage.insert_many_posts(make_posts(3) + make_posts(1, start=2))
+    assert (result.inserted, result.duplicates) == (1, 3)
+    # Un seul lot écrit : les doublons sont écartés avant l'envoi
+    assert result.batches == 1
+
+
+def test_upsert_updates_existing_posts(storage):
+    storage.insert_many_posts(make_posts(2))
+    posts = make_posts(3)
+    posts[0].comments = 42
+    result = storage.insert_many_posts(posts, upsert=True)
+    assert (result.inserted, result.updated, result.duplicates) == (1, 1, 1)
+    stored = {doc["page_name"]: doc for doc in storage.iter_posts()}
+    assert stored["Page 0"]["comments"] == 42
+    assert storage.count() == 3
+
+
+def test_update_engagement_keeps_history(storage):
+    storage.insert_many_posts(make_posts(1))
+    fingerprint = compute_fingerprint("Page 0", "Texte du post 0")
+    for comments in (10, 20, 30):
+        storage.update_engagement([{"fingerprint": fingerprint, "comments": comments, "shares": 1}], history_size=2)
+    result = storage.update_engagement([
+        {"fingerprint": "inconnue", "comments": 1, "shares": 1},
+        {"fingerprint": fingerprint, "comments": 40, "shares": 1},
+    ], history_size=2)
+    assert (result.failed, result.failed_ids) == (1, ["inconnue"])
+    doc = next(storage.iter_posts())
+    assert doc["comments"] == 40
+    assert [entry["comments"] for entry in doc["engagement_history"]] == [30, 40]
+
+
+def test_failed_batch_can_be_retried(storage, monkeypatch):
+    storage.preload_seen()
+    original = storage.collection.bulk_write
+    calls = []
+
+    def flaky_bulk_write(operations, **kwargs):
+        calls.append(len(operations))
+        if len(calls) == 1:
+            raise AutoReconnect("connexion perdue")
+        return original(operations, **kwargs)
+
+    monkeypatch.setattr(storage.collection, "bulk_write", flaky_bulk_write)
+    posts = make_posts(3)
+    result = storage.insert_many_posts(posts)
+    assert (result.inserted, result.failed) == (1, 2)
+    assert sorted(result.failed_ids) == sorted(post.fingerprint for post in posts[:2])
+
+    # Les posts en échec ne sont pas marqués comme vus : le renvoi les écrit
+    retry = storage.insert_many_posts(posts)
+    assert (retry.inserted, retry.duplicates, retry.failed) == (2, 1, 0)
+    assert storage.count() == 3
+
+
+def test_migrate_fingerprints_removes_normalized_duplicates(storage):
+    storage.collection.insert_many([
+        {"page_name": "Le Monde", "text": "Mangez des pommes !"},
+        {"page_name": "le monde", "text": "  Mangez   des pommes ! "},
+        {"page_name": "Le Monde", "text": "Autre texte"},
+    ])
+    stats = storage.migrate_fingerprints()
+    assert stats["updated"] == 2
+    assert stats["removed_duplicates"] == 1
+    assert storage.count() == 2
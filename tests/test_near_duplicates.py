@@ -0,0 +1,166 @@
+# tests/test_near_duplicates.py
+import sys
+
+import pytest
+
+import cluster
+from pipeline.dedup import NearDuplicateDetector
+from selenium_scraper.minhash import (
+    MinHasher, is_truncated, normalize_for_similarity, optimal_bands, signature_from_hex, signature_to_hex
+)
+from selenium_scraper.model import PostModel
+from selenium_scraper.pool import scrape_query
+from storage.lsh_index import PREFIX_CHARS, LSHIndex
+from storage.sqlite_backend import SQLiteStorage
+
+LONG_TEXT = (
+    "Le conseil municipal a voté hier soir le nouveau plan de circulation du centre-ville : "
+    "les rues piétonnes seront étendues dès le mois de mars, les livraisons limitées le matin "
+    "et trois parkings relais ouvriront en périphérie avec des navettes gratuites toutes les dix minutes. "
+    "Les commerçants, inquiets pour leur chiffre d'affaires, demandent une période d'essai de six mois "
+    "avant toute décision définitive, tandis que les associations de cyclistes saluent une avancée attendue."
+)
+REPOST = "🚨 " + LONG_TEXT.upper().replace(",", "").replace(":", " !!") + " https://t.co/abc123"
+TRUNCATED = LONG_TEXT[:260] + "… En voir plus"
+OTHER_TEXT = (
+    "Recette du jour : un gratin de courgettes au chèvre, prêt en quarante minutes. Faites revenir les "
+    "courgettes à la poêle avec un filet d'huile d'olive, ajoutez l'ail, les herbes de Provence, puis le "
+    "fromage émietté avant de passer le tout au four. Servez avec une salade verte et du pain grillé."
+)
+
+
+@pytest.fixture
+def hasher():
+    return MinHasher()
+
+
+def test_normalization_ignores_case_accents_emoji_punctuation_and_urls():
+    assert normalize_for_similarity("🚨 Élections : RÉSULTATS !! https://t.co/x  En voir plus") == "elections resultats"
+    assert normalize_for_similarity(None) == ""
+    assert is_truncated(TRUNCATED) and is_truncated("Début du texte...")
+    assert not is_truncated(LONG_TEXT)
+
+
+def test_signature_is_deterministic_and_portable(hasher):
+    signature = hasher.signature(LONG_TEXT)
+    assert len(signature) == hasher.num_perm
+    # Graine fixe : même signature d'un processus (et d'une instance) à l'autre
+    assert MinHasher().signature(LONG_TEXT) == signature
+    assert MinHasher(seed=2).signature(LONG_TEXT) != signature
+    assert signature_from_hex(signature_to_hex(signature)) == signature
+    assert hasher.hex_signature(LONG_TEXT) == signature_to_hex(signature)
+    assert hasher.signature("!!! 🎉") is None and hasher.hex_signature("") is None
+
+
+def test_near_duplicates_are_similar_and_distinct_posts_are_not(hasher):
+    original = hasher.signature(LONG_TEXT)
+    assert MinHasher.similarity(original, hasher.signature(REPOST)) >= 0.9
+    assert MinHasher.similarity(original, hasher.signature(OTHER_TEXT)) < 0.2
+    assert MinHasher.similarity(original, original[:10]) == 0.0
+
+
+def test_optimal_bands_fit_the_signature_and_follow_the_threshold():
+    for threshold in (0.5, 0.8, 0.9):
+        bands, rows = optimal_bands(64, threshold)
+        assert bands * rows <= 64
+    # Seuil plus élevé : bandes plus longues (moins de candidats)
+    assert optimal_bands(64, 0.9)[1] >= optimal_bands(64, 0.5)[1]
+
+
+def test_lsh_groups_reposts_and_truncated_texts(hasher):
+    index = LSHIndex(None, threshold=0.8)
+    assert index.assign("full", LONG_TEXT, hasher=hasher) == ("full", 1.0)
+    assert index.assign("repost", REPOST, hasher=hasher)[0] == "full"
+    assert index.assign("other", OTHER_TEXT, hasher=hasher) == ("other", 1.0)
+
+    # Jaccard faible avec le texte complet : rapproché par le préfixe normalisé
+    truncated_signature = hasher.signature(TRUNCATED)
+    assert MinHasher.similarity(truncated_signature, hasher.signature(LONG_TEXT)) < 0.8
+    assert len(normalize_for_similarity(TRUNCATED)) >= PREFIX_CHARS
+    assert index.assign("truncated", TRUNCATED, truncated_signature) == ("full", 0.8)
+    # Déjà indexé : groupe inchangé
+    assert index.assign("other", LONG_TEXT, hasher=hasher) == ("other", 1.0)
+
+
+def test_full_text_joins_group_of_truncated_text_seen_first(hasher):
+    index = LSHIndex(None)
+    index.assign("truncated", TRUNCATED, hasher=hasher)
+    assert index.assign("full", LONG_TEXT, hasher=hasher)[0] == "truncated"
+    # Deux textes complets de même début mais de fins différentes ne sont pas rapprochés par le préfixe
+    index = LSHIndex(None)
+    index.assign("full", LONG_TEXT, hasher=hasher)
+    different_end = LONG_TEXT[:300] + " " + OTHER_TEXT
+    assert index.assign("different", different_end, hasher=hasher)[0] == "different"
+
+
+def test_index_is_reloaded_from_disk(tmp_path, hasher):
+    path = str(tmp_path / "lsh.jsonl")
+    index = LSHIndex(path)
+    index.assign("full", LONG_TEXT, hasher=hasher)
+    index.assign("truncated", TRUNCATED, hasher=hasher)
+    index.close()
+
+    reloaded = LSHIndex(path)
+    assert len(reloaded) == 2 and reloaded.cluster_of("truncated") == "full"
+    assert reloaded.assign("repost", REPOST, hasher=hasher)[0] == "full"
+    reloaded.close()
+
+
+def test_detector_tags_posts_and_reuses_parse_time_signatures(hasher):
+    detector = NearDuplicateDetector(LSHIndex(None), hasher)
+    signed = PostModel(page_name="Média A", text=LONG_TEXT, images=[], comments=1, shares=0,
+                       minhash=hasher.hex_signature(LONG_TEXT))
+    posts = [signed, {"page_name": "Média B", "text": REPOST}, {"page_name": "Média C", "text": OTHER_TEXT},
+             {"page_name": "Média D", "text": "🎉"}]
+    stats = detector.process(posts)
+    assert (stats["posts"], stats["clustered"], stats["new_clusters"], stats["skipped"]) == (4, 1, 2, 1)
+    assert posts[1]["cluster_id"] == signed.cluster_id == signed.fingerprint
+    assert posts[2]["cluster_id"] != signed.cluster_id
+    assert posts[1]["minhash"] == hasher.hex_signature(REPOST)
+    assert "cluster_id" not in posts[3]
+
+
+def test_cluster_script_tags_stored_posts(tmp_path, monkeypatch):
+    path = str(tmp_path / "posts.sqlite3")
+    storage = SQLiteStorage(path)
+    storage.insert_many_posts([
+        PostModel(page_name="Média A", text=LONG_TEXT, images=[], comments=1, shares=0),
+        PostModel(page_name="Média B", text=REPOST, images=[], comments=2, shares=0),
+        PostModel(page_name="Média C", text=TRUNCATED, images=[], comments=3, shares=0),
+        PostModel(page_name="Média D", text=OTHER_TEXT, images=[], comments=4, shares=0),
+    ])
+    storage.close()
+
+    argv = ["cluster.py", "--storage", "sqlite", "--storage-path", path]
+    monkeypatch.setattr(sys, "argv", argv + ["--dry-run"])
+    cluster.main()
+    with SQLiteStorage(path) as storage:
+        assert all("cluster_id" not in post for post in storage.iter_posts())
+
+    index_path = str(tmp_path / "lsh.jsonl")
+    monkeypatch.setattr(sys, "argv", argv + ["--rebuild-index", "--index-path", index_path])
+    cluster.main()
+    with SQLiteStorage(path) as storage:
+        posts = {post["page_name"]: post for post in storage.iter_posts()}
+    first = posts["Média A"]["fingerprint"]
+    assert [posts[name]["cluster_id"] for name in ("Média A", "Média B", "Média C")] == [first] * 3
+    assert posts["Média D"]["cluster_id"] == posts["Média D"]["fingerprint"]
+    assert all(post["minhash"] for post in posts.values())
+    index = LSHIndex(index_path)
+    assert len(index) == 4
+    index.close()
+
+
+class FakeGraphQLScraper:
+    def go_to_search(self, query):
+        pass
+
+    def stream_graphql_posts(self, scrolls=50, max_idle_cycles=3):
+        yield PostModel(page_name="Média A", text=LONG_TEXT, images=[], comments=1, shares=0)
+        yield PostModel(page_name="", text="", images=[], comments=None, shares=None)
+
+
+def test_pool_graphql_path_signs_posts(hasher):
+    posts = scrape_query(FakeGraphQLScraper(), "sujet", graphql=True, minhasher=hasher)
+    assert [post.minhash for post in posts] == [hasher.hex_signature(LONG_TEXT)]
+    assert scrape_query(FakeGraphQLScraper(), "sujet", graphql=True)[0].minhash is None
@@ -0,0 +1,97 @@
+# tests/test_parser_backends.py
+import pytest
+
+from selenium_scraper.parser import FacebookParser
+from selenium_scraper.parser_backends import extract_counts, is_post_image, parse_number
+
+EXPECTED = [
+    {
+        "page_name": "Archives INA",
+        "text": "🇫🇷 Il y a 30 ans, Jacques Chirac entrait à l'Élysée."
+                "Revoir la passation de pouvoirs & le discours :ina.fr/chirac-1995",
+        "images": [
+            "https://scontent-cdg4-2.xx.fbcdn.net/v/t39.30808-6/481913482_1034781_5521734_n.jpg"
+            "?stp=dst-jpg_s600x600_tt6&_nc_cat=101&ccb=1-7&_nc_sid=127cfc&_nc_ohc=a4bZs&oh=00_AYB1d&oe=67E3C1A2",
+            "https://scontent-cdg4-1.xx.fbcdn.net/v/t39.30808-6/481913483_1034782_6630918_n.jpg"
+            "?stp=dst-jpg_p180x540_tt6&_nc_cat=109&oh=00_AYC7e&oe=67E3B0F1",
+        ],
+        "comments": 1200,
+        "shares": 356,
+    },
+    {
+        "page_name": "franceinfo",
+        "text": "ARCHIVE. Le 11 mars 1995, Jacques Chirac présentait son programme pour l’élection présidentielle "
+                "devant ses soutiens réunis à Paris, promettant de réduire la « fracture sociale » qui, selon lui, "
+                "menaçait la cohésion du pays et…En voir plus",
+        "images": [],
+        "comments": 32300,
+        "shares": 1100000,
+    },
+    {
+        "page_name": "Amicale des anciens de Corrèze",
+        "text": "Souvenirde la visite duPrésidentà Sarranen août 2001. Merci à Jeanne pour la photo !",
+        "images": [],
+        "comments": 3,
+        "shares": 4,
+    },
+    {
+        "page_name": "Le Monde",
+        "text": "« Mangez des pommes ! » 🍎🍏#Chirac#archives",
+        "images": [
+            "https://scontent-cdg4-1.xx.fbcdn.net/v/t15.5256-10/466094116_57_n.jpg"
+            "?stp=dst-jpg_s960x960_tt6&_nc_cat=105&oh=00_AYA&oe=67E1",
+        ],
+        "comments": 2000,
+        "shares": 9800,
+    },
+]
+
+
+def parse(html, backend):
+    return [post.to_dict() for post in FacebookParser(html, backend=backend).parse_all()]
+
+
+def test_bs4_matches_saved_page(search_html):
+    posts = parse(search_html, "bs4")
+    assert [{k: v for k, v in post.items() if k != "fingerprint"} for post in posts] == EXPECTED
+    assert all(post["fingerprint"] for post in posts)
+
+
+def test_lxml_matches_bs4_on_saved_page(search_html):
+    pytest.importorskip("lxml")
+    assert parse(search_html, "lxml") == parse(search_html, "bs4")
+
+
+def test_backends_agree_on_each_fragment(search_html):
+    """parse_stream reçoit des fragments isolés (un bloc de post) : les deux backends doivent rester identiques."""
+    pytest.importorskip("lxml")
+    blocks = search_html.split("<!-- ")[1:]
+    fragments = [block.split("-->", 1)[1] for block in blocks]
+    for fragment in fragments:
+        bs4_posts = [p.to_dict() for p in FacebookParser(backend="bs4").parse_stream([fragment])]
+        lxml_posts = [p.to_dict() for p in FacebookParser(backend="lxml").parse_stream([fragment])]
+        assert lxml_posts == bs4_posts
+    assert len([p for f in fragments for p in FacebookParser(backend="bs4").parse_stream([f])]) == len(EXPECTED)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("3,2 K commentaires", 3200),
+    ("32,3 k commentaires", 32300),
+    ("1,1 M partages", 1100000),
+    ("356 partages", 356),
+    ("aucun chiffre", None),
+])
+def test_parse_number(text, expected):
+    assert parse_number(text) == expected
+
+
+def test_extract_counts_skips_buttons_and_nbsp():
+    counts = extract_counts(["Commenter", "Partager", "12\xa0K commentaires", "7 partages", "9 partages"])
+    assert counts == {"comments": 12000, "shares": 7}
+
+
+def test_is_post_image_filters_emojis_and_inline():
+    assert is_post_image("https://scontent.xx.fbcdn.net/v/t39.30808-6/1_n.jpg")
+    assert not is_post_image("https://static.xx.fbcdn.net/images/emoji.php/v9/t51/1/16/1f449.png")
+    assert not is_post_image("data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP")
+    assert not is_post_image("https://example.org/photo.jpg")
@@ -0,0 +1,137 @@
+# tests/test_pipeline.py
+import threading
+
+import pytest
+
+from benchmarks.generator import SyntheticPageGenerator
+from pipeline.runner import PipelineError, PipelineRunner
+from selenium_scraper import selector_registry as sel
+from selenium_scraper.minhash import MinHasher
+from storage.sqlite_backend import SQLiteStorage
+
+FIELDS = ("page_name", "text", "images", "comments", "shares")
+
+
+def fake_fragments(posts: int = 30, seed: int = 7):
+    """Source factice : un fragment HTML par bloc de post, comme FacebookScraper.stream_post_fragments."""
+    html, expected = SyntheticPageGenerator(seed=seed, text_words=20).generate(posts)
+    marker = f'<div class="{sel.POST_CONTAINER_CLASS}">'
+    body = html.split('<div role="feed">', 1)[1].rsplit("</div></body>", 1)[0]
+    fragments = [marker + block for block in body.split(marker)[1:]]
+    assert len(fragments) == posts
+    return fragments, expected
+
+
+def run_with_timeout(runner, fragments, timeout: float = 30):
+    """Lance le pipeline dans un thread : un blocage fait échouer le test au lieu de le figer."""
+    outcome = {}
+
+    def target():
+        try:
+            outcome["stats"] = runner.run(fragments)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "le pipeline ne s'est pas terminé"
+    return outcome
+
+
+def stored(storage):
+    return sorted(({k: doc[k] for k in FIELDS} for doc in storage.iter_posts()), key=lambda d: d["text"])
+
+
+@pytest.fixture
+def storage(tmp_path):
+    backend = SQLiteStorage(str(tmp_path / "posts.sqlite3"), batch_size=50)
+    yield backend
+    backend.close()
+
+
+@pytest.mark.parametrize("backend", ["bs4", "auto"])
+def test_pipeline_stores_every_post(storage, backend):
+    fragments, expected = fake_fragments()
+    runner = PipelineRunner(storage, parse_workers=3, backend=backend, queue_size=2, batch_size=7, flush_interval=0.1)
+    outcome = run_with_timeout(runner, iter(fragments))
+    stats = outcome["stats"]
+    assert stats["fragments"] == len(fragments)
+    assert stats["posts"] == len(expected)
+    assert stats["storage"].inserted == len(expected)
+    assert stored(storage) == sorted(expected, key=lambda d: d["text"])
+
+
+def test_pipeline_with_process_pool(storage):
+    fragments, expected = fake_fragments(posts=12)
+    runner = PipelineRunner(storage, parse_workers=2, use_processes=True, backend="bs4", batch_size=5)
+    outcome = run_with_timeout(runner, fragments, timeout=60)
+    assert outcome["stats"]["posts"] == len(expected)
+    assert storage.count() == len(expected)
+
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_pipeline_signs_posts_in_parse_stage(storage, use_processes):
+    fragments, expected = fake_fragments(posts=8)
+    hasher = MinHasher()
+    unsigned = []
+
+    class RecordingDedup:
+        """Étape de stockage : les posts doivent arriver déjà signés."""
+
+        def process(self, posts):
+            unsigned.extend(post for post in posts
+                            if not (post.get("minhash") if isinstance(post, dict) else post.minhash))
+
+    runner = PipelineRunner(storage, parse_workers=2, use_processes=use_processes, backend="bs4", batch_size=3,
+                            dedup=RecordingDedup(), minhasher=hasher)
+    outcome = run_with_timeout(runner, fragments, timeout=60)
+    assert outcome["stats"]["posts"] == len(expected)
+    assert unsigned == []
+    assert all(doc["minhash"] == hasher.hex_signature(doc["text"]) for doc in storage.iter_posts())
+
+
+def test_pipeline_with_mongomock():
+    mongomock = pytest.importorskip("mongomock")
+    from storage.mongo_client import MongoDBClient
+
+    class MockMongoDBClient(MongoDBClient):
+        def _connect(self):
+            return mongomock.MongoClient()
+
+    fragments, expected = fake_fragments()
+    storage = MockMongoDBClient(db_name="tests", collection_name="pipeline", batch_size=10)
+    outcome = run_with_timeout(PipelineRunner(storage, batch_size=10, flush_interval=0.1), fragments)
+    assert outcome["stats"]["storage"].inserted == len(expected)
+    assert stored(storage) == sorted(expected, key=lambda d: d["text"])
+
+
+def test_unknown_backend_raises_instead_of_hanging(storage):
+    fragments, _ = fake_fragments(posts=5)
+    outcome = run_with_timeout(PipelineRunner(storage, backend="inexistant"), fragments, timeout=10)
+    assert isinstance(outcome.get("error"), PipelineError)
+    assert storage.count() == 0
+
+
+def test_source_error_stops_the_pipeline(storage):
+    fragments, _ = fake_fragments(posts=10)
+
+    def broken_source():
+        yield from fragments[:3]
+        raise RuntimeError("navigateur fermé")
+
+    outcome = run_with_timeout(PipelineRunner(storage, queue_size=1), broken_source(), timeout=10)
+    assert isinstance(outcome.get("error"), PipelineError)
+    assert isinstance(outcome["error"].__cause__, RuntimeError)
+
+
+def test_storage_error_stops_a_blocked_source(storage, monkeypatch):
+    def failing_insert(posts, **kwargs):
+        raise OSError("disque plein")
+
+    monkeypatch.setattr(storage, "insert_many_posts", failing_insert)
+    fragments, _ = fake_fragments(posts=40)
+    runner = PipelineRunner(storage, parse_workers=1, queue_size=1, batch_size=1)
+    outcome = run_with_timeout(runner, (f for f in fragments * 50), timeout=10)
+    assert isinstance(outcome.get("error"), PipelineError)
+    assert isinstance(outcome["error"].__cause__, OSError)
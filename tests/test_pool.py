@@ -0,0 +1,82 @@
+# tests/test_pool.py
+from functools import partial
+from types import SimpleNamespace
+import os
+
+import requests
+
+from benchmarks.generator import SyntheticPageGenerator
+from selenium_scraper.pool import ScraperPool, load_queries
+
+QUERIES = ["chirac", "pommes", "reprise", "plantage", "casse"]
+
+
+class FakeScraper:
+    """Scraper factice (processus worker) : lit les pages de recherche sur le site local au lieu de Facebook."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.driver = SimpleNamespace(quit=lambda: None)
+        self.html = ""
+
+    def go_to_search(self, query: str):
+        response = requests.get(f"{self.base_url}/search/{query}", timeout=10)
+        if response.status_code == 410:
+            # Worker tué en plein sujet (plantage de Chrome, OOM…) : aucun message envoyé au superviseur
+            os._exit(1)
+        response.raise_for_status()
+        self.html = response.text
+
+    def prepare_html_with_scrolls(self, scrolls: int = 50, max_idle_cycles: int = 3) -> str:
+        return self.html
+
+
+def fake_scraper_factory(base_url: str, settings):
+    return FakeScraper(base_url)
+
+
+def page(seed: int):
+    html, expected = SyntheticPageGenerator(seed=seed, text_words=8, invalid_ratio=0).generate(4)
+    return (200, "text/html; charset=utf-8", html.encode()), expected
+
+
+def test_pool_retries_recovers_killed_worker_and_writes_in_parent(local_server):
+    expected = {}
+    for seed, query in enumerate(QUERIES):
+        ok, expected[query] = page(seed)
+        local_server.route(f"/search/{query}", ok)
+    ok, _ = page(QUERIES.index("reprise"))
+    local_server.route("/search/reprise", (503, "text/plain", b"indisponible"), ok)
+    ok, _ = page(QUERIES.index("plantage"))
+    local_server.route("/search/plantage", (410, "text/plain", b"tue le worker"), ok)
+    local_server.route("/search/casse", (500, "text/plain", b"erreur"))
+
+    writes = []
+
+    def on_posts(query, posts):
+        writes.append((os.getpid(), query, [post["text"] for post in posts]))
+
+    pool = ScraperPool("test@example.org", "", workers=2, rate_limit=0, max_retries=3, check_interval=0.2,
+                       scraper_factory=partial(fake_scraper_factory, local_server.url("")))
+    summary = pool.run(QUERIES, on_posts=on_posts)
+
+    assert summary["done"] == 4
+    assert summary["failed"] == ["casse"]
+    assert summary["restarts"] == 1
+    # 503 (1 reprise), worker tué (1 reprise), sujet toujours en erreur (2 reprises avant abandon)
+    assert summary["retries"] == 4
+    assert local_server.hits["/search/casse"] == 3
+    assert local_server.hits["/search/plantage"] == 2
+
+    # Un seul écrivain : tous les résultats passent par ce processus, une fois par sujet
+    assert {pid for pid, _, _ in writes} == {os.getpid()}
+    assert sorted(query for _, query, _ in writes) == sorted(set(QUERIES) - {"casse"})
+    for _, query, texts in writes:
+        assert texts == [post["text"] for post in expected[query]]
+    assert summary["posts"] == 16
+
+
+def test_load_queries_merges_file_and_list(tmp_path):
+    path = tmp_path / "queries.txt"
+    path.write_text("# sujets\nchirac\n\n  pommes  \nchirac\n", encoding="utf-8")
+    assert load_queries(str(path), ["élysée", "pommes", " "]) == ["élysée", "pommes", "chirac"]
@@ -0,0 +1,56 @@
+# tests/test_see_more.py
+import pytest
+
+from selenium_scraper.parser import FacebookParser
+
+from conftest import read_fixture
+
+FULL_TEXTS = {
+    "franceinfo": "ARCHIVE. Le 11 mars 1995, Jacques Chirac présentait son programme.",
+    "BBC News": "Former French president Jacques Chirac has died aged 86.",
+    "El País": "Muere Jacques Chirac, expresidente de Francia.",
+    "Amicale des anciens de Corrèze": "Souvenir de Sarran, partagé par Jeanne.",
+    "Le Monde": "« Mangez des pommes ! »",
+}
+
+
+@pytest.fixture
+def see_more_url(local_server):
+    local_server.route("/see_more.html", (200, "text/html; charset=utf-8", read_fixture("see_more_page.html").encode()))
+    return local_server.url("/see_more.html")
+
+
+def test_expand_clicks_every_label_once(make_scraper, see_more_url):
+    scraper = make_scraper()
+    scraper.driver.get(see_more_url)
+    # fr, en, es, post partagé imbriqué et son post d'origine ; ni "Afficher la traduction" ni "Commenter"
+    assert scraper.expand_all_see_more() == 5
+    clicks = scraper.driver.execute_script("return window.clicks;")
+    assert sorted(clicks) == sorted(["En voir plus", "See more", "Ver más", "En voir plus", "En voir plus"])
+    # Posts déjà dépliés : plus aucun bouton recherché
+    assert scraper.expand_all_see_more() == 0
+
+
+def test_expanded_page_parses_full_texts(make_scraper, see_more_url):
+    scraper = make_scraper()
+    scraper.driver.get(see_more_url)
+    scraper.expand_all_see_more()
+    posts = FacebookParser(scraper.driver.page_source).parse_all()
+    texts = {post.page_name: post.text for post in posts}
+    assert {name: texts[name] for name in FULL_TEXTS} == FULL_TEXTS
+    assert not any("voir plus" in post.text.lower() for post in posts)
+
+
+def test_custom_labels_only(make_scraper, see_more_url):
+    scraper = make_scraper(see_more_labels=["See more"])
+    scraper.driver.get(see_more_url)
+    assert scraper.expand_all_see_more() == 1
+    assert scraper.driver.execute_script("return window.clicks;") == ["See more"]
+
+
+def test_stream_expands_before_harvest(make_scraper, feed_url):
+    scraper = make_scraper()
+    scraper.driver.get(feed_url("per=5&batches=2&expand=400"))
+    posts = list(FacebookParser(None).parse_stream(scraper.stream_post_fragments(scrolls=5, max_idle_cycles=1)))
+    assert len(posts) == 10
+    assert all(post.text.endswith("suite et fin du texte.") for post in posts)
@@ -0,0 +1,109 @@
+# tests/test_session.py
+import json
+import os
+import time
+
+import pytest
+
+from selenium_scraper.session import COOKIE_ORIGIN_URL, SessionStore
+
+COOKIES = [
+    {"name": "c_user", "value": "1000", "domain": ".facebook.com", "path": "/", "expiry": 1893456000.0,
+     "secure": True, "httpOnly": False, "sameSite": "None"},
+    {"name": "xs", "value": "secret", "domain": ".facebook.com", "path": "/", "secure": True, "httpOnly": True},
+]
+LOCAL_STORAGE = {"hb_timestamp": "1718000000", "Session": "{\"id\": 1}"}
+
+
+class FakeDriver:
+    """Navigateur factice : cookies et localStorage en mémoire."""
+
+    def __init__(self, cookies=(), local_storage=None):
+        self.cookies = list(cookies)
+        self.local_storage = dict(local_storage or {})
+        self.visited = []
+
+    def get_cookies(self):
+        return list(self.cookies)
+
+    def add_cookie(self, cookie):
+        if cookie["name"] == "refuse":
+            raise ValueError("invalid cookie domain")
+        self.cookies.append(cookie)
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def execute_script(self, script, *args):
+        if args:
+            self.local_storage.update(args[0])
+            return None
+        return dict(self.local_storage)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SessionStore(str(tmp_path / "sessions"))
+
+
+def test_save_then_restore_round_trip(store):
+    store.save(FakeDriver(COOKIES, LOCAL_STORAGE), "Moi@Example.org")
+    # Un fichier par compte, sans l'adresse e-mail en clair, retrouvé quelle que soit la casse
+    files = os.listdir(store.directory)
+    assert len(files) == 1 and "example" not in files[0]
+    assert store.load(" moi@example.org ")["cookies"] == COOKIES
+
+    driver = FakeDriver()
+    assert store.restore(driver, "moi@example.org")
+    assert driver.visited == [COOKIE_ORIGIN_URL]
+    assert [cookie["name"] for cookie in driver.cookies] == ["c_user", "xs"]
+    # Champs non acceptés par add_cookie retirés, expiration entière
+    assert "sameSite" not in driver.cookies[0] and driver.cookies[0]["expiry"] == 1893456000
+    assert driver.local_storage == LOCAL_STORAGE
+
+
+def test_restore_without_session_or_cookies(store):
+    driver = FakeDriver()
+    assert not store.restore(driver, "inconnu@example.org")
+    store.save(FakeDriver([], LOCAL_STORAGE), "vide@example.org")
+    assert not store.restore(driver, "vide@example.org")
+    assert driver.visited == []
+
+
+def test_rejected_cookie_is_skipped(store):
+    store.save(FakeDriver(COOKIES + [{"name": "refuse", "value": "x"}]), "moi@example.org")
+    driver = FakeDriver()
+    assert store.restore(driver, "moi@example.org")
+    assert [cookie["name"] for cookie in driver.cookies] == ["c_user", "xs"]
+
+
+def test_expired_session_is_ignored(store, monkeypatch):
+    store.save(FakeDriver(COOKIES), "moi@example.org")
+    assert store.load("moi@example.org") is not None
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + store.max_age + 1)
+    assert store.load("moi@example.org") is None
+    assert not store.restore(FakeDriver(), "moi@example.org")
+
+
+def test_failed_save_keeps_previous_session(store):
+    store.save(FakeDriver(COOKIES, LOCAL_STORAGE), "moi@example.org")
+    # Valeur non sérialisable : l'écriture échoue en cours de route
+    with pytest.raises(TypeError):
+        store.save(FakeDriver([{"name": "c_user", "value": object()}]), "moi@example.org")
+    assert os.listdir(store.directory) == [os.path.basename(store._path("moi@example.org"))]
+    assert store.load("moi@example.org")["cookies"] == COOKIES
+
+
+def test_unreadable_session_and_clear(store):
+    store.save(FakeDriver(COOKIES), "moi@example.org")
+    with open(store._path("moi@example.org"), "w", encoding="utf-8") as f:
+        f.write("{tronqué")
+    assert store.load("moi@example.org") is None
+
+    store.save(FakeDriver(COOKIES), "moi@example.org")
+    with open(store._path("moi@example.org"), encoding="utf-8") as f:
+        assert json.load(f)["cookies"] == COOKIES
+    store.clear("moi@example.org")
+    store.clear("moi@example.org")
+    assert store.load("moi@example.org") is None
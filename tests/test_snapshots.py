@@ -0,0 +1,85 @@
+# tests/test_snapshots.py
+from datetime import datetime, timezone
+import gzip
+import json
+import os
+import sys
+
+import pytest
+
+import reparse
+from benchmarks.generator import SyntheticPageGenerator
+from storage.snapshot_archive import SNAPSHOT_ERRORS, SnapshotArchive, load_snapshot
+from storage.sqlite_backend import SQLiteStorage
+
+
+def test_gzip_round_trip_and_index(tmp_path):
+    archive = SnapshotArchive(str(tmp_path), codec="gzip")
+    first = archive.save("<html>é😀</html>", "Jacques Chirac",
+                         captured_at=datetime(2024, 6, 1, 12, tzinfo=timezone.utc))
+    archive.save_fragments(["<div>a</div>", "<div>b</div>"], "Autre sujet")
+
+    assert load_snapshot(archive.path_of(first)) == "<html>é😀</html>"
+    assert [m["kind"] for m in archive.iter_snapshots()] == ["page", "fragments"]
+    assert [m["path"] for m in archive.iter_snapshots(query="Jacques Chirac")] == [first["path"]]
+    assert list(archive.iter_snapshots(since="2030-01-01")) == []
+    # Écriture atomique : aucun fichier temporaire ne reste dans l'archive
+    assert not [name for _, _, files in os.walk(tmp_path) for name in files if name.endswith(".tmp")]
+
+
+def test_zstd_round_trip(tmp_path):
+    pytest.importorskip("zstandard")
+    archive = SnapshotArchive(str(tmp_path), codec="zstd")
+    metadata = archive.save("<html>zstd</html>", "q")
+    assert metadata["path"].endswith(".html.zst")
+    assert load_snapshot(archive.path_of(metadata)) == "<html>zstd</html>"
+
+
+def test_tee_archives_remaining_chunk(tmp_path):
+    archive = SnapshotArchive(str(tmp_path), codec="gzip")
+    fragments = [f"<div>{i}</div>" for i in range(5)]
+    assert list(archive.tee(iter(fragments), "q", chunk_size=2)) == fragments
+    saved = [load_snapshot(archive.path_of(m)) for m in archive.iter_snapshots()]
+    assert "\n".join(saved) == "\n".join(fragments)
+
+
+def test_load_snapshot_errors(tmp_path):
+    truncated = tmp_path / "tronquee.html.gz"
+    truncated.write_bytes(gzip.compress(b"<html>" * 1000)[:40])
+    garbage = tmp_path / "corrompue.html.gz"
+    garbage.write_bytes(b"\x1f\x8b\x08\x00pas du gzip du tout")
+    for path in (truncated, garbage, tmp_path / "absente.html.gz"):
+        with pytest.raises(SNAPSHOT_ERRORS):
+            load_snapshot(str(path))
+
+
+def test_reparse_skips_corrupt_snapshots(tmp_path, monkeypatch):
+    archive_dir = tmp_path / "snapshots"
+    archive = SnapshotArchive(str(archive_dir), codec="gzip")
+    expected = []
+    saved = []
+    for seed in range(4):
+        html, posts = SyntheticPageGenerator(seed=seed, text_words=10).generate(6)
+        saved.append(archive.save(html, "Jacques Chirac"))
+        expected.append(posts)
+    # Une capture tronquée (arrêt en cours d'écriture) et une capture supprimée mais encore dans l'index
+    with open(archive.path_of(saved[1]), "r+b") as f:
+        f.truncate(30)
+    os.remove(archive.path_of(saved[2]))
+
+    db_path = str(tmp_path / "posts.sqlite3")
+    ndjson_path = str(tmp_path / "posts.ndjson")
+    monkeypatch.setattr(sys, "argv", [
+        "reparse.py", "--archive-dir", str(archive_dir), "--workers", "2", "--backend", "bs4",
+        "--storage", "sqlite", "--storage-path", db_path, "--export-ndjson", ndjson_path,
+    ])
+    reparse.main()
+
+    valid = {post["text"] for posts in (expected[0], expected[3]) for post in posts}
+    storage = SQLiteStorage(db_path)
+    try:
+        assert {doc["text"] for doc in storage.iter_posts()} == valid
+    finally:
+        storage.close()
+    with open(ndjson_path, encoding="utf-8") as f:
+        assert {json.loads(line)["text"] for line in f} == valid
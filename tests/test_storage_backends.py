@@ -0,0 +1,172 @@
+# tests/test_storage_backends.py
+from concurrent.futures import ThreadPoolExecutor
+import json
+import time
+
+import pytest
+
+from selenium_scraper.model import PostModel, compute_fingerprint
+from storage.jsonl_backend import JsonLinesStorage
+from storage.sqlite_backend import SQLiteStorage
+
+ENGINES = {
+    "sqlite": lambda tmp_path: SQLiteStorage(str(tmp_path / "posts.sqlite3"), batch_size=2),
+    "jsonl": lambda tmp_path: JsonLinesStorage(str(tmp_path / "posts.jsonl"), batch_size=2),
+}
+
+
+@pytest.fixture(params=sorted(ENGINES))
+def open_storage(request, tmp_path):
+    """Ouvre (ou rouvre) le moteur testé sur le même fichier."""
+    opened = []
+
+    def factory():
+        storage = ENGINES[request.param](tmp_path)
+        opened.append(storage)
+        return storage
+
+    yield factory
+    for storage in opened:
+        storage.close()
+
+
+def make_posts(n, start=0, comments=None):
+    return [
+        PostModel(page_name=f"Page {i}", text=f"Texte du post {i}", images=[f"https://scontent.xx.fbcdn.net/{i}.jpg"],
+                  comments=i if comments is None else comments, shares=0)
+        for i in range(start, start + n)
+    ]
+
+
+def fingerprint(i):
+    return compute_fingerprint(f"Page {i}", f"Texte du post {i}")
+
+
+def test_insert_rejects_duplicates(open_storage):
+    storage = open_storage()
+    result = storage.insert_many_posts(make_posts(3))
+    assert (result.inserted, result.duplicates, result.failed, result.batches) == (3, 0, 0, 2)
+    result = storage.insert_many_posts(make_posts(4))
+    assert (result.inserted, result.duplicates) == (1, 3)
+    assert storage.count() == 4
+    assert [post["page_name"] for post in storage.iter_posts()] == [f"Page {i}" for i in range(4)]
+
+
+def test_upsert_updates_only_changed_posts(open_storage):
+    storage = open_storage()
+    storage.insert_many_posts(make_posts(3))
+    posts = make_posts(3) + make_posts(1, start=3)
+    posts[1].comments = 42
+    result = storage.insert_many_posts(posts, upsert=True)
+    # Post 1 modifié, posts 0 et 2 identiques, post 3 nouveau
+    assert (result.inserted, result.updated, result.duplicates) == (1, 1, 2)
+    stored = {post["fingerprint"]: post for post in storage.iter_posts()}
+    assert stored[fingerprint(1)]["comments"] == 42
+    assert stored[fingerprint(1)]["images"] == ["https://scontent.xx.fbcdn.net/1.jpg"]
+
+    # Même version renvoyée : rien n'est réécrit
+    result = storage.insert_many_posts(posts, upsert=True)
+    assert (result.inserted, result.updated, result.duplicates) == (0, 0, 4)
+
+
+def test_update_engagement_history_and_unknown_posts(open_storage):
+    storage = open_storage()
+    storage.insert_many_posts(make_posts(2))
+    for comments in (10, 20, 30):
+        storage.update_engagement([{"fingerprint": fingerprint(0), "comments": comments, "shares": 1}], history_size=2)
+    result = storage.update_engagement([
+        {"fingerprint": "inconnue", "comments": 1, "shares": 1},
+        {"fingerprint": fingerprint(1), "comments": 5, "shares": 2},
+    ])
+    assert (result.updated, result.failed, result.failed_ids) == (1, 1, ["inconnue"])
+
+    stored = {post["fingerprint"]: post for post in storage.iter_posts()}
+    assert (stored[fingerprint(0)]["comments"], stored[fingerprint(0)]["shares"]) == (30, 1)
+    assert [entry["comments"] for entry in stored[fingerprint(0)]["engagement_history"]] == [20, 30]
+    assert (stored[fingerprint(1)]["comments"], stored[fingerprint(1)]["shares"]) == (5, 2)
+    assert [entry["comments"] for entry in stored[fingerprint(1)]["engagement_history"]] == [5]
+
+
+def test_reopened_storage_keeps_posts_and_versions(open_storage):
+    storage = open_storage()
+    storage.insert_many_posts(make_posts(3))
+    posts = make_posts(3)
+    posts[2].comments = 7
+    storage.insert_many_posts(posts, upsert=True)
+    storage.update_engagement([{"fingerprint": fingerprint(0), "comments": 11, "shares": 3}])
+    before = list(storage.iter_posts())
+    storage.close()
+
+    reopened = open_storage()
+    assert reopened.count() == 3
+    assert list(reopened.iter_posts()) == before
+    # Versions relues : la dernière version écrite n'est pas réécrite, un doublon reste rejeté
+    result = reopened.insert_many_posts(posts, upsert=True)
+    assert (result.inserted, result.duplicates) == (0, 2)
+    assert reopened.insert_many_posts(make_posts(1)).duplicates == 1
+
+
+def test_jsonl_replays_operation_lines(tmp_path):
+    path = tmp_path / "posts.jsonl"
+    storage = JsonLinesStorage(str(path))
+    storage.insert_many_posts(make_posts(2))
+    posts = make_posts(2, comments=9)
+    storage.insert_many_posts(posts, upsert=True)
+    storage.update_engagement([{"fingerprint": fingerprint(1), "comments": 12, "shares": 4}])
+    storage.close()
+
+    with open(path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    # Ajout seul : 2 posts, 2 upserts, 1 mise à jour des compteurs
+    assert [line.get("_op") for line in lines] == [None, None, "upsert", "upsert", "engagement"]
+    # Ligne tronquée (arrêt brutal) : ignorée à la relecture
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"fingerprint": "tronq')
+
+    reopened = JsonLinesStorage(str(path))
+    stored = {post["fingerprint"]: post for post in reopened.iter_posts()}
+    assert len(stored) == 2
+    assert all("_op" not in post for post in stored.values())
+    assert stored[fingerprint(0)]["comments"] == 9
+    assert (stored[fingerprint(1)]["comments"], stored[fingerprint(1)]["shares"]) == (12, 4)
+    assert [entry["comments"] for entry in stored[fingerprint(1)]["engagement_history"]] == [12]
+    reopened.close()
+
+
+def test_jsonl_concurrent_inserts_write_each_post_once(tmp_path, monkeypatch):
+    path = tmp_path / "posts.jsonl"
+    storage = JsonLinesStorage(str(path), batch_size=1)
+    append = storage._append
+
+    def slow_append(records):
+        # Élargit la fenêtre entre la vérification des empreintes connues et l'écriture
+        time.sleep(0.005)
+        append(records)
+
+    monkeypatch.setattr(storage, "_append", slow_append)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: storage.insert_many_posts(make_posts(20)), range(8)))
+    assert sum(result.inserted for result in results) == 20
+    storage.close()
+    with open(path, encoding="utf-8") as f:
+        assert len(f.readlines()) == 20
+
+
+def test_jsonl_write_errors_are_reported(tmp_path, monkeypatch):
+    storage = JsonLinesStorage(str(tmp_path / "posts.jsonl"))
+    storage.insert_many_posts(make_posts(1))
+
+    def broken_append(records):
+        if records:
+            raise OSError("disque plein")
+
+    monkeypatch.setattr(storage, "_append", broken_append)
+    result = storage.insert_many_posts(make_posts(1, start=1))
+    assert (result.inserted, result.failed, result.failed_ids) == (0, 1, [fingerprint(1)])
+    result = storage.update_engagement([{"fingerprint": fingerprint(0), "comments": 3, "shares": 0}])
+    assert (result.updated, result.failed, result.failed_ids) == (0, 1, [fingerprint(0)])
+    # Post en échec non retenu : il pourra être renvoyé
+    assert storage.count() == 1
+    monkeypatch.undo()
+    assert storage.insert_many_posts(make_posts(1, start=1)).inserted == 1
+    storage.close()
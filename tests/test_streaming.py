@@ -0,0 +1,45 @@
+# tests/test_streaming.py
+from selenium_scraper.parser import FacebookParser
+
+
+def test_stream_captures_posts_removed_from_the_dom(make_scraper, feed_url):
+    """
+    Fil virtualisé (posts loin au-dessus de la vue retirés du DOM) : chaque post est collecté avant d'être retiré.
+    Le nombre total de blocs reste à peu près constant d'un cycle à l'autre : le streaming ne doit pas s'arrêter.
+    """
+    scraper = make_scraper()
+    scraper.driver.get(feed_url("per=5&batches=6&evict=1"))
+    posts = list(FacebookParser(None).parse_stream(scraper.stream_post_fragments(scrolls=20, max_idle_cycles=2)))
+    assert sorted(post.comments for post in posts) == list(range(1, 31))
+    assert len({post.fingerprint for post in posts}) == 30
+    # "En voir plus" cliqué avant la collecte : textes complets
+    assert all(post.text.endswith("suite et fin du texte.") for post in posts)
+    assert scraper.driver.execute_script("return document.getElementById('feed').children.length;") < 30
+
+
+def test_harvest_returns_each_post_once_and_prunes(make_scraper, feed_url):
+    from selenium_scraper.waits import count_posts
+
+    scraper = make_scraper()
+    scraper.driver.get(feed_url("per=6&batches=1"))
+    first = scraper.harvest_new_posts(prune=True, flush=True)
+    assert len(first) == 6
+    assert scraper.harvest_new_posts(prune=True, flush=True) == []
+    # Blocs vidés mais hauteur conservée (position de scroll inchangée)
+    emptied = scraper.driver.execute_script(
+        "return [...document.querySelectorAll('[data-fbs-harvested]')]"
+        ".filter(n => n.children.length === 0 && n.style.height).length;"
+    )
+    assert emptied == 6
+    # Blocs collectés exclus du décompte utilisé par l'arrêt adaptatif
+    assert count_posts(scraper.driver) == 0
+
+
+def test_stream_without_prune_matches_full_page(make_scraper, feed_url):
+    scraper = make_scraper()
+    scraper.driver.get(feed_url("per=4&batches=3"))
+    streamed = [p.to_dict() for p in FacebookParser(None).parse_stream(
+        scraper.stream_post_fragments(scrolls=10, prune=False, max_idle_cycles=2))]
+    full = [p.to_dict() for p in FacebookParser(scraper.driver.page_source).parse_all()]
+    assert streamed == full
+    assert len(streamed) == 12
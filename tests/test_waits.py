@@ -0,0 +1,125 @@
+# tests/test_waits.py
+import time
+
+import pytest
+
+pytest.importorskip("selenium")
+
+from selenium_scraper.parser import FacebookParser
+from selenium_scraper.waits import (AdaptiveScrollController, any_of, document_height_changed, network_idle,
+                                    post_count_increased, wait_for)
+
+
+class FakeDriver:
+    """
+    Répond à execute_script selon le script : nombre de posts, hauteur du document, ressources chargées.
+    Les ressources imitent le tampon Resource Timing du navigateur (250 entrées, pleines = ignorées).
+    """
+
+    BUFFER_SIZE = 250
+
+    def __init__(self, posts=0, height=1000, resources=0):
+        self.posts, self.height = posts, height
+        self.buffer = 0
+        self.load(resources)
+
+    def load(self, resources: int):
+        self.buffer = min(self.BUFFER_SIZE, self.buffer + resources)
+
+    def execute_script(self, script, *args):
+        if "querySelectorAll" in script:
+            return self.posts
+        if "scrollHeight" in script:
+            return self.height
+        count = self.buffer
+        if "clearResourceTimings" in script:
+            self.buffer = 0
+        return count
+
+
+def test_controller_stops_after_idle_cycles():
+    controller = AdaptiveScrollController(max_idle_cycles=2, max_cycles=50)
+    for new_posts in (5, 0, 3, 0):
+        assert controller.should_continue()
+        controller.record(new_posts)
+    assert controller.should_continue()
+    controller.record(0)
+    assert not controller.should_continue()
+    assert (controller.cycles, controller.total_new) == (5, 8)
+
+
+def test_controller_respects_max_cycles():
+    controller = AdaptiveScrollController(max_idle_cycles=3, max_cycles=2)
+    controller.record(10)
+    controller.record(10)
+    assert not controller.should_continue()
+
+
+def test_conditions_on_fake_driver():
+    driver = FakeDriver(posts=4, height=1000)
+    assert post_count_increased(4)(driver) is False
+    assert document_height_changed(1000)(driver) is False
+    assert any_of(post_count_increased(4), document_height_changed(1000))(driver) is False
+    driver.height = 1800
+    assert any_of(post_count_increased(4), document_height_changed(1000))(driver) == 1800
+    driver.posts = 9
+    assert post_count_increased(4)(driver) == 9
+
+
+def test_network_idle_needs_a_quiet_period():
+    driver = FakeDriver(resources=3)
+    condition = network_idle(idle_time=0.1)
+    assert condition(driver) is False
+    driver.load(1)
+    assert condition(driver) is False
+    assert condition(driver) is False
+    time.sleep(0.12)
+    assert condition(driver) is True
+
+
+def test_network_idle_after_resource_buffer_is_full():
+    """Plus de 250 ressources chargées : les chargements suivants doivent encore être vus."""
+    driver = FakeDriver(resources=400)
+    condition = network_idle(idle_time=0.1)
+    deadline = time.monotonic() + 0.4
+    while time.monotonic() < deadline:
+        driver.load(5)
+        assert condition(driver) is False
+        time.sleep(0.02)
+    # Chargements terminés : calme après idle_time
+    assert condition(driver) is False
+    time.sleep(0.12)
+    assert condition(driver) is True
+
+
+def test_wait_for_returns_as_soon_as_true_and_none_on_timeout():
+    driver = FakeDriver(posts=1)
+    start = time.monotonic()
+    assert wait_for(driver, post_count_increased(0), timeout=5) == 1
+    assert time.monotonic() - start < 1
+    start = time.monotonic()
+    assert wait_for(driver, post_count_increased(1), timeout=0.3, poll_frequency=0.05) is None
+    assert 0.25 <= time.monotonic() - start < 1.5
+
+
+def test_scroll_waits_for_lazy_loaded_posts(make_scraper, feed_url):
+    """Posts ajoutés 800 ms après le scroll : attendus sans délai fixe, dans la limite de load_timeout."""
+    scraper = make_scraper(load_timeout=3)
+    scraper.driver.get(feed_url("per=5&batches=2&delay=800"))
+    start = time.monotonic()
+    assert scraper.scroll_and_wait() == 5
+    assert time.monotonic() - start < 3 + 2
+
+    # Plus rien à charger : abandon après load_timeout (+ attente du réseau calme)
+    start = time.monotonic()
+    assert scraper.scroll_and_wait() == 0
+    assert time.monotonic() - start < 3 + 2 + 1
+
+
+def test_prepare_html_stops_when_feed_is_exhausted(make_scraper, feed_url):
+    scraper = make_scraper(load_timeout=1)
+    scraper.driver.get(feed_url("per=4&batches=3&delay=300"))
+    html = scraper.prepare_html_with_scrolls(scrolls=20, max_idle_cycles=2)
+    posts = FacebookParser(html).parse_all()
+    assert len(posts) == 12
+    assert all(post.text.endswith("suite et fin du texte.") for post in posts)
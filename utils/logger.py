@@ -1,18 +1,143 @@
 # logger_config.py
+import atexit
+import json
 import logging
+import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
 
-def setup_logger(name: str) -> logging.Logger:
+"""
+Configuration des logs du projet.
+
+- Les loggers n'écrivent pas eux-mêmes : les records passent par une QueueHandler et sont
+  formatés/écrits par un QueueListener dans un thread dédié (pas d'I/O sur le chemin critique).
+- Utiliser le style paresseux : logger.debug("x = %s", x) et non logger.debug(f"x = {x}") ;
+  le message n'est construit que si le record est réellement émis.
+- Les avertissements répétitifs sont limités (RateLimitFilter) ; un résumé des messages supprimés est émis.
+- Sortie JSON lines optionnelle.
+
+Variables d'environnement :
+    LOG_LEVEL        niveau minimal (défaut : INFO)
+    LOG_JSON_FILE    chemin d'un fichier JSON lines en plus de la console
+    LOG_RATE_LIMIT   nombre maximal de messages identiques par fenêtre (défaut : 20, 0 = illimité)
+    LOG_RATE_WINDOW  durée de la fenêtre en secondes (défaut : 60)
+"""
+
+_CONSOLE_FORMAT = "[%(asctime)s] [%(levelname)s] %(message)s"
+_CONSOLE_DATEFMT = "%H:%M:%S"
+
+_lock = threading.Lock()
+_queue_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Un objet JSON par ligne : horodatage, niveau, logger, message (et exception éventuelle)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exception"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Laisse passer au plus 'limit' records d'un même gabarit (logger + message non formaté)
+    par fenêtre de 'window' secondes, à partir du niveau 'min_level'. Le premier record
+    de la fenêtre suivante signale combien de messages ont été supprimés.
+    """
+
+    def __init__(self, limit: int = 20, window: float = 60.0, min_level: int = logging.WARNING):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self.min_level = min_level
+        self._state = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.limit <= 0 or record.levelno < self.min_level or record.levelno >= logging.ERROR:
+            return True
+        key = (record.name, record.msg if isinstance(record.msg, str) else type(record.msg).__name__)
+        now = time.monotonic()
+        with self._lock:
+            start, count, suppressed = self._state.get(key, (now, 0, 0))
+            if now - start >= self.window:
+                if suppressed:
+                    record.msg = f"{record.msg} (+{suppressed} messages similaires supprimés)"
+                start, count, suppressed = now, 0, 0
+            if count >= self.limit:
+                self._state[key] = (start, count, suppressed + 1)
+                return False
+            self._state[key] = (start, count + 1, suppressed)
+        return True
+
+
+def _build_queue_handler() -> QueueHandler:
+    """Crée (une fois par processus) la file de logs et le thread qui écrit dans les handlers réels."""
+    global _queue_handler, _listener
+    with _lock:
+        if _queue_handler is not None:
+            return _queue_handler
+
+        console = logging.StreamHandler()
+        console.setFormatter(logging.Formatter(_CONSOLE_FORMAT, datefmt=_CONSOLE_DATEFMT))
+        handlers = [console]
+
+        json_path = os.environ.get("LOG_JSON_FILE")
+        if json_path:
+            json_handler = logging.FileHandler(json_path, encoding="utf-8")
+            json_handler.setFormatter(JsonLinesFormatter())
+            handlers.append(json_handler)
+
+        log_queue = queue.SimpleQueue()
+        handler = QueueHandler(log_queue)
+        handler.addFilter(RateLimitFilter(
+            limit=int(os.environ.get("LOG_RATE_LIMIT", "20")),
+            window=float(os.environ.get("LOG_RATE_WINDOW", "60")),
+        ))
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+        _queue_handler = handler
+        return handler
+
+
+def stop_logging():
+    """Vide la file et arrête le thread d'écriture (appelé automatiquement à la sortie)."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def short_id(text: Optional[str], length: int = 40) -> str:
+    """Identifiant court d'un contenu (jamais le HTML ou le texte complet dans les logs)."""
+    if not text:
+        return "∅"
+    text = " ".join(str(text).split())
+    return text if len(text) <= length else text[:length - 1] + "…"
+
+
+def setup_logger(name: str, level: Optional[str] = None) -> logging.Logger:
     logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)  # DEBUG, INFO, WARNING, ERROR, CRITICAL
-
-    if not logger.handlers:  # ✅ Ajoute cette ligne
-        # Console Handler
-        ch = logging.StreamHandler()
-        ch.setLevel(logging.INFO)
-
-        # Formatage
-        formatter = logging.Formatter("[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%H:%M:%S")
-        ch.setFormatter(formatter)
-        logger.addHandler(ch)
-        
-    return logger
\ No newline at end of file
+    logger.setLevel((level or os.environ.get("LOG_LEVEL", "INFO")).upper())  # DEBUG, INFO, WARNING, ERROR, CRITICAL
+
+    if not logger.handlers:
+        logger.addHandler(_build_queue_handler())
+        # Les records ne remontent pas au logger racine : évite les doublons d'affichage
+        logger.propagate = False
+
+    return logger
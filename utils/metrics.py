@@ -0,0 +1,227 @@
+# utils/metrics.py
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Optional, Tuple
+
+"""
+Métriques d'exécution (compteurs, jauges, histogrammes, chronomètres) exportables
+au format texte Prometheus (textfile collector) et en rapport JSON.
+
+Désactivées par défaut : chaque appel se réduit alors à un test de booléen.
+Activation : variable d'environnement FB_SCRAPER_METRICS=1 ou metrics.enable().
+
+    from utils.metrics import metrics
+
+    with metrics.timer("fb_scroll_cycle_seconds"):
+        ...
+
+    @metrics.timed("fb_parse_all_seconds")
+    def parse_all(self): ...
+"""
+
+# Bornes (secondes) par défaut des histogrammes de durée
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class _NullTimer:
+    """Chronomètre inactif partagé (métriques désactivées)."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    def __init__(self, registry: "MetricsRegistry", name: str, labels: Dict):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self._start
+        self.registry.observe(self.name, self.elapsed, **self.labels)
+        return False
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _label_key(labels: Dict) -> Tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_label_pairs(pairs: Tuple) -> str:
+    if not pairs:
+        return ""
+    escaped = (f'{k}="{v.replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for k, v in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = False, buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+                 const_labels: Optional[Dict] = None):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        # Labels ajoutés à toutes les séries exportées (ex : worker="3" dans un pool de processus)
+        self.const_labels = dict(const_labels or {})
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Tuple, float]] = {}
+        self._gauges: Dict[str, Dict[Tuple, float]] = {}
+        self._histograms: Dict[str, Dict[Tuple, _Histogram]] = {}
+        self._started = time.time()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+            self._started = time.time()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Incrémente un compteur."""
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        """Fixe la valeur d'une jauge."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name: str, value: float, **labels):
+        """Ajoute une observation à un histogramme."""
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self.buckets)
+            histogram.observe(value)
+
+    def timer(self, name: str, **labels):
+        """Context manager qui enregistre sa durée (secondes) dans l'histogramme 'name'."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def timed(self, name: str, **labels):
+        """Décorateur équivalent à timer() autour de chaque appel."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Timer(self, name, labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def to_prometheus(self) -> str:
+        """Rendu au format d'exposition texte Prometheus."""
+        lines = []
+        const = _label_key(self.const_labels)
+
+        def _format_labels(key: Tuple, extra: Tuple = ()) -> str:
+            return _format_label_pairs(const + key + extra)
+
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                lines.extend(f"{name}{_format_labels(key)} {value}" for key, value in sorted(series.items()))
+            for name, series in sorted(self._gauges.items()):
+                lines.append(f"# TYPE {name} gauge")
+                lines.extend(f"{name}{_format_labels(key)} {value}" for key, value in sorted(series.items()))
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key, (('le', repr(float(bound))),))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key, (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {histogram.sum}")
+                    lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> Dict:
+        """Rapport JSON de l'exécution : compteurs, jauges et résumé des histogrammes."""
+        def labelled(key: Tuple) -> str:
+            return ",".join(f"{k}={v}" for k, v in key) or "_"
+
+        with self._lock:
+            return {
+                "labels": dict(self.const_labels),
+                "started_at": self._started,
+                "duration": round(time.time() - self._started, 3),
+                "counters": {n: {labelled(k): v for k, v in s.items()} for n, s in self._counters.items()},
+                "gauges": {n: {labelled(k): v for k, v in s.items()} for n, s in self._gauges.items()},
+                "histograms": {
+                    n: {
+                        labelled(k): {
+                            "count": h.count,
+                            "sum": round(h.sum, 6),
+                            "mean": round(h.sum / h.count, 6) if h.count else 0.0,
+                        }
+                        for k, h in s.items()
+                    }
+                    for n, s in self._histograms.items()
+                },
+            }
+
+    def write_prometheus(self, path: str):
+        """Écrit le textfile Prometheus de façon atomique (lu par node_exporter)."""
+        _atomic_write(path, self.to_prometheus())
+
+    def write_json_report(self, path: str):
+        _atomic_write(path, json.dumps(self.to_dict(), indent=2, ensure_ascii=False))
+
+
+def _atomic_write(path: str, content: str):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+# Registre global du processus
+metrics = MetricsRegistry(enabled=os.environ.get("FB_SCRAPER_METRICS", "") in ("1", "true", "yes"))